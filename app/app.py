@@ -1,6 +1,5 @@
 from flask import Flask
 from flask_httpauth import HTTPTokenAuth
-from flask_migrate import upgrade
 from .logging import Logging
 
 # # Initialize HTTPTokenAuth
@@ -14,16 +13,41 @@ def create_app(config_object="app.config.Config"):
     # configure logging
     Logging()
 
+    from .database import configure_sqlite, engine_options, upgrade_database
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config['SQLALCHEMY_DATABASE_URI']))
+
     # Initialize the app with the videos instance
-    from .extension import db, migrate
+    from .extension import db, read_db, migrate, background_worker
     db.init_app(app)
+    with app.app_context():
+        configure_sqlite(db.engine)
+    read_db.init_app(app)
     migrate.init_app(app, db)
+    background_worker.init_app(app)
+
+    from .tracing import tracer
+    tracer.init_app(app)
+
+    from .service.worker.share_reaper import share_reaper
+    share_reaper.init_app(app)
+
+    from .service.worker.storage_reconciler import storage_reconciler
+    storage_reconciler.init_app(app)
+
+    from .profiling import stack_sampler
+    stack_sampler.init_app(app)
 
     from .routes.video_routes import video_routes
+    from .routes.metrics_routes import metrics_routes
+    from .routes.profiling_routes import profiling_routes
+    from .routes.operation_routes import operation_routes
     app.register_blueprint(video_routes)
+    app.register_blueprint(metrics_routes)
+    app.register_blueprint(profiling_routes)
+    app.register_blueprint(operation_routes)
 
-    with app.app_context():
-        db.create_all()  # To ensure all tables are created
-        upgrade()
+    if app.config['MIGRATE_ON_STARTUP']:
+        with app.app_context():
+            upgrade_database(db.engine)  # Migrations create and evolve all tables
 
     return app
@@ -4,6 +4,117 @@ class Config:
     API_TOKEN = os.getenv('API_TOKEN', 'supersecretkey')
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URI', 'sqlite:///videos')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Optional separate database (a replica, or the same SQLite file) for GET paths
+    SQLALCHEMY_READ_DATABASE_URI = os.getenv('DATABASE_READ_URI')
+    # Apply pending migrations in create_app; turn off where deploys run `flask db upgrade` instead
+    MIGRATE_ON_STARTUP = os.getenv('MIGRATE_ON_STARTUP', 'true').lower() == 'true'
     SECRET_KEY = os.getenv('SECRET_KEY', 'supersecretkey')
     VIDEO_DIR = os.getenv('VIDEO_DIR', './uploads')
 
+    # Logging: callers only enqueue records, a background thread writes them
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_LEVELS = os.getenv('LOG_LEVELS', '')  # Per logger, e.g. "app.service=DEBUG,werkzeug=WARNING"
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')  # 'json' or 'text'
+    LOG_FILE = os.getenv('LOG_FILE', 'app.log')  # Empty to log to the console only
+    LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', 10 * 1024 * 1024))  # Rotated beyond this size
+    LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', 5))
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))  # Records beyond it are dropped, never waited on
+    LOG_DEBUG_RATE_LIMIT = int(os.getenv('LOG_DEBUG_RATE_LIMIT', 10))  # DEBUG records per second per call site, 0 for no limit
+
+    # Background jobs (renditions generated after upload)
+    BACKGROUND_WORKERS = int(os.getenv('BACKGROUND_WORKERS', 2))
+
+    # Low-resolution proxy renditions used by preview trims and merges
+    PROXY_HEIGHT = int(os.getenv('PROXY_HEIGHT', 360))
+    PROXY_PRESET = os.getenv('PROXY_PRESET', 'ultrafast')
+    PROXY_BITRATE = os.getenv('PROXY_BITRATE', '500k')
+    # Preview renders stay in VIDEO_DIR and are served under /preview for this long; the storage
+    # reconciler deletes them once they are older than its grace period
+    PREVIEW_TTL_SECONDS = int(os.getenv('PREVIEW_TTL_SECONDS', 60 * 60))
+
+    # Audio waveform peaks (min/max pairs per window, coarser levels zoom out by ZOOM_FACTOR)
+    WAVEFORM_SAMPLE_RATE = int(os.getenv('WAVEFORM_SAMPLE_RATE', 22050))
+    WAVEFORM_SAMPLES_PER_PEAK = int(os.getenv('WAVEFORM_SAMPLES_PER_PEAK', 128))
+    WAVEFORM_LEVELS = int(os.getenv('WAVEFORM_LEVELS', 4))
+    WAVEFORM_ZOOM_FACTOR = int(os.getenv('WAVEFORM_ZOOM_FACTOR', 4))
+
+    # Scene-change detection over downscaled frames, processed SCENE_BATCH_SIZE frames at a time
+    SCENE_SAMPLE_FPS = float(os.getenv('SCENE_SAMPLE_FPS', 10))
+    SCENE_FRAME_HEIGHT = int(os.getenv('SCENE_FRAME_HEIGHT', 72))
+    SCENE_BATCH_SIZE = int(os.getenv('SCENE_BATCH_SIZE', 32))
+    SCENE_HISTOGRAM_BINS = int(os.getenv('SCENE_HISTOGRAM_BINS', 32))
+    SCENE_THRESHOLD = float(os.getenv('SCENE_THRESHOLD', 0.35))
+    SCENE_MIN_LENGTH = float(os.getenv('SCENE_MIN_LENGTH', 0.5))  # seconds between boundaries
+
+    # Optional one-time normalization to a mezzanine profile so trims and merges can stream-copy
+    NORMALIZE_ON_UPLOAD = os.getenv('NORMALIZE_ON_UPLOAD', 'false').lower() == 'true'
+    MEZZANINE_CODEC = os.getenv('MEZZANINE_CODEC', 'libx264')
+    MEZZANINE_PRESET = os.getenv('MEZZANINE_PRESET', 'veryfast')
+    MEZZANINE_WIDTH = int(os.getenv('MEZZANINE_WIDTH', 1280))
+    MEZZANINE_HEIGHT = int(os.getenv('MEZZANINE_HEIGHT', 720))
+    MEZZANINE_FPS = int(os.getenv('MEZZANINE_FPS', 30))
+    MEZZANINE_GOP_SECONDS = float(os.getenv('MEZZANINE_GOP_SECONDS', 1))
+    MEZZANINE_AUDIO_CODEC = os.getenv('MEZZANINE_AUDIO_CODEC', 'aac')
+    MEZZANINE_AUDIO_SAMPLE_RATE = int(os.getenv('MEZZANINE_AUDIO_SAMPLE_RATE', 48000))
+
+    # Storage backend for videos and renditions: 'local' (VIDEO_DIR) or 's3' (any S3-compatible store)
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'local')
+    S3_BUCKET = os.getenv('S3_BUCKET', 'videos')
+    S3_PREFIX = os.getenv('S3_PREFIX', 'videos/')
+    S3_ENDPOINT_URL = os.getenv('S3_ENDPOINT_URL')
+    S3_REGION = os.getenv('S3_REGION')
+    S3_MULTIPART_THRESHOLD = int(os.getenv('S3_MULTIPART_THRESHOLD', 16 * 1024 * 1024))
+    S3_PART_SIZE = int(os.getenv('S3_PART_SIZE', 8 * 1024 * 1024))  # S3 requires at least 5 MB
+    S3_MAX_CONCURRENCY = int(os.getenv('S3_MAX_CONCURRENCY', 8))
+
+    # Local disk cache in front of remote storage (0 disables it)
+    STORAGE_CACHE_DIR = os.getenv('STORAGE_CACHE_DIR', './cache')
+    STORAGE_CACHE_MAX_BYTES = int(os.getenv('STORAGE_CACHE_MAX_BYTES', 2 * 1024 * 1024 * 1024))
+
+    # Share links: 'db' stores a token row per link, 'signed' issues self-contained HMAC-signed tokens
+    SHARE_TOKEN_MODE = os.getenv('SHARE_TOKEN_MODE', 'db')
+    SHARE_REVOCATION_REFRESH_SECONDS = int(os.getenv('SHARE_REVOCATION_REFRESH_SECONDS', 30))
+
+    # In-process cache of video metadata and share records (0 entries disables it)
+    METADATA_CACHE_MAX_ENTRIES = int(os.getenv('METADATA_CACHE_MAX_ENTRIES', 1024))
+    METADATA_CACHE_TTL_SECONDS = int(os.getenv('METADATA_CACHE_TTL_SECONDS', 60))
+
+    # Background deletion of expired share links (0 disables it)
+    SHARE_REAPER_INTERVAL_SECONDS = int(os.getenv('SHARE_REAPER_INTERVAL_SECONDS', 300))
+    SHARE_REAPER_BATCH_SIZE = int(os.getenv('SHARE_REAPER_BATCH_SIZE', 1000))
+    SHARE_ROW_COUNT_INTERVAL_SECONDS = int(os.getenv('SHARE_ROW_COUNT_INTERVAL_SECONDS', 24 * 60 * 60))  # Exact count of video_shares for its gauge, a full scan
+
+    # Database engine: connection pool (not used by in-memory SQLite) and SQLite pragmas
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))  # seconds, -1 never recycles
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')  # Safe with WAL, fsyncs only at checkpoints
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+
+    # Request tracing: share of requests traced (0 disables it) and where sampled spans are written
+    TRACING_SAMPLE_RATE = float(os.getenv('TRACING_SAMPLE_RATE', 0.0))
+    TRACING_EXPORT_PATH = os.getenv('TRACING_EXPORT_PATH', './traces.jsonl')
+
+    # Profiling: per-request cProfile on opt-in (X-Profile header or ?profile=1) and a periodic stack sampler (0 disables it)
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILE_DIR = os.getenv('PROFILE_DIR', './profiles')
+    PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', 100))
+    PROFILING_SAMPLER_INTERVAL_MS = int(os.getenv('PROFILING_SAMPLER_INTERVAL_MS', 0))
+
+    # Idempotency-Key handling for upload, trim and merge
+    IDEMPOTENCY_KEY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_KEY_TTL_SECONDS', 24 * 60 * 60))
+    IDEMPOTENCY_WAIT_SECONDS = int(os.getenv('IDEMPOTENCY_WAIT_SECONDS', 60))  # A duplicate then gets 409 instead
+    IDEMPOTENCY_IN_PROGRESS_TIMEOUT_SECONDS = int(os.getenv('IDEMPOTENCY_IN_PROGRESS_TIMEOUT_SECONDS', 60 * 60))  # Claims older than this are taken over
+
+    # Progress and cancellation of trims and merges, followed by operation id under /operations
+    OPERATION_RETENTION_SECONDS = int(os.getenv('OPERATION_RETENTION_SECONDS', 600))  # Finished operations stay queryable this long
+    OPERATION_EVENT_INTERVAL_SECONDS = float(os.getenv('OPERATION_EVENT_INTERVAL_SECONDS', 0.5))  # At most one progress event per interval
+    OPERATION_KEEPALIVE_SECONDS = int(os.getenv('OPERATION_KEEPALIVE_SECONDS', 15))
+    OPERATION_START_TIMEOUT_SECONDS = int(os.getenv('OPERATION_START_TIMEOUT_SECONDS', 10))  # How long a stream waits for its operation to start
+
+    # Deletion of files in VIDEO_DIR that no video references (0 disables it); the grace period must exceed the longest encode
+    STORAGE_RECONCILER_INTERVAL_SECONDS = int(os.getenv('STORAGE_RECONCILER_INTERVAL_SECONDS', 60 * 60))
+    STORAGE_RECONCILER_GRACE_SECONDS = int(os.getenv('STORAGE_RECONCILER_GRACE_SECONDS', 6 * 60 * 60))
+    STORAGE_RECONCILER_BATCH_SIZE = int(os.getenv('STORAGE_RECONCILER_BATCH_SIZE', 400))
@@ -12,3 +12,9 @@ MAX_DURATION = 25  # 25 seconds
 UPLOAD_FOLDER = 'uploads'
 
 SHARE_DURATION = 24 * 60  # in minutes
+
+# Batch lookup and listing limits
+MAX_BATCH_IDS = 100
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+MAX_BULK_SHARE_IDS = 1000
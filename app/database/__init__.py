@@ -0,0 +1,137 @@
+import logging
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows: processes starting together are not serialised
+    fcntl = None
+
+from flask import current_app, has_app_context
+from flask.globals import app_ctx
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from app.config import Config
+
+def engine_options(uri):
+    """Pool settings from Config for an engine on uri.
+
+    In-memory SQLite keeps a single static connection, so pool sizing does not apply to it.
+    """
+    url = make_url(uri)
+    options = {
+        "pool_pre_ping": Config.DB_POOL_PRE_PING,
+        "pool_recycle": Config.DB_POOL_RECYCLE
+    }
+    if not (url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')):
+        options["pool_size"] = Config.DB_POOL_SIZE
+        options["max_overflow"] = Config.DB_MAX_OVERFLOW
+    return options
+
+
+def configure_sqlite(engine, read_only=False):
+    """Apply the SQLite pragmas from Config to every new connection of engine.
+
+    WAL lets readers carry on while a write is in progress, and the busy timeout
+    makes a writer wait for the lock instead of failing with "database is locked".
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # First, so that switching the journal mode also waits for the lock
+        cursor.execute(f"PRAGMA busy_timeout={int(Config.SQLITE_BUSY_TIMEOUT_MS)}")
+        if Config.SQLITE_JOURNAL_MODE:
+            cursor.execute(f"PRAGMA journal_mode={Config.SQLITE_JOURNAL_MODE}")
+        if Config.SQLITE_SYNCHRONOUS:
+            cursor.execute(f"PRAGMA synchronous={Config.SQLITE_SYNCHRONOUS}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+
+def upgrade_database(engine):
+    """Apply pending migrations, and return whether there were any.
+
+    When the schema is already at head this only compares revisions, without loading
+    Alembic's migration environment. Processes starting together on one host take
+    turns, so only the first of them migrates. Runs inside an app context.
+    """
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+    from flask_migrate import upgrade
+
+    heads = set(ScriptDirectory.from_config(current_app.extensions['migrate'].migrate.get_config()).get_heads())
+
+    def is_current():
+        with engine.connect() as connection:
+            return set(MigrationContext.configure(connection).get_current_heads()) == heads
+
+    if is_current():
+        return False
+    os.makedirs(current_app.instance_path, exist_ok=True)
+    with open(os.path.join(current_app.instance_path, 'migrations.lock'), 'w') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        if is_current():
+            return False
+        upgrade()
+    return True
+
+
+def _app_ctx_id():
+    return id(app_ctx._get_current_object())
+
+
+class ReadDatabase:
+    """Optional read-only session for GET paths, on its own engine (a replica, or the
+    same SQLite file opened with query_only) so reads never queue on the write pool.
+
+    Without SQLALCHEMY_READ_DATABASE_URI, or outside an app context, reads fall back
+    to the primary session.
+    """
+
+    def __init__(self, db):
+        self.logger = logging.getLogger(__name__)
+        self.db = db
+
+    def init_app(self, app):
+        """Create the read engine and session when a read database is configured."""
+        uri = app.config.get('SQLALCHEMY_READ_DATABASE_URI')
+        if not uri:
+            return
+        engine = create_engine(self._resolve_sqlite_path(uri, app), **engine_options(uri))
+        configure_sqlite(engine, read_only=True)
+        session = scoped_session(sessionmaker(bind=engine), scopefunc=_app_ctx_id)
+        app.extensions['read_db'] = session
+        app.teardown_appcontext(lambda exc: session.remove())
+        self.logger.info("Read-only session enabled for GET paths")
+
+    @staticmethod
+    def _resolve_sqlite_path(uri, app):
+        """Relative SQLite paths are relative to the instance folder, as for the primary database."""
+        url = make_url(uri)
+        if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+            return url
+        if os.path.isabs(url.database):
+            return url
+        return url.set(database=os.path.join(app.instance_path, url.database))
+
+    @property
+    def session(self):
+        read_session = self._read_session()
+        return read_session if read_session is not None else self.db.session
+
+    def query(self, model):
+        """Query model through the read session, or through the model's own query when disabled."""
+        read_session = self._read_session()
+        return read_session.query(model) if read_session is not None else model.query
+
+    @staticmethod
+    def _read_session():
+        if not has_app_context():
+            return None
+        return current_app.extensions.get('read_db')
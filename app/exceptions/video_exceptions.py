@@ -15,3 +15,9 @@ class VideoNotFoundException(Exception):
     def __init__(self, message):
         self.message = message
         super().__init__(self.message)
+
+
+class VideoOperationCancelledException(Exception):
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
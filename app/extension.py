@@ -1,5 +1,14 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from app.config import Config
+from app.database import ReadDatabase
+from app.service.worker.background_worker import BackgroundWorker
+from app.utils.ttl_cache import TTLCache
 
 db = SQLAlchemy()
-migrate = Migrate()
\ No newline at end of file
+read_db = ReadDatabase(db)
+migrate = Migrate()
+background_worker = BackgroundWorker()
+# Resolved video metadata (by video ID) and share records (by token) for hot read paths
+video_cache = TTLCache("video", Config.METADATA_CACHE_MAX_ENTRIES, Config.METADATA_CACHE_TTL_SECONDS)
+share_cache = TTLCache("share", Config.METADATA_CACHE_MAX_ENTRIES, Config.METADATA_CACHE_TTL_SECONDS)
@@ -0,0 +1,221 @@
+import hashlib
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import Response, jsonify, make_response, request
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.config import Config
+from app.extension import db
+from app.videos.models import IdempotencyKey
+
+MAX_KEY_LENGTH = 255
+
+# How often a duplicate re-reads a key that another process is executing
+POLL_INTERVAL_SECONDS = 0.2
+
+# Attempts at claiming a key that keeps changing under us (expired, released, taken over)
+MAX_CLAIM_ATTEMPTS = 3
+
+
+class IdempotencyStore:
+    """Records the outcome of requests by Idempotency-Key in the idempotency_keys table.
+
+    The first request inserts the key, which the unique constraint makes an atomic
+    claim across processes, and stores its response once done. Duplicates wait for
+    that response: those in the same process are woken as soon as it is stored,
+    others poll the table.
+    """
+
+    def __init__(self, ttl_seconds=None, wait_seconds=None, in_progress_timeout_seconds=None):
+        self.logger = logging.getLogger(__name__)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.IDEMPOTENCY_KEY_TTL_SECONDS
+        self.wait_seconds = wait_seconds if wait_seconds is not None else Config.IDEMPOTENCY_WAIT_SECONDS
+        self.in_progress_timeout_seconds = (in_progress_timeout_seconds if in_progress_timeout_seconds is not None
+                                            else Config.IDEMPOTENCY_IN_PROGRESS_TIMEOUT_SECONDS)
+        self._done = {}  # key -> Event, for the requests this process is executing
+        self._lock = threading.Lock()
+
+    def claim(self, key, request_hash):
+        """Claim key for this request; returns None when claimed, otherwise the existing record.
+
+        Expired keys, and in-progress claims older than the in-progress timeout (their
+        request is taken to have died with its process), are claimed afresh.
+        """
+        for _ in range(MAX_CLAIM_ATTEMPTS):
+            now = datetime.utcnow()
+            db.session.add(IdempotencyKey(key=key, request_hash=request_hash, created_at=now,
+                                          expiry_time=now + timedelta(seconds=self.ttl_seconds)))
+            try:
+                db.session.commit()
+                self._started(key)
+                return None
+            except IntegrityError:
+                db.session.rollback()
+
+            record = self.get(key)
+            if record is None:
+                continue  # Released in the meantime
+            if record.expiry_time <= now:
+                self._delete(key, record.created_at)
+                continue
+            abandoned = now - timedelta(seconds=self.in_progress_timeout_seconds)
+            if record.response_status is None and record.created_at < abandoned:
+                if self._take_over(record, request_hash, now):
+                    self._started(key)
+                    return None
+                continue
+            return record
+        return self.get(key)
+
+    def get(self, key):
+        # Ends the current transaction first, so that each read sees the latest commit
+        db.session.rollback()
+        return db.session.execute(select(IdempotencyKey).where(IdempotencyKey.key == key)).scalar_one_or_none()
+
+    def wait(self, key):
+        """Wait for the request executing key to finish; returns its record, or None if it was released.
+
+        The record is still in progress when IDEMPOTENCY_WAIT_SECONDS ran out first.
+        """
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            record = self.get(key)
+            if record is None or record.response_status is not None:
+                return record
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return record
+            with self._lock:
+                done = self._done.get(key)
+            if done is not None:
+                done.wait(min(remaining, self.wait_seconds))
+            else:
+                time.sleep(min(remaining, POLL_INTERVAL_SECONDS))
+
+    def complete(self, key, response):
+        """Store the response of the request that claimed key."""
+        db.session.execute(
+            update(IdempotencyKey).where(IdempotencyKey.key == key).values(
+                response_status=response.status_code,
+                response_body=response.get_data(as_text=True),
+                response_mimetype=response.mimetype
+            )
+        )
+        db.session.commit()
+        self._finished(key)
+
+    def release(self, key):
+        """Give up the claim after a failure, so that a retry executes the request again."""
+        db.session.rollback()
+        db.session.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.response_status.is_(None))
+        )
+        db.session.commit()
+        self._finished(key)
+
+    @staticmethod
+    def replay(record):
+        response = Response(record.response_body, status=record.response_status, mimetype=record.response_mimetype)
+        response.headers['Idempotent-Replayed'] = 'true'
+        return response
+
+    def _delete(self, key, created_at):
+        db.session.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.created_at == created_at)
+        )
+        db.session.commit()
+
+    def _take_over(self, record, request_hash, now):
+        # Conditional on created_at, so only one of several duplicates can take over
+        result = db.session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.id == record.id, IdempotencyKey.created_at == record.created_at)
+            .values(created_at=now, request_hash=request_hash)
+        )
+        db.session.commit()
+        if result.rowcount == 1:
+            self.logger.warning("Took over abandoned idempotency key %s", record.key)
+        return result.rowcount == 1
+
+    def _started(self, key):
+        with self._lock:
+            self._done[key] = threading.Event()
+
+    def _finished(self, key):
+        with self._lock:
+            done = self._done.pop(key, None)
+        if done is not None:
+            done.set()
+
+
+def request_fingerprint():
+    """Hash of the method, path and body, so that a key reused for a different request is detected.
+
+    Uploads are hashed by their form fields and file contents rather than the raw
+    body, since the multipart boundary changes between a client's attempts.
+    """
+    digest = hashlib.sha256(f"{request.method} {request.path}\n".encode())
+    if request.files or request.form:
+        for name, value in sorted(request.form.items(multi=True)):
+            digest.update(f"{name}={value}\n".encode())
+        for name, file in sorted(request.files.items(multi=True), key=lambda item: item[0]):
+            digest.update(f"{name}:{file.filename}\n".encode())
+            for chunk in iter(lambda: file.stream.read(1024 * 1024), b""):
+                digest.update(chunk)
+            file.stream.seek(0)
+    else:
+        digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def idempotent(f):
+    """Honour an Idempotency-Key header: execute the request once and replay its response to retries.
+
+    A retry that arrives while the first request is still running waits for it. 5xx
+    and 409 (cancelled) responses and exceptions are not recorded, so that a retry can
+    succeed.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if key is None:
+            return f(*args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return jsonify({"error": f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"}), 400
+
+        request_hash = request_fingerprint()
+        while True:
+            record = idempotency_store.claim(key, request_hash)
+            if record is None:
+                break
+            if record.request_hash != request_hash:
+                return jsonify({"error": "Idempotency-Key was already used for a different request"}), 422
+            if record.response_status is None:
+                record = idempotency_store.wait(key)
+                if record is None:
+                    continue  # The first request failed; execute this one instead
+                if record.response_status is None:
+                    response = jsonify({"error": "A request with this Idempotency-Key is still in progress"})
+                    return response, 409, {'Retry-After': '1'}
+            return idempotency_store.replay(record)
+
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            idempotency_store.release(key)
+            raise
+        if response.status_code >= 500 or response.status_code == 409:
+            # A failed or cancelled request is not the outcome a retry should get
+            idempotency_store.release(key)
+        else:
+            idempotency_store.complete(key, response)
+        return response
+    return decorated_function
+
+
+idempotency_store = IdempotencyStore()
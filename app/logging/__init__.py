@@ -1,13 +1,172 @@
+import atexit
+import contextvars
+import copy
+import json
 import logging
+import logging.handlers
+import queue
+import threading
+from datetime import datetime, timezone
+
+from app.config import Config
+from app.metrics import metrics
+from app.tracing import TraceIdFilter
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [%(trace_id)s] - %(message)s'
+
+# Set by the background worker for the duration of each job
+current_job_id = contextvars.ContextVar("current_job_id", default=None)
+
+# Renders exceptions of records before they are queued
+EXCEPTION_FORMATTER = logging.Formatter()
+
+records_discarded = metrics.counter("log_records_discarded_total", "Log records not written, by reason")
+
+
+class ContextFilter(TraceIdFilter):
+    """Adds trace_id, which is also the request ID (shared by a request and the jobs it starts), and job_id.
+
+    Runs where the record is logged, since both come from the caller's context.
+    """
+
+    def filter(self, record):
+        super().filter(record)
+        record.job_id = current_job_id.get() or "-"
+        return True
+
+
+class DebugRateLimitFilter(logging.Filter):
+    """Lets through at most limit DEBUG records per second from each call site; 0 disables the limit."""
+
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.limit <= 0:
+            return True
+        key = (record.pathname, record.lineno)
+        second = int(record.created)
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or window[0] != second:
+                self._windows[key] = [second, 1]
+                return True
+            if window[1] >= self.limit:
+                records_discarded.inc(reason="rate_limited")
+                return False
+            window[1] += 1
+            return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with the request and job it belongs to."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "trace_id", "-"),
+            "job_id": getattr(record, "job_id", "-"),
+            "thread": record.threadName
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the writer thread, and drops them when the queue is full rather than making
+    the caller wait."""
+
+    def prepare(self, record):
+        """Merge the arguments into the message and render the exception on the calling thread.
+
+        By the time the writer thread runs, mutable arguments may have changed and ORM objects
+        may be detached from their session. The rest of the formatting is left to the writer.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = EXCEPTION_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            records_discarded.inc(reason="queue_full")
+
+
+def parse_levels(levels):
+    """'app.service=DEBUG,werkzeug=WARNING' -> {'app.service': 'DEBUG', 'werkzeug': 'WARNING'}"""
+    parsed = {}
+    for part in levels.split(","):
+        name, _, level = part.partition("=")
+        if name.strip() and level.strip():
+            parsed[name.strip()] = level.strip().upper()
+    return parsed
+
 
 class Logging:
+    """Process-wide logging: callers only enqueue records, and a background thread
+    formats and writes them to the console and a size-rotated file.
+
+    Configured once per process; later instances leave the running pipeline alone.
+    """
+
+    _listener = None
+    _handler = None
+
+    def __init__(self, handlers=None):
+        if Logging._listener is not None:
+            return
+        handlers = handlers if handlers is not None else self._default_handlers()
+
+        log_queue = queue.Queue(maxsize=Config.LOG_QUEUE_SIZE)
+        queue_handler = NonBlockingQueueHandler(log_queue)
+        queue_handler.addFilter(DebugRateLimitFilter(Config.LOG_DEBUG_RATE_LIMIT))
+        queue_handler.addFilter(ContextFilter())  # Correlates log lines with requests and jobs
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(Config.LOG_LEVEL.upper())
+        for name, level in parse_levels(Config.LOG_LEVELS).items():
+            logging.getLogger(name).setLevel(level)
+
+        Logging._listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        Logging._listener.start()
+        Logging._handler = queue_handler
+        atexit.register(Logging.stop)
+
+    @staticmethod
+    def _default_handlers():
+        formatter = JsonFormatter() if Config.LOG_FORMAT == 'json' else logging.Formatter(TEXT_FORMAT)
+        handlers = [logging.StreamHandler()]  # Logs to the console
+        if Config.LOG_FILE:
+            handlers.append(logging.handlers.RotatingFileHandler(
+                Config.LOG_FILE, maxBytes=Config.LOG_MAX_BYTES, backupCount=Config.LOG_BACKUP_COUNT))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        return handlers
 
-    def __init__(self):
-        logging.basicConfig(
-            level=logging.DEBUG,  # You can change this to INFO or ERROR as needed
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.StreamHandler(),  # Logs to the console
-                logging.FileHandler('app.log')  # Logs to a file
-            ]
-        )
+    @classmethod
+    def stop(cls):
+        """Write out the queued records and detach the pipeline, so it can be configured again."""
+        if cls._listener is None:
+            return
+        logging.getLogger().removeHandler(cls._handler)
+        cls._listener.stop()
+        for handler in cls._listener.handlers:
+            handler.close()
+        cls._listener = cls._handler = None
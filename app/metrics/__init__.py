@@ -0,0 +1,165 @@
+import bisect
+import threading
+
+# Latency buckets in seconds, from fast lookups to long encodes
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+class Counter:
+    """Monotonically increasing value, optionally split by labels."""
+
+    type_name = "counter"
+
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, dict(key), value) for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    type_name = "gauge"
+
+    def set(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram:
+    """Distribution of observed values (typically durations) over fixed buckets."""
+
+    type_name = "histogram"
+
+    def __init__(self, name, description, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        self.labels(**labels).observe(value)
+
+    def labels(self, **labels):
+        """Return the series for these labels, to observe into without resolving them on every call."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                # One count per bucket plus +Inf, then the sum of observed values
+                counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        return HistogramSeries(self.buckets, counts, self._lock)
+
+    def count(self, **labels):
+        counts = self._values.get(tuple(sorted(labels.items())))
+        return sum(counts[:-1]) if counts else 0
+
+    def sum(self, **labels):
+        counts = self._values.get(tuple(sorted(labels.items())))
+        return counts[-1] if counts else 0.0
+
+    def samples(self):
+        """Cumulative buckets, sum and count for each label set, as Prometheus expects."""
+        with self._lock:
+            values = [(key, list(counts)) for key, counts in self._values.items()]
+        samples = []
+        for key, counts in values:
+            labels = dict(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts[:-1]):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                samples.append((f"{self.name}_bucket", {**labels, "le": le}, cumulative))
+            samples.append((f"{self.name}_sum", labels, counts[-1]))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class HistogramSeries:
+    """One label set of a Histogram."""
+
+    def __init__(self, buckets, counts, lock):
+        self._buckets = buckets
+        self._counts = counts
+        self._lock = lock
+
+    def observe(self, value):
+        index = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._counts[-1] += value
+
+
+class Metrics:
+    """Process-wide registry of named metrics."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name, description):
+        return self._register(Counter, name, description)
+
+    def gauge(self, name, description):
+        return self._register(Gauge, name, description)
+
+    def histogram(self, name, description, buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, description, buckets)
+
+    def _register(self, metric_class, name, description, *args):
+        """Return the metric with this name, creating it on first use."""
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = metric_class(name, description, *args)
+            metric = self._metrics[name]
+        if type(metric) is not metric_class:
+            raise ValueError(f"Metric {name} is already registered as a {type(metric).__name__}")
+        return metric
+
+    def all(self):
+        with self._lock:
+            return list(self._metrics.values())
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in sorted(self.all(), key=lambda m: m.name):
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in labels.values())
+    return "{" + ",".join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + "}"
+
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+metrics = Metrics()
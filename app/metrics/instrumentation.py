@@ -0,0 +1,68 @@
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from app.metrics import metrics
+from app.tracing import tracer
+
+stage_seconds = metrics.histogram("video_stage_duration_seconds", "Time spent in each processing stage")
+stage_errors = metrics.counter("video_stage_errors_total", "Stage failures by stage and exception type")
+bytes_written = metrics.counter("video_bytes_written_total", "Bytes of output files handed to storage")
+frames_processed = metrics.counter("video_frames_processed_total", "Video frames decoded or encoded")
+
+
+@contextmanager
+def stage_timer(stage):
+    """Record the duration of the block under stage, and its failure by exception type.
+
+    Inside a sampled trace the block is also a span.
+    """
+    span = tracer.start_span(stage)
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except Exception as e:
+        error = e
+        stage_errors.inc(stage=stage, error=type(e).__name__)
+        raise
+    finally:
+        stage_seconds.observe(time.perf_counter() - start, stage=stage)
+        if span is not None:
+            tracer.end_span(span, error)
+
+
+def timed(stage):
+    """Decorator form of stage_timer, for whole methods."""
+    def decorator(fn):
+        # Resolved once here, so each call only pays for the clock and one bucket update
+        series = stage_seconds.labels(stage=stage)
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            span = tracer.start_span(stage)
+            start = time.perf_counter()
+            error = None
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                error = e
+                stage_errors.inc(stage=stage, error=type(e).__name__)
+                raise
+            finally:
+                series.observe(time.perf_counter() - start)
+                if span is not None:
+                    tracer.end_span(span, error)
+        return wrapper
+    return decorator
+
+
+def count_frames(frames, operation):
+    """Pass frames through, counting them once the iteration ends."""
+    count = 0
+    try:
+        for frame in frames:
+            count += 1
+            yield frame
+    finally:
+        frames_processed.inc(count, operation=operation)
@@ -0,0 +1,201 @@
+import contextvars
+import logging
+import re
+import threading
+import time
+import uuid
+from functools import wraps
+
+from flask import jsonify, make_response, request
+
+from app.config import Config
+from app.exceptions.video_exceptions import VideoOperationCancelledException
+from app.metrics import metrics
+
+# Client-chosen ids are echoed in URLs and logs, so they are kept to a safe alphabet
+OPERATION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Set by @tracked for the duration of the request, and read where the encode reports its progress
+current_operation = contextvars.ContextVar("current_operation", default=None)
+
+operations_finished = metrics.counter("video_operations_total", "Tracked trims and merges by kind and outcome")
+
+
+class Operation:
+    """Progress and cancellation state of one trim or merge.
+
+    Written by the request doing the encode and read by the clients following or
+    cancelling it; every change bumps version and wakes those waiting for one.
+    """
+
+    def __init__(self, operation_id, kind):
+        self.id = operation_id
+        self.kind = kind
+        self.state = RUNNING
+        self.stage = None
+        self.done = 0
+        self.total = None
+        self.fps = None
+        self.eta_seconds = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self.version = 0
+        self._stage_started = None
+        self._cancel_requested = threading.Event()
+        self._changed = threading.Condition()
+
+    @property
+    def finished(self):
+        return self.state != RUNNING
+
+    @property
+    def cancel_requested(self):
+        return self._cancel_requested.is_set()
+
+    def start_stage(self, stage, total):
+        """Begin a stage ('audio' chunks or 'video' frames) of total steps."""
+        with self._changed:
+            self.stage, self.done, self.total = stage, 0, total
+            self.fps = self.eta_seconds = None
+            self._stage_started = time.monotonic()
+            self._notify()
+
+    def advance(self, done):
+        """Record that done steps of the current stage are complete, and the rate and ETA that follow."""
+        with self._changed:
+            self.done = done
+            elapsed = time.monotonic() - self._stage_started if self._stage_started is not None else 0
+            if done and elapsed > 0:
+                self.fps = done / elapsed
+                if self.total is not None:
+                    self.eta_seconds = max(self.total - done, 0) / self.fps
+            self._notify()
+
+    def raise_if_cancelled(self):
+        if self._cancel_requested.is_set():
+            raise VideoOperationCancelledException(f"Operation {self.id} was cancelled")
+
+    def cancel(self):
+        """Ask the encode to stop at its next progress update; False if the operation already finished."""
+        with self._changed:
+            if self.finished:
+                return False
+            self._cancel_requested.set()
+            self._notify()
+            return True
+
+    def finish(self, state):
+        with self._changed:
+            self.state = state
+            self.finished_at = time.time()
+            self.eta_seconds = None
+            self._notify()
+        operations_finished.inc(kind=self.kind, state=state)
+
+    def wait_for_change(self, version, timeout):
+        """Block until the version moves past version or timeout passes; returns the current version."""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+    def snapshot(self):
+        with self._changed:
+            return {
+                "operation_id": self.id,
+                "kind": self.kind,
+                "state": self.state,
+                "cancel_requested": self.cancel_requested,
+                "stage": self.stage,
+                # Frames for the video stage, audio chunks for the audio stage
+                "done": self.done,
+                "total": self.total,
+                "percent": round(100 * self.done / self.total, 1) if self.total else None,
+                "fps": round(self.fps, 2) if self.fps is not None else None,
+                "eta_seconds": round(self.eta_seconds, 1) if self.eta_seconds is not None else None,
+                "elapsed_seconds": round((self.finished_at or time.time()) - self.started_at, 1)
+            }
+
+    def _notify(self):
+        self.version += 1
+        self._changed.notify_all()
+
+
+class OperationRegistry:
+    """The operations of this process by id, kept for OPERATION_RETENTION_SECONDS after they finish."""
+
+    def __init__(self, retention_seconds=None):
+        self.logger = logging.getLogger(__name__)
+        self.retention_seconds = (retention_seconds if retention_seconds is not None
+                                  else Config.OPERATION_RETENTION_SECONDS)
+        self._operations = {}
+        self._started = threading.Condition()
+
+    def start(self, operation_id, kind):
+        """Register a new operation; None if the id belongs to one that is still running."""
+        with self._started:
+            self._prune()
+            existing = self._operations.get(operation_id)
+            if existing is not None and not existing.finished:
+                return None
+            operation = self._operations[operation_id] = Operation(operation_id, kind)
+            self._started.notify_all()
+        return operation
+
+    def get(self, operation_id):
+        with self._started:
+            return self._operations.get(operation_id)
+
+    def wait_for(self, operation_id, timeout):
+        """The operation with this id, waiting up to timeout for it to start; None if it does not."""
+        with self._started:
+            self._started.wait_for(lambda: operation_id in self._operations, timeout)
+            return self._operations.get(operation_id)
+
+    def _prune(self):
+        cutoff = time.time() - self.retention_seconds
+        for operation_id in [operation_id for operation_id, operation in self._operations.items()
+                             if operation.finished and operation.finished_at < cutoff]:
+            del self._operations[operation_id]
+
+
+def tracked(kind):
+    """Track the view as an operation whose progress can be followed and which can be cancelled.
+
+    The client chooses the id with X-Operation-Id, so that it can open the event
+    stream before the response arrives; one is generated otherwise. Either way it is
+    returned in X-Operation-Id.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            operation_id = request.headers.get('X-Operation-Id') or uuid.uuid4().hex
+            if not OPERATION_ID_PATTERN.match(operation_id):
+                return jsonify({"error": "X-Operation-Id must be 1 to 64 letters, digits, '-' or '_'"}), 400
+            operation = operation_registry.start(operation_id, kind)
+            if operation is None:
+                return jsonify({"error": f"Operation {operation_id} is already running"}), 409
+
+            token = current_operation.set(operation)
+            try:
+                response = make_response(f(*args, **kwargs))
+            except Exception:
+                operation.finish(FAILED)
+                raise
+            finally:
+                current_operation.reset(token)
+            if response.status_code < 400:
+                operation.finish(SUCCEEDED)
+            else:
+                operation.finish(CANCELLED if operation.cancel_requested else FAILED)
+            response.headers['X-Operation-Id'] = operation_id
+            return response
+        return decorated_function
+    return decorator
+
+
+operation_registry = OperationRegistry()
@@ -0,0 +1,26 @@
+import proglog
+
+# moviepy's progress bars: audio is written first in chunks, then the video frame by frame
+BAR_STAGES = {"chunk": "audio", "frame_index": "video"}
+
+
+class OperationProgressLogger(proglog.ProgressBarLogger):
+    """Feeds moviepy's progress into an Operation instead of printing bars to stdout.
+
+    Cancellation is checked on every update, so a cancelled encode stops within a frame;
+    the exception unwinds through moviepy, which closes its ffmpeg writer on the way out.
+    """
+
+    def __init__(self, operation):
+        # Nothing is logged: the default keeps a message per frame for the whole encode
+        super().__init__(logged_bars=None)
+        self.operation = operation
+
+    def bars_callback(self, bar, attr, value, old_value=None):
+        stage = BAR_STAGES.get(bar)
+        if stage is not None:
+            if attr == "total":
+                self.operation.start_stage(stage, value)
+            elif attr == "index":
+                self.operation.advance(value)
+        self.operation.raise_if_cancelled()
@@ -0,0 +1,171 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import uuid
+from collections import Counter
+from functools import wraps
+
+from flask import make_response, request
+
+from app.config import Config
+from app.tracing import TRACE_ID_PATTERN, Tracer
+
+# Frames kept per sampled stack, counted from the innermost call
+MAX_STACK_DEPTH = 64
+
+# A thread whose innermost Python frame is in one of these modules is waiting, not working
+IDLE_MODULES = ("threading.py", "selectors.py", "socket.py", "socketserver.py", "queue.py")
+
+_profile_lock = threading.Lock()
+
+
+def profile_requested():
+    """True when profiling is enabled and the request asks for it with X-Profile or ?profile."""
+    if not Config.PROFILING_ENABLED:
+        return False
+    flag = request.headers.get('X-Profile') or request.args.get('profile')
+    return flag is not None and flag.lower() in ('1', 'true', 'yes')
+
+
+def profiled(f):
+    """Run the view under cProfile when the request opts in, and return the profile id in X-Profile-Id.
+
+    The profile is stored under the request's trace id so that it can be found from the trace. Apply
+    below @authenticate so that only authenticated callers can trigger it. One request is profiled at
+    a time; others that ask meanwhile run unprofiled.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not profile_requested() or not _profile_lock.acquire(blocking=False):
+            return f(*args, **kwargs)
+        profile_id = Tracer.current_trace_id() or uuid.uuid4().hex
+        profiler = cProfile.Profile()
+        try:
+            response = make_response(profiler.runcall(f, *args, **kwargs))
+        finally:
+            _profile_lock.release()
+            save_profile(profiler, profile_id)
+        response.headers['X-Profile-Id'] = profile_id
+        return response
+    return decorated_function
+
+
+def profile_path(profile_id):
+    """Where the profile is stored; None for ids that are not trace ids."""
+    if not TRACE_ID_PATTERN.fullmatch(profile_id):
+        return None
+    return os.path.join(Config.PROFILE_DIR, f"{profile_id}.prof")
+
+
+def save_profile(profiler, profile_id):
+    """Dump the profile in pstats format, keeping only the newest PROFILE_MAX_FILES profiles."""
+    os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+    profiler.dump_stats(profile_path(profile_id))
+    profiles = sorted(
+        (entry for entry in os.scandir(Config.PROFILE_DIR) if entry.name.endswith(".prof")),
+        key=lambda entry: entry.stat().st_mtime
+    )
+    for entry in profiles[:max(len(profiles) - Config.PROFILE_MAX_FILES, 0)]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+
+def profile_summary(path, limit=50):
+    """The most expensive functions of a stored profile, as pstats text sorted by cumulative time."""
+    output = io.StringIO()
+    pstats.Stats(path, stream=output).sort_stats("cumulative").print_stats(limit)
+    return output.getvalue()
+
+
+class StackSampler:
+    """Periodically samples the stacks of all busy threads and counts how often each one is seen.
+
+    A stack seen in N of the samples has been running for roughly N times the sampling
+    interval, so the counts point at the code paths that dominate across all requests
+    without the cost of profiling any single one.
+    """
+
+    def __init__(self, interval_ms=None):
+        self.logger = logging.getLogger(__name__)
+        self.interval_ms = interval_ms if interval_ms is not None else Config.PROFILING_SAMPLER_INTERVAL_MS
+        self._stacks = Counter()
+        self._samples = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def init_app(self, app):
+        """Start sampling in a daemon thread; an interval of 0 disables the sampler."""
+        if self.interval_ms <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_ms / 1000):
+            try:
+                self.sample()
+            except Exception as e:
+                self.logger.error("Stack sampling failed: %s", e)
+
+    def sample(self):
+        """Take one sample of every thread other than the calling one."""
+        current = threading.get_ident()
+        stacks = [self._stack(frame) for ident, frame in sys._current_frames().items() if ident != current]
+        with self._lock:
+            self._samples += 1
+            self._stacks.update(stack for stack in stacks if stack is not None)
+
+    @staticmethod
+    def _stack(frame):
+        if os.path.basename(frame.f_code.co_filename) in IDLE_MODULES:
+            return None
+        frames = []
+        while frame is not None and len(frames) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        frames.reverse()
+        return tuple(frames)
+
+    def hot_stacks(self, limit=20):
+        """The most sampled stacks, outermost frame first, with their share of all samples."""
+        with self._lock:
+            samples = self._samples
+            top = self._stacks.most_common(limit)
+        return {
+            "samples": samples,
+            "interval_ms": self.interval_ms,
+            "stacks": [
+                {"stack": list(stack), "count": count, "percent": round(100 * count / samples, 2)}
+                for stack, count in top
+            ]
+        }
+
+    def collapsed(self):
+        """All stacks in the collapsed format read by flame graph tools."""
+        with self._lock:
+            stacks = list(self._stacks.items())
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in stacks)
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self._samples = 0
+
+
+stack_sampler = StackSampler()
@@ -0,0 +1,12 @@
+from flask import Blueprint, Response
+
+from app.authentication import authenticate
+from app.metrics import metrics
+
+metrics_routes = Blueprint('metrics_routes', __name__)
+
+
+@metrics_routes.route('/metrics', methods=['GET'])
+@authenticate
+def get_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4'), 200
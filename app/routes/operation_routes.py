@@ -0,0 +1,72 @@
+import json
+import time
+
+from flask import Blueprint, Response, jsonify, request
+
+from app.authentication import authenticate
+from app.config import Config
+from app.operations import OPERATION_ID_PATTERN, operation_registry
+
+operation_routes = Blueprint('operation_routes', __name__)
+
+
+@operation_routes.route('/operations/<operation_id>', methods=['GET'])
+@authenticate
+def get_operation(operation_id):
+    operation = operation_registry.get(operation_id)
+    if operation is None:
+        return jsonify({"error": f"Operation not found: {operation_id}"}), 404
+    return jsonify(operation.snapshot()), 200
+
+
+@operation_routes.route('/operations/<operation_id>/events', methods=['GET'])
+@authenticate
+def stream_operation(operation_id):
+    if not OPERATION_ID_PATTERN.match(operation_id):
+        return jsonify({"error": f"Operation not found: {operation_id}"}), 404
+    # The stream may be opened just before the request that starts the operation arrives
+    operation = operation_registry.wait_for(operation_id, Config.OPERATION_START_TIMEOUT_SECONDS)
+    if operation is None:
+        return jsonify({"error": f"Operation not found: {operation_id}"}), 404
+    cancel_on_disconnect = request.args.get('cancel_on_disconnect', '').lower() in ('1', 'true', 'yes')
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}  # Keep proxies from buffering events
+    return Response(operation_events(operation, cancel_on_disconnect), mimetype='text/event-stream',
+                    headers=headers), 200
+
+
+def operation_events(operation, cancel_on_disconnect=False):
+    """Server-Sent Events for the operation: 'progress' as it changes, at most once per
+    OPERATION_EVENT_INTERVAL_SECONDS, then one 'end' with the final state.
+
+    With cancel_on_disconnect, a client that goes away before the end cancels the operation.
+    """
+    version = -1
+    try:
+        while True:
+            if operation.finished:
+                yield server_sent_event("end", operation.snapshot())
+                return
+            if operation.version != version:
+                version = operation.version
+                yield server_sent_event("progress", operation.snapshot())
+                time.sleep(Config.OPERATION_EVENT_INTERVAL_SECONDS)
+            elif operation.wait_for_change(version, Config.OPERATION_KEEPALIVE_SECONDS) == version:
+                yield ": keepalive\n\n"  # Also how a disconnected client is noticed
+    finally:
+        if cancel_on_disconnect and not operation.finished:
+            operation.cancel()
+
+
+def server_sent_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@operation_routes.route('/operations/<operation_id>', methods=['DELETE'])
+@authenticate
+def cancel_operation(operation_id):
+    operation = operation_registry.get(operation_id)
+    if operation is None:
+        return jsonify({"error": f"Operation not found: {operation_id}"}), 404
+    if not operation.cancel():
+        return jsonify({"error": f"Operation {operation_id} already {operation.state}"}), 409
+    return jsonify({"message": "Cancellation requested", "operation_id": operation_id}), 202
@@ -0,0 +1,39 @@
+import os
+
+from flask import Blueprint, Response, jsonify, request, send_file
+
+from app.authentication import authenticate
+from app.profiling import profile_path, profile_summary, stack_sampler
+
+profiling_routes = Blueprint('profiling_routes', __name__)
+
+
+@profiling_routes.route('/profiles/<profile_id>', methods=['GET'])
+@authenticate
+def get_profile(profile_id):
+    path = profile_path(profile_id)
+    if path is None or not os.path.exists(path):
+        return jsonify({"error": "Profile not found"}), 404
+    if request.args.get('format') == 'text':
+        return Response(profile_summary(path), mimetype='text/plain'), 200
+    return send_file(os.path.abspath(path), mimetype='application/octet-stream', as_attachment=True,
+                     download_name=f"{profile_id}.prof")
+
+
+@profiling_routes.route('/profiles/hot-stacks', methods=['GET'])
+@authenticate
+def get_hot_stacks():
+    if request.args.get('format') == 'collapsed':
+        return Response(stack_sampler.collapsed(), mimetype='text/plain'), 200
+    try:
+        limit = int(request.args.get('limit', 20))
+    except ValueError:
+        return jsonify({"error": "Invalid parameters : 'limit' must be an integer"}), 400
+    return jsonify(stack_sampler.hot_stacks(limit)), 200
+
+
+@profiling_routes.route('/profiles/hot-stacks', methods=['DELETE'])
+@authenticate
+def reset_hot_stacks():
+    stack_sampler.reset()
+    return '', 204
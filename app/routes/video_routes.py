@@ -1,14 +1,49 @@
-from flask import Blueprint, request, jsonify
+import mimetypes
+import os
 
-from app.exceptions.video_exceptions import VideoValidationException, VideoProcessingException, VideoNotFoundException
+from flask import Blueprint, Response, g, request, jsonify, send_file, stream_with_context
+
+from app.constants import DEFAULT_PAGE_SIZE
+from app.exceptions.video_exceptions import VideoValidationException, VideoProcessingException, VideoNotFoundException, \
+    VideoOperationCancelledException
 from app.service.video_service import VideoService
 from app.authentication import authenticate
+from app.idempotency import idempotent
+from app.operations import tracked
+from app.profiling import profiled
+from app.tracing import tracer
 
 video_routes = Blueprint('video_routes', __name__)
 
 
+@video_routes.before_request
+def start_request_span():
+    """Open the root span of the request, joining the caller's trace when it sends X-Trace-Id."""
+    rule = request.url_rule.rule if request.url_rule else request.path
+    g.trace_span = tracer.start_trace(f"{request.method} {rule}", trace_id=request.headers.get('X-Trace-Id'),
+                                      path=request.path)
+
+
+@video_routes.after_request
+def record_request_status(response):
+    span = g.get('trace_span')
+    if span is not None:
+        span.set_attribute('status', response.status_code)
+        response.headers['X-Trace-Id'] = span.trace_id
+    return response
+
+
+@video_routes.teardown_request
+def end_request_span(error=None):
+    span = g.pop('trace_span', None)
+    if span is not None:
+        tracer.end_span(span, error)
+
+
 @video_routes.route('/video', methods=['POST'])
 @authenticate
+@idempotent
+@profiled
 def upload():
     try:
         file = request.files.get('file')
@@ -40,20 +75,117 @@ def get(video_id):
         return jsonify({"error": str(e)}), 500
 
 
+@video_routes.route('/videos', methods=['GET'])
+@authenticate
+def list_videos():
+    try:
+        video_service = VideoService()
+        ids = request.args.get('ids')
+        if ids is not None:
+            response = video_service.get_videos(ids.split(','))
+        else:
+            limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+            response = video_service.list_videos(request.args.get('after'), limit)
+        return jsonify(response), 200
+    except VideoValidationException as e:
+        return jsonify({"error": e.message}), 400
+    except VideoProcessingException as e:
+        return jsonify({"error": e.message}), 500
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@video_routes.route('/video/<int:video_id>/content', methods=['GET'])
+@authenticate
+def get_content(video_id):
+    try:
+        video_service = VideoService()
+        content = video_service.get_video_content(video_id)
+        mimetype = mimetypes.guess_type(content["filename"])[0] or 'application/octet-stream'
+        return Response(stream_with_context(content["chunks"]), mimetype=mimetype), 200
+    except VideoNotFoundException as e:
+        return jsonify({"error": e.message}), 404
+    except VideoProcessingException as e:
+        return jsonify({"error": e.message}), 500
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@video_routes.route('/preview/<filename>', methods=['GET'])
+@authenticate
+def get_preview(filename):
+    try:
+        video_service = VideoService()
+        file_path = video_service.get_preview_path(filename)
+        return send_file(os.path.abspath(file_path), conditional=True, max_age=0)
+    except VideoNotFoundException as e:
+        return jsonify({"error": e.message}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@video_routes.route('/video/<int:video_id>/waveform', methods=['GET'])
+@authenticate
+def get_waveform(video_id):
+    try:
+        level = request.args.get('level', 0, type=int)
+        video_service = VideoService()
+        waveform = video_service.get_waveform(video_id, level)
+        headers = {
+            'X-Waveform-Sample-Rate': str(waveform["sample_rate"]),
+            'X-Waveform-Samples-Per-Peak': str(waveform["samples_per_peak"]),
+            'X-Waveform-Levels': str(waveform["levels"])
+        }
+        return Response(waveform["peaks"], mimetype='application/octet-stream', headers=headers), 200
+    except VideoNotFoundException as e:
+        return jsonify({"error": e.message}), 404
+    except VideoValidationException as e:
+        return jsonify({"error": e.message}), 400
+    except VideoProcessingException as e:
+        return jsonify({"error": e.message}), 500
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@video_routes.route('/video/<int:video_id>/scenes', methods=['GET'])
+@authenticate
+def get_scenes(video_id):
+    try:
+        video_service = VideoService()
+        response = video_service.get_scenes(video_id)
+        return jsonify(response), 200
+    except VideoNotFoundException as e:
+        return jsonify({"error": e.message}), 404
+    except VideoProcessingException as e:
+        return jsonify({"error": e.message}), 500
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @video_routes.route('/video/<int:video_id>/trim', methods=['POST'])
 @authenticate
+@idempotent
+@tracked('trim')
+@profiled
 def trim(video_id):
     try:
         start = request.json.get('start')
         end = request.json.get('end')
         if not start or not end:
             return jsonify({"error": "Invalid parameters : 'start' and 'end' are mandatory required fields"}), 400
+        preview = request.json.get('preview', False)
+        if not isinstance(preview, bool):
+            return jsonify({"error": "Invalid parameters : 'preview' must be a boolean"}), 400
         video_service = VideoService()
-        response = video_service.trim_video(video_id, start, end)
+        response = video_service.trim_video(video_id, start, end, preview=preview)
         return jsonify(response), 200
 
     except VideoNotFoundException as e:
         return jsonify({"error": e.message}), 404
+    except VideoValidationException as e:
+        return jsonify({"error": e.message}), 400
+    except VideoOperationCancelledException as e:
+        return jsonify({"error": e.message}), 409
     except VideoProcessingException as e:
         return jsonify({"error": e.message}), 500
     except Exception as e:
@@ -62,18 +194,26 @@ def trim(video_id):
 
 @video_routes.route('/videos/merge', methods=['POST'])
 @authenticate
+@idempotent
+@tracked('merge')
+@profiled
 def merge():
 
     try:
         video_ids = request.json.get('video_ids')
         if not video_ids :
             return jsonify({"error": "Invalid parameters : 'video_ids' is a mandatory required field"}), 400
+        preview = request.json.get('preview', False)
+        if not isinstance(preview, bool):
+            return jsonify({"error": "Invalid parameters : 'preview' must be a boolean"}), 400
         video_service = VideoService()
-        response = video_service.merge_videos(video_ids)
+        response = video_service.merge_videos(video_ids, preview=preview)
         return jsonify(response), 200
 
     except VideoNotFoundException as e:
         return jsonify({"error": e.message}), 404
+    except VideoOperationCancelledException as e:
+        return jsonify({"error": e.message}), 409
     except VideoProcessingException as e:
         return jsonify({"error": e.message}), 500
     except VideoValidationException as e:
@@ -97,6 +237,27 @@ def get_share_link(video_id):
         return jsonify({"error": str(e)}), 500
 
 
+@video_routes.route('/videos/share', methods=['POST'])
+@authenticate
+def get_share_links():
+    try:
+        video_ids = request.json.get('video_ids')
+        if not video_ids:
+            return jsonify({"error": "Invalid parameters : 'video_ids' is a mandatory required field"}), 400
+        video_service = VideoService()
+        response = video_service.generate_shareable_links(video_ids)
+        return jsonify(response), 200
+
+    except VideoNotFoundException as e:
+        return jsonify({"error": e.message}), 404
+    except VideoValidationException as e:
+        return jsonify({"error": e.message}), 400
+    except VideoProcessingException as e:
+        return jsonify({"error": e.message}), 500
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @video_routes.route('/video/share/<token>', methods=['GET'])
 def get_video_from_shared_token(token):
     try:
@@ -111,3 +272,19 @@ def get_video_from_shared_token(token):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+
+@video_routes.route('/video/share/<token>', methods=['DELETE'])
+@authenticate
+def revoke_share_link(token):
+    try:
+        video_service = VideoService()
+        response = video_service.revoke_shareable_link(token)
+        return jsonify(response), 200
+
+    except VideoNotFoundException as e:
+        return jsonify({"error": e.message}), 404
+    except VideoProcessingException as e:
+        return jsonify({"error": e.message}), 500
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
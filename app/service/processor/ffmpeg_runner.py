@@ -0,0 +1,89 @@
+import logging
+import os
+import subprocess
+import tempfile
+
+from app.config import Config
+
+
+class FFmpegRunner:
+    """Thin wrapper over the ffmpeg binary moviepy uses, for operations that need no frame decoding."""
+
+    def __init__(self, ffmpeg_binary=None):
+        self.logger = logging.getLogger(__name__)
+        if ffmpeg_binary is None:
+            # Imported here rather than at module level, since importing moviepy is slow
+            from moviepy.config import FFMPEG_BINARY
+            ffmpeg_binary = FFMPEG_BINARY
+        self.ffmpeg_binary = ffmpeg_binary
+
+    def run(self, args):
+        """Run ffmpeg with the given arguments, raising with its stderr on failure."""
+        command = [self.ffmpeg_binary, "-y", "-hide_banner", "-loglevel", "error", *args]
+        self.logger.debug("Running %s", ' '.join(command))
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed: {result.stderr.strip()}")
+
+    def probe(self, file_path):
+        """Return ffmpeg's stream information for the file (duration, audio_found, ...)."""
+        from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+        return ffmpeg_parse_infos(file_path)
+
+    def normalize(self, input_path, output_path, has_audio=True):
+        """Transcode to the configured mezzanine profile: fixed size, fps, closed fixed-length GOP and audio."""
+        width, height, fps = Config.MEZZANINE_WIDTH, Config.MEZZANINE_HEIGHT, Config.MEZZANINE_FPS
+        gop = self.get_gop_size()
+        video_filter = (f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps={fps}")
+
+        args = ["-i", input_path]
+        if not has_audio:
+            # Every mezzanine file carries an audio stream so they can always be concatenated
+            args += ["-f", "lavfi", "-i", f"anullsrc=channel_layout=stereo:sample_rate={Config.MEZZANINE_AUDIO_SAMPLE_RATE}",
+                     "-shortest"]
+        args += [
+            "-map", "0:v:0", "-map", "0:a:0" if has_audio else "1:a:0",
+            "-vf", video_filter,
+            "-c:v", Config.MEZZANINE_CODEC, "-preset", Config.MEZZANINE_PRESET, "-pix_fmt", "yuv420p",
+            "-g", str(gop), "-keyint_min", str(gop), "-sc_threshold", "0", "-bf", "0", "-flags", "+cgop",
+            "-c:a", Config.MEZZANINE_AUDIO_CODEC, "-ar", str(Config.MEZZANINE_AUDIO_SAMPLE_RATE), "-ac", "2",
+            "-movflags", "+faststart",
+            output_path,
+        ]
+        self.run(args)
+
+    def concat(self, input_paths, output_path):
+        """Concatenate files sharing the same codec parameters without re-encoding."""
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as concat_list:
+            for input_path in input_paths:
+                escaped_path = os.path.abspath(input_path).replace("'", "'\\''")
+                concat_list.write(f"file '{escaped_path}'\n")
+        try:
+            self.run(["-f", "concat", "-safe", "0", "-i", concat_list.name, "-c", "copy", "-movflags", "+faststart",
+                      output_path])
+        finally:
+            os.remove(concat_list.name)
+
+    def cut(self, input_path, start, end, output_path):
+        """Cut [start, end] without re-encoding; start must fall on a keyframe to be exact."""
+        self.run(["-ss", str(start), "-i", input_path, "-t", str(end - start), "-c", "copy",
+                  "-avoid_negative_ts", "make_zero", "-movflags", "+faststart", output_path])
+
+    @staticmethod
+    def get_gop_size():
+        """Keyframe interval of the mezzanine profile, in frames."""
+        return max(1, round(Config.MEZZANINE_FPS * Config.MEZZANINE_GOP_SECONDS))
+
+    @staticmethod
+    def get_mezzanine_profile():
+        """Identifier of the configured mezzanine profile; files can only be stream-copied together if it matches."""
+        return (f"{Config.MEZZANINE_CODEC}-{Config.MEZZANINE_WIDTH}x{Config.MEZZANINE_HEIGHT}-"
+                f"{Config.MEZZANINE_FPS}fps-gop{FFmpegRunner.get_gop_size()}-"
+                f"{Config.MEZZANINE_AUDIO_CODEC}-{Config.MEZZANINE_AUDIO_SAMPLE_RATE}hz")
+
+    @staticmethod
+    def is_keyframe_aligned(timestamp):
+        """Whether a cut at timestamp lands exactly on a mezzanine keyframe."""
+        gop_seconds = FFmpegRunner.get_gop_size() / Config.MEZZANINE_FPS
+        return abs(timestamp / gop_seconds - round(timestamp / gop_seconds)) < 1e-6
@@ -0,0 +1,93 @@
+import numpy as np
+
+from app.config import Config
+
+LUMA_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+class SceneDetector:
+    def __init__(self, sample_fps=None, frame_height=None, batch_size=None, histogram_bins=None, threshold=None,
+                 min_scene_length=None):
+        self.sample_fps = sample_fps or Config.SCENE_SAMPLE_FPS
+        self.frame_height = frame_height or Config.SCENE_FRAME_HEIGHT
+        self.batch_size = batch_size or Config.SCENE_BATCH_SIZE
+        self.histogram_bins = histogram_bins or Config.SCENE_HISTOGRAM_BINS
+        self.threshold = threshold or Config.SCENE_THRESHOLD
+        self.min_scene_length = min_scene_length if min_scene_length is not None else Config.SCENE_MIN_LENGTH
+
+    def detect(self, frames):
+        """Return scene boundary timestamps (seconds) from a stream of RGB frames sampled at sample_fps.
+
+        Frames are consumed in batches of batch_size, so at most one batch (plus the
+        last frame of the previous one) is held in memory at a time.
+        """
+        boundaries = []
+        previous_luma, previous_histogram = None, None
+        frame_offset = 0
+        last_boundary = 0.0
+
+        for batch in self._batches(frames):
+            luma = batch.astype(np.float32) @ LUMA_WEIGHTS
+            histograms = self._histograms(luma)
+            scores = self._scores(luma, histograms, previous_luma, previous_histogram)
+
+            # scores[i] compares frame i of the batch with the frame before it
+            for index in np.flatnonzero(scores > self.threshold):
+                timestamp = (frame_offset + index) / self.sample_fps
+                if timestamp > 0 and timestamp - last_boundary >= self.min_scene_length:
+                    boundaries.append(round(float(timestamp), 3))
+                    last_boundary = timestamp
+
+            previous_luma, previous_histogram = luma[-1], histograms[-1]
+            frame_offset += len(batch)
+
+        return boundaries
+
+    def _batches(self, frames):
+        """Group the frame stream into stacked arrays of at most batch_size frames."""
+        batch = []
+        for frame in frames:
+            batch.append(frame)
+            if len(batch) == self.batch_size:
+                yield np.stack(batch)
+                batch = []
+        if batch:
+            yield np.stack(batch)
+
+    def _histograms(self, luma):
+        """Normalised luma histograms for every frame of the batch in a single bincount."""
+        frame_count = luma.shape[0]
+        bins = np.minimum((luma * (self.histogram_bins / 256.0)).astype(np.int64), self.histogram_bins - 1)
+        bins = bins.reshape(frame_count, -1) + np.arange(frame_count)[:, np.newaxis] * self.histogram_bins
+        counts = np.bincount(bins.ravel(), minlength=frame_count * self.histogram_bins)
+        return counts.reshape(frame_count, self.histogram_bins) / bins.shape[1]
+
+    def _scores(self, luma, histograms, previous_luma, previous_histogram):
+        """Average of histogram distance and mean absolute frame difference, both in [0, 1]."""
+        if previous_luma is None:
+            previous_luma, previous_histogram = luma[:1], histograms[:1]
+        else:
+            previous_luma, previous_histogram = previous_luma[np.newaxis], previous_histogram[np.newaxis]
+
+        luma_before = np.concatenate((previous_luma, luma[:-1]))
+        histograms_before = np.concatenate((previous_histogram, histograms[:-1]))
+        histogram_distance = 0.5 * np.abs(histograms - histograms_before).sum(axis=1)
+        frame_difference = np.abs(luma - luma_before).mean(axis=(1, 2)) / 255.0
+        return (histogram_distance + frame_difference) / 2
+
+    @staticmethod
+    def slice_scenes(scenes, start, end):
+        """Boundaries of a trimmed video, relative to its new start."""
+        return [round(timestamp - start, 3) for timestamp in scenes if start < timestamp < end]
+
+    @staticmethod
+    def concatenate_scenes(scene_lists, durations):
+        """Boundaries of a merged video: each source's boundaries shifted, plus a cut at every join."""
+        boundaries = []
+        offset = 0.0
+        for scenes, duration in zip(scene_lists, durations):
+            if offset > 0:
+                boundaries.append(round(offset, 3))
+            boundaries.extend(round(offset + timestamp, 3) for timestamp in scenes)
+            offset += duration
+        return boundaries
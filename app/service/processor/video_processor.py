@@ -1,45 +1,87 @@
+import glob
 import logging
 import os
 import uuid
-
-from moviepy.video.compositing.CompositeVideoClip import concatenate_videoclips
-from moviepy.video.io.VideoFileClip import VideoFileClip
+from contextlib import ExitStack, contextmanager
 
 from app.config import Config
+from app.metrics.instrumentation import timed, stage_timer, bytes_written, frames_processed, count_frames
+from app.operations import current_operation
+from app.service.processor.ffmpeg_runner import FFmpegRunner
+from app.service.storage.storage_factory import get_storage
 from app.videos.models import Video
 
+# moviepy names the temporary audio track of an encode <output name>TEMP_MPY_wvf_snd.<audio extension>
+TEMP_AUDIO_SUFFIX = "TEMP_MPY_wvf_snd"
+
+# Outputs are written under this prefix and renamed once complete; the extension is kept for ffmpeg
+PARTIAL_PREFIX = ".partial-"
+
+# Preview renders are named apart from stored outputs, and only such names are served under /preview
+PREVIEW_PREFIX = "preview-"
+
 
 class VideoProcessor:
-    def __init__(self, video_dir=None):
+    def __init__(self, video_dir=None, storage=None):
         self.logger = logging.getLogger(__name__)
         self.video_dir = video_dir or Config.VIDEO_DIR
         self._ensure_video_directory()
+        self.storage = storage or get_storage(self.video_dir)
 
     def _ensure_video_directory(self):
         """Ensure that the video directory exists."""
         if not os.path.exists(self.video_dir):
             os.makedirs(self.video_dir)
 
+    @timed("processor.process_upload")
     def process_upload(self, file):
         """Process the uploaded video file and save it."""
         unique_filename = self._generate_unique_filename(file.filename)
         file_path = os.path.join(self.video_dir, unique_filename)
         self._save_video_file(file, file_path)
 
-        video_clip = VideoFileClip(file_path)
-        return self._create_video_object(unique_filename, file_path, video_clip)
+        # moviepy pulls in NumPy, imageio and PIL, so it is only imported once a video is actually processed
+        from moviepy.video.io.VideoFileClip import VideoFileClip
+        with stage_timer("processor.probe"):
+            video_clip = VideoFileClip(file_path)
+            video = self._create_video_object(unique_filename, file_path, video_clip)
+            video_clip.close()
+        video.file_path = self._store_output(file_path, unique_filename)
+        return video
 
     def _generate_unique_filename(self, original_filename):
         """Generate a unique filename using UUID."""
         file_extension = os.path.splitext(original_filename)[1]
         unique_filename = f"{uuid.uuid4()}{file_extension}"
-        self.logger.info(f"Generated unique filename: {unique_filename} for original file: {original_filename}")
+        self.logger.info("Generated unique filename: %s for original file: %s", unique_filename, original_filename)
         return unique_filename
 
+    def _output_filename(self, original_filename, preview):
+        """Unique name of a trim or merge output, marked as a preview when it is one."""
+        unique_filename = self._generate_unique_filename(original_filename)
+        return PREVIEW_PREFIX + unique_filename if preview else unique_filename
+
+    @timed("processor.save_upload")
     def _save_video_file(self, file, file_path):
         """Save the uploaded video file to disk."""
-        file.save(file_path)
-        self.logger.info(f"File {file.filename} saved at path {file_path}")
+        with self._atomic_output(file_path) as partial_path:
+            file.save(partial_path)
+        self.logger.info("File %s saved at path %s", file.filename, file_path)
+
+    @timed("processor.store_output")
+    def _store_output(self, local_path, filename):
+        """Hand a finished working file over to storage and return its location."""
+        if os.path.exists(local_path):
+            bytes_written.inc(os.path.getsize(local_path))
+        return self.storage.save_file(local_path, filename)
+
+    def iter_file(self, location, chunk_size=1024 * 1024):
+        """Stream a stored file in chunks."""
+        return self.storage.iter_chunks(location, chunk_size)
+
+    def delete_file(self, location):
+        """Delete a stored file."""
+        self.storage.delete(location)
 
     def _create_video_object(self, filename, file_path, video_clip):
         """Create a Video object for the uploaded video."""
@@ -50,39 +92,271 @@ class VideoProcessor:
             file_path=file_path
         )
 
-    def trim_video_file(self, video, start, end):
+    @timed("processor.trim")
+    def trim_video_file(self, video, start, end, preview=False):
         """Trim the video from the start to the end time."""
-        clip = self._get_video_clip(video.file_path).subclipped(start, end)
-        unique_filename = self._generate_unique_filename(video.filename)
-        new_file_path = os.path.join(self.video_dir, unique_filename)
-        self._save_trimmed_video(clip, new_file_path)
+        if not preview and self._can_stream_copy([video]) and FFmpegRunner.is_keyframe_aligned(start):
+            return self._trim_mezzanine(video, start, end)
+
+        with self.storage.local_copy(self._get_source_path(video, preview)) as source_path:
+            clip = self._get_video_clip(source_path).subclipped(start, end)
+            try:
+                unique_filename = self._output_filename(video.filename, preview)
+                new_file_path = os.path.join(self.video_dir, unique_filename)
+                self._save_trimmed_video(clip, new_file_path, preview)
+                trimmed_video = self._create_video_object(unique_filename, new_file_path, clip)
+            finally:
+                clip.close()
 
-        return self._create_video_object(unique_filename, new_file_path, clip)
+        if not preview:  # Previews are served from the video directory until they expire
+            trimmed_video.file_path = self._store_output(new_file_path, unique_filename)
+        return trimmed_video
+
+    def _get_source_path(self, video, preview):
+        """Return the proxy rendition for previews when available, otherwise the original."""
+        if preview and video.proxy_path:
+            return video.proxy_path
+        return video.file_path
 
     def _get_video_clip(self, file_path):
         """Load and return a video clip from the given file path."""
+        from moviepy.video.io.VideoFileClip import VideoFileClip
         return VideoFileClip(file_path)
 
-    def _save_trimmed_video(self, clip, new_file_path):
+    def _get_write_options(self, preview):
+        """Encoder options: previews favour speed over quality, final renders keep the defaults."""
+        if preview:
+            return {"preset": Config.PROXY_PRESET}
+        return {}
+
+    @contextmanager
+    def _atomic_output(self, file_path):
+        """Yield a partial path to write file_path to, and rename it into place once complete.
+
+        A half-written output is never visible under its final name. If writing fails or
+        is cancelled, the partial file and any temporary audio track written for it are
+        removed.
+        """
+        partial_path = os.path.join(os.path.dirname(file_path), PARTIAL_PREFIX + os.path.basename(file_path))
+        try:
+            yield partial_path
+        except BaseException:
+            self._remove_partial_outputs(partial_path)
+            raise
+        os.replace(partial_path, file_path)
+
+    def _write_videofile(self, clip, file_path, logger="bar", **options):
+        """Encode the clip, reporting progress to the current operation if there is one.
+
+        The temporary audio track is written to the video directory rather than the
+        working directory, next to the output.
+        """
+        operation = current_operation.get()
+        if operation is not None:
+            from app.operations.progress import OperationProgressLogger
+            logger = OperationProgressLogger(operation)
+        with self._atomic_output(file_path) as partial_path:
+            clip.write_videofile(partial_path, temp_audiofile_path=self.video_dir, logger=logger, **options)
+
+    def _remove_partial_outputs(self, file_path):
+        """Delete an unfinished output and moviepy's temporary audio track for it."""
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        temp_audio_paths = glob.glob(os.path.join(self.video_dir, f"{glob.escape(name)}{TEMP_AUDIO_SUFFIX}.*"))
+        for path in [file_path, *temp_audio_paths]:
+            try:
+                os.remove(path)
+                self.logger.info("Removed partial output %s", path)
+            except FileNotFoundError:
+                pass
+
+    @timed("encode.trim")
+    def _save_trimmed_video(self, clip, new_file_path, preview=False):
         """Save the trimmed video file."""
-        clip.write_videofile(new_file_path)
-        self.logger.info(f"Trimmed video saved at path {new_file_path}")
+        self._write_videofile(clip, new_file_path, **self._get_write_options(preview))
+        self._count_encoded_frames(clip, "trim")
+        self.logger.info("Trimmed video saved at path %s", new_file_path)
 
-    def merge_video_files(self, videos):
+    @timed("processor.merge")
+    def merge_video_files(self, videos, preview=False):
         """Merge multiple video files into a single file."""
-        clips = self._load_video_clips(videos)
-        final_clip = concatenate_videoclips(clips)
-        unique_filename = self._generate_unique_filename(videos[0].filename)
-        merged_file_path = os.path.join(self.video_dir, unique_filename)
-        self._save_merged_video(final_clip, merged_file_path)
+        if not preview and self._can_stream_copy(videos):
+            return self._merge_mezzanine(videos)
 
-        return self._create_video_object(unique_filename, merged_file_path, final_clip)
+        with ExitStack() as stack:
+            source_paths = [stack.enter_context(self.storage.local_copy(self._get_source_path(video, preview)))
+                            for video in videos]
+            clips = self._load_video_clips(source_paths)
+            for clip in clips:
+                stack.callback(clip.close)
+            from moviepy.video.compositing.CompositeVideoClip import concatenate_videoclips
+            final_clip = concatenate_videoclips(clips)
+            unique_filename = self._output_filename(videos[0].filename, preview)
+            merged_file_path = os.path.join(self.video_dir, unique_filename)
+            self._save_merged_video(final_clip, merged_file_path, preview)
+            merged_video = self._create_video_object(unique_filename, merged_file_path, final_clip)
 
-    def _load_video_clips(self, videos):
-        """Load and return the video clips for the given videos."""
-        return [VideoFileClip(video.file_path) for video in videos]
+        if not preview:  # Previews are served from the video directory until they expire
+            merged_video.file_path = self._store_output(merged_file_path, unique_filename)
+        return merged_video
 
-    def _save_merged_video(self, final_clip, merged_file_path):
+    def _load_video_clips(self, file_paths):
+        """Load and return the video clips for the given files."""
+        from moviepy.video.io.VideoFileClip import VideoFileClip
+        return [VideoFileClip(file_path) for file_path in file_paths]
+
+    @timed("encode.merge")
+    def _save_merged_video(self, final_clip, merged_file_path, preview=False):
         """Save the merged video file."""
-        final_clip.write_videofile(merged_file_path)
-        self.logger.info(f"Merged video saved at path {merged_file_path}")
+        self._write_videofile(final_clip, merged_file_path, **self._get_write_options(preview))
+        self._count_encoded_frames(final_clip, "merge")
+        self.logger.info("Merged video saved at path %s", merged_file_path)
+
+    def _count_encoded_frames(self, clip, operation):
+        frames_processed.inc(int(clip.duration * clip.fps), operation=operation)
+
+    @timed("processor.generate_proxy")
+    def generate_proxy(self, video):
+        """Render a low-resolution proxy of the video and return its location."""
+        proxy_filename = f"{os.path.splitext(video.filename)[0]}_proxy.mp4"
+        proxy_path = os.path.join(self.video_dir, proxy_filename)
+        with self.storage.local_copy(video.file_path) as source_path:
+            clip = self._get_video_clip(source_path)
+            try:
+                proxy_clip = clip.resized(new_size=self._get_proxy_size(clip.w, clip.h))
+                with stage_timer("encode.proxy"):
+                    self._write_videofile(proxy_clip, proxy_path, preset=Config.PROXY_PRESET,
+                                          bitrate=Config.PROXY_BITRATE, logger=None)
+                self._count_encoded_frames(proxy_clip, "proxy")
+                self.logger.info("Proxy rendition for %s saved at path %s", video.filename, proxy_path)
+            finally:
+                clip.close()
+        return self._store_output(proxy_path, proxy_filename)
+
+    def _get_proxy_size(self, width, height):
+        """Scale down to the proxy height, keeping the aspect ratio and even dimensions for the encoder."""
+        if height <= Config.PROXY_HEIGHT:
+            return width - width % 2, height - height % 2
+        proxy_width = round(width * Config.PROXY_HEIGHT / height / 2) * 2
+        return proxy_width, Config.PROXY_HEIGHT - Config.PROXY_HEIGHT % 2
+
+    @timed("processor.generate_waveform")
+    def generate_waveform(self, video):
+        """Extract the audio track once and store its peaks as a binary sidecar; None if there is no audio."""
+        with self.storage.local_copy(video.file_path) as source_path:
+            clip = self._get_video_clip(source_path)
+            try:
+                if clip.audio is None:
+                    self.logger.info("No audio track in %s, skipping waveform", video.filename)
+                    return None
+                from app.service.processor.waveform_processor import WaveformProcessor
+                waveform_processor = WaveformProcessor()
+                levels = waveform_processor.compute_from_audio(clip.audio)
+            finally:
+                clip.close()
+        return self._save_waveform(waveform_processor, levels, video.filename)
+
+    def slice_waveform(self, source_video, video, start, end):
+        """Derive the waveform of a trimmed video by slicing the source's peaks."""
+        from app.service.processor.waveform_processor import WaveformProcessor
+        waveform_processor = WaveformProcessor()
+        levels = self._read_waveform(waveform_processor, source_video)
+        return self._save_waveform(waveform_processor, waveform_processor.slice_levels(levels, start, end),
+                                   video.filename)
+
+    def concatenate_waveforms(self, source_videos, video):
+        """Derive the waveform of a merged video by joining the sources' peaks."""
+        from app.service.processor.waveform_processor import WaveformProcessor
+        waveform_processor = WaveformProcessor()
+        levels_list = [self._read_waveform(waveform_processor, source_video) for source_video in source_videos]
+        return self._save_waveform(waveform_processor, waveform_processor.concatenate_levels(levels_list),
+                                   video.filename)
+
+    def load_waveform(self, video):
+        """Return the sample rate and (samples_per_peak, peaks) levels stored for the video."""
+        from app.service.processor.waveform_processor import WaveformProcessor
+        waveform_processor = WaveformProcessor()
+        levels = self._read_waveform(waveform_processor, video)
+        return waveform_processor.sample_rate, levels
+
+    def _read_waveform(self, waveform_processor, video):
+        """Read the waveform sidecar of a video from storage."""
+        with self.storage.local_copy(video.waveform_path) as waveform_path:
+            return waveform_processor.read(waveform_path)
+
+    def _save_waveform(self, waveform_processor, levels, filename):
+        """Write the waveform sidecar next to the video and return its location."""
+        waveform_filename = f"{os.path.splitext(filename)[0]}.peaks"
+        waveform_path = os.path.join(self.video_dir, waveform_filename)
+        with self._atomic_output(waveform_path) as partial_path:
+            waveform_processor.write(partial_path, levels)
+        self.logger.info("Waveform for %s saved at path %s", filename, waveform_path)
+        return self._store_output(waveform_path, waveform_filename)
+
+    @timed("processor.detect_scenes")
+    def detect_scenes(self, video):
+        """Detect shot boundaries in one streaming pass over downscaled frames."""
+        from moviepy.video.io.VideoFileClip import VideoFileClip
+        from app.service.processor.scene_detector import SceneDetector
+        scene_detector = SceneDetector()
+        with self.storage.local_copy(video.file_path) as source_path:
+            clip = VideoFileClip(source_path, audio=False, target_resolution=(scene_detector.frame_height, None))
+            try:
+                frames = clip.iter_frames(fps=scene_detector.sample_fps, dtype="uint8")
+                scenes = scene_detector.detect(count_frames(frames, "scenes"))
+            finally:
+                clip.close()
+        self.logger.info("Detected %s scene boundaries in %s", len(scenes), video.filename)
+        return scenes
+
+    @timed("processor.normalize")
+    def normalize_video(self, video):
+        """Convert the source once to the mezzanine profile and return the normalized file location."""
+        ffmpeg_runner = FFmpegRunner()
+        mezzanine_filename = f"{os.path.splitext(video.filename)[0]}_mezzanine.mp4"
+        mezzanine_path = os.path.join(self.video_dir, mezzanine_filename)
+        with self.storage.local_copy(video.file_path) as source_path:
+            has_audio = ffmpeg_runner.probe(source_path)["audio_found"]
+            with stage_timer("encode.normalize"):
+                with self._atomic_output(mezzanine_path) as partial_path:
+                    ffmpeg_runner.normalize(source_path, partial_path, has_audio)
+        self.logger.info("Mezzanine for %s saved at path %s", video.filename, mezzanine_path)
+        return self._store_output(mezzanine_path, mezzanine_filename)
+
+    def _can_stream_copy(self, videos):
+        """Videos normalized to the current mezzanine profile can be cut and joined without re-encoding."""
+        mezzanine_profile = FFmpegRunner.get_mezzanine_profile()
+        return all(video.mezzanine_path and video.mezzanine_profile == mezzanine_profile for video in videos)
+
+    @timed("processor.trim_stream_copy")
+    def _trim_mezzanine(self, video, start, end):
+        """Cut the normalized copy on keyframes instead of re-encoding."""
+        unique_filename = self._generate_unique_filename(video.mezzanine_path)
+        new_file_path = os.path.join(self.video_dir, unique_filename)
+        with self.storage.local_copy(video.mezzanine_path) as source_path:
+            with self._atomic_output(new_file_path) as partial_path:
+                FFmpegRunner().cut(source_path, start, end, partial_path)
+        self.logger.info("Trimmed video stream-copied to path %s", new_file_path)
+        return self._create_mezzanine_video_object(unique_filename, new_file_path)
+
+    @timed("processor.merge_stream_copy")
+    def _merge_mezzanine(self, videos):
+        """Concatenate the normalized copies instead of re-encoding."""
+        unique_filename = self._generate_unique_filename(videos[0].mezzanine_path)
+        merged_file_path = os.path.join(self.video_dir, unique_filename)
+        with ExitStack() as stack:
+            source_paths = [stack.enter_context(self.storage.local_copy(video.mezzanine_path)) for video in videos]
+            with self._atomic_output(merged_file_path) as partial_path:
+                FFmpegRunner().concat(source_paths, partial_path)
+        self.logger.info("Merged video stream-copied to path %s", merged_file_path)
+        return self._create_mezzanine_video_object(unique_filename, merged_file_path)
+
+    def _create_mezzanine_video_object(self, filename, file_path):
+        """Create a Video object for an output that is itself in the mezzanine profile, and store it."""
+        video = Video(
+            filename=filename,
+            size=os.path.getsize(file_path),
+            duration=FFmpegRunner().probe(file_path)["duration"],
+            mezzanine_profile=FFmpegRunner.get_mezzanine_profile()
+        )
+        video.file_path = video.mezzanine_path = self._store_output(file_path, filename)
+        return video
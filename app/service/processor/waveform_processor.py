@@ -0,0 +1,134 @@
+import math
+import struct
+
+import numpy as np
+
+from app.config import Config
+
+# Sidecar layout (little endian):
+#   header: magic, version, sample_rate, level count
+#   per level: samples per peak, peak count
+#   then for each level, `peak count` interleaved int8 (min, max) pairs
+WAVEFORM_MAGIC = b"WVPK"
+WAVEFORM_VERSION = 1
+HEADER_FORMAT = "<4sHIH"
+LEVEL_FORMAT = "<II"
+
+
+class WaveformProcessor:
+    def __init__(self, sample_rate=None, samples_per_peak=None, levels=None, zoom_factor=None):
+        self.sample_rate = sample_rate or Config.WAVEFORM_SAMPLE_RATE
+        self.samples_per_peak = samples_per_peak or Config.WAVEFORM_SAMPLES_PER_PEAK
+        self.levels = levels or Config.WAVEFORM_LEVELS
+        self.zoom_factor = zoom_factor or Config.WAVEFORM_ZOOM_FACTOR
+
+    def compute_from_audio(self, audio_clip):
+        """Stream the audio track in chunks and reduce it to peaks at every zoom level.
+
+        moviepy does not split the track on peak boundaries, so the samples past the last
+        whole window of each chunk are carried into the next one; only the very end of the
+        track may produce a partial peak. An empty track yields empty levels.
+        """
+        chunks = audio_clip.iter_chunks(chunksize=self.samples_per_peak * 1024, fps=self.sample_rate)
+        mins, maxs = [], []
+        carried_mins = carried_maxs = np.empty(0, dtype=np.float32)
+        for chunk in chunks:
+            chunk_mins, chunk_maxs = self._collapse_channels(chunk)
+            chunk_mins = np.concatenate((carried_mins, chunk_mins))
+            chunk_maxs = np.concatenate((carried_maxs, chunk_maxs))
+            full = len(chunk_mins) // self.samples_per_peak * self.samples_per_peak
+            reduced = self._reduce_peaks(chunk_mins[:full], chunk_maxs[:full], self.samples_per_peak)
+            mins.append(reduced[0])
+            maxs.append(reduced[1])
+            carried_mins, carried_maxs = chunk_mins[full:], chunk_maxs[full:]
+        reduced = self._reduce_peaks(carried_mins, carried_maxs, self.samples_per_peak)
+        mins.append(reduced[0])
+        maxs.append(reduced[1])
+        return self.build_levels(np.concatenate(mins), np.concatenate(maxs))
+
+    def compute_peaks(self, samples):
+        """Reduce raw samples (frames x channels, floats in [-1, 1]) to peaks at every zoom level."""
+        return self.build_levels(*self._reduce_samples(samples))
+
+    def build_levels(self, mins, maxs):
+        """Derive the coarser zoom levels from the finest (min, max) peaks."""
+        levels = [(self.samples_per_peak, mins, maxs)]
+        for _ in range(1, self.levels):
+            samples_per_peak, mins, maxs = levels[-1]
+            levels.append((samples_per_peak * self.zoom_factor, *self._reduce_peaks(mins, maxs, self.zoom_factor)))
+        return [(samples_per_peak, self._quantize(mins, maxs)) for samples_per_peak, mins, maxs in levels]
+
+    def _reduce_samples(self, samples):
+        """Collapse channels and windows of samples into (min, max) pairs."""
+        return self._reduce_peaks(*self._collapse_channels(samples), self.samples_per_peak)
+
+    @staticmethod
+    def _collapse_channels(samples):
+        """Per-frame (min, max) across channels."""
+        samples = np.asarray(samples, dtype=np.float32)
+        if samples.ndim == 1:
+            samples = samples[:, np.newaxis]
+        return samples.min(axis=1), samples.max(axis=1)
+
+    @staticmethod
+    def _reduce_peaks(mins, maxs, factor):
+        """Group consecutive values by `factor`; a trailing partial group becomes its own peak."""
+        full = len(mins) // factor * factor
+        reduced_mins = mins[:full].reshape(-1, factor).min(axis=1)
+        reduced_maxs = maxs[:full].reshape(-1, factor).max(axis=1)
+        if full < len(mins):
+            reduced_mins = np.append(reduced_mins, mins[full:].min())
+            reduced_maxs = np.append(reduced_maxs, maxs[full:].max())
+        return reduced_mins, reduced_maxs
+
+    @staticmethod
+    def _quantize(mins, maxs):
+        """Interleave min/max pairs as int8 in a (peaks x 2) array."""
+        pairs = np.column_stack((mins, maxs))
+        return np.clip(np.round(pairs * 127), -128, 127).astype(np.int8)
+
+    def slice_levels(self, levels, start, end):
+        """Slice every level to the [start, end] seconds window without recomputing peaks."""
+        sliced = []
+        for samples_per_peak, peaks in levels:
+            first = int(start * self.sample_rate // samples_per_peak)
+            last = math.ceil(end * self.sample_rate / samples_per_peak)
+            sliced.append((samples_per_peak, peaks[first:last]))
+        return sliced
+
+    def concatenate_levels(self, levels_list):
+        """Join the waveforms of consecutive clips, rebuilding coarser levels from the finest."""
+        finest = np.concatenate([levels[0][1] for levels in levels_list]).astype(np.float32) / 127
+        return self.build_levels(finest[:, 0], finest[:, 1])
+
+    def write(self, file_path, levels):
+        """Write the levels as a compact binary sidecar file."""
+        with open(file_path, "wb") as sidecar:
+            sidecar.write(struct.pack(HEADER_FORMAT, WAVEFORM_MAGIC, WAVEFORM_VERSION, self.sample_rate, len(levels)))
+            for samples_per_peak, peaks in levels:
+                sidecar.write(struct.pack(LEVEL_FORMAT, samples_per_peak, len(peaks)))
+            for _, peaks in levels:
+                sidecar.write(np.ascontiguousarray(peaks, dtype=np.int8).tobytes())
+
+    def read(self, file_path):
+        """Read a sidecar file back into (samples_per_peak, peaks) levels."""
+        with open(file_path, "rb") as sidecar:
+            data = sidecar.read()
+
+        magic, version, sample_rate, level_count = struct.unpack_from(HEADER_FORMAT, data)
+        if magic != WAVEFORM_MAGIC or version != WAVEFORM_VERSION:
+            raise ValueError(f"Unsupported waveform file {file_path}")
+        self.sample_rate = sample_rate
+
+        offset = struct.calcsize(HEADER_FORMAT)
+        level_headers = []
+        for _ in range(level_count):
+            level_headers.append(struct.unpack_from(LEVEL_FORMAT, data, offset))
+            offset += struct.calcsize(LEVEL_FORMAT)
+
+        levels = []
+        for samples_per_peak, count in level_headers:
+            peaks = np.frombuffer(data, dtype=np.int8, count=count * 2, offset=offset).reshape(-1, 2)
+            levels.append((samples_per_peak, peaks))
+            offset += count * 2
+        return levels
@@ -0,0 +1,91 @@
+import logging
+import threading
+import time
+from datetime import datetime
+
+from app.config import Config
+from app.extension import db, read_db
+from app.videos.models import RevokedShareToken
+
+
+class RevocationList:
+    """Signed share tokens revoked before their expiry.
+
+    The ids of revoked, still unexpired tokens are kept in memory and reloaded from
+    the database every SHARE_REVOCATION_REFRESH_SECONDS, so checking a token costs a
+    set lookup and revocations made by other processes apply within that interval.
+    """
+
+    def __init__(self, refresh_seconds=None):
+        self.logger = logging.getLogger(__name__)
+        self.refresh_seconds = refresh_seconds if refresh_seconds is not None else Config.SHARE_REVOCATION_REFRESH_SECONDS
+        self._token_ids = set()
+        self._loaded_at = None
+        self._refreshing = False
+        self._revoked_during_refresh = set()
+        self._lock = threading.Lock()
+        self._refreshed = threading.Condition(self._lock)
+
+    def is_revoked(self, token_id):
+        self._refresh_if_stale()
+        return token_id in self._token_ids
+
+    def revoke(self, token_id, expiry_time):
+        """Record the revocation so every process rejects the token from its next refresh."""
+        try:
+            if not RevokedShareToken.query.filter_by(token_id=token_id).first():
+                db.session.add(RevokedShareToken(token_id=token_id, expiry_time=expiry_time))
+                db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        with self._lock:
+            self._token_ids.add(token_id)
+            if self._refreshing:
+                self._revoked_during_refresh.add(token_id)
+        self.logger.info("Revoked share token %s", token_id)
+
+    def _refresh_if_stale(self):
+        """Reload the revoked ids once they are older than refresh_seconds.
+
+        One caller queries the database, outside the lock, while the others keep reading
+        the current set; they only wait for it before the first load. The new set is then
+        swapped in whole, with the revocations made during the query added back.
+        """
+        if self._is_fresh():
+            return
+        with self._refreshed:
+            while self._refreshing and self._loaded_at is None:
+                self._refreshed.wait()
+            if self._refreshing or self._is_fresh():
+                return
+            self._refreshing = True
+            self._revoked_during_refresh = set()
+
+        try:
+            token_ids = self._load()
+        except Exception:
+            with self._refreshed:
+                self._refreshing = False
+                self._refreshed.notify_all()
+            raise
+
+        with self._refreshed:
+            self._token_ids = token_ids | self._revoked_during_refresh
+            self._loaded_at = time.monotonic()
+            self._refreshing = False
+            self._refreshed.notify_all()
+
+    def _is_fresh(self):
+        loaded_at = self._loaded_at
+        return loaded_at is not None and time.monotonic() - loaded_at < self.refresh_seconds
+
+    @staticmethod
+    def _load():
+        rows = (read_db.query(RevokedShareToken)
+                .with_entities(RevokedShareToken.token_id)
+                .filter(RevokedShareToken.expiry_time > datetime.utcnow())
+                .all())
+        return {row.token_id for row in rows}
+
+revocation_list = RevocationList()
@@ -0,0 +1,61 @@
+import base64
+import hashlib
+import hmac
+import os
+import struct
+from datetime import datetime
+
+from app.config import Config
+
+# video id, expiry (unix seconds), random token id
+PAYLOAD_FORMAT = ">QI8s"
+SIGNATURE_SIZE = 16
+
+
+class InvalidShareTokenError(Exception):
+    pass
+
+
+class ShareTokenSigner:
+    """Self-contained share tokens: the video id and expiry are encoded in the token
+    and signed with the application secret, so checking one needs no database lookup.
+    """
+
+    def __init__(self, secret_key=None):
+        self.secret_key = (secret_key or Config.SECRET_KEY).encode()
+
+    def sign(self, video_id, expiry_time):
+        """Return a token granting access to video_id until expiry_time (UTC)."""
+        expiry = int((expiry_time - datetime(1970, 1, 1)).total_seconds())
+        payload = struct.pack(PAYLOAD_FORMAT, video_id, expiry, os.urandom(8))
+        return f"{self._encode(payload)}.{self._encode(self._signature(payload))}"
+
+    def verify(self, token):
+        """Return (video_id, expiry_time, token_id) for a token signed with this key."""
+        try:
+            encoded_payload, encoded_signature = token.split(".")
+            payload = self._decode(encoded_payload)
+            signature = self._decode(encoded_signature)
+            video_id, expiry, token_id = struct.unpack(PAYLOAD_FORMAT, payload)
+        except (ValueError, struct.error) as e:
+            raise InvalidShareTokenError(f"Malformed share token: {str(e)}")
+
+        if not hmac.compare_digest(signature, self._signature(payload)):
+            raise InvalidShareTokenError("Share token signature does not match")
+        return video_id, datetime.utcfromtimestamp(expiry), token_id.hex()
+
+    @staticmethod
+    def is_signed(token):
+        """Signed tokens are two dot-separated parts; database tokens are plain hex digests."""
+        return "." in token
+
+    def _signature(self, payload):
+        return hmac.new(self.secret_key, b"share:" + payload, hashlib.sha256).digest()[:SIGNATURE_SIZE]
+
+    @staticmethod
+    def _encode(data):
+        return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+    @staticmethod
+    def _decode(text):
+        return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
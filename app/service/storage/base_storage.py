@@ -0,0 +1,36 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+
+class Storage(ABC):
+    """Where video files and their renditions live.
+
+    Processing always happens on local working files: outputs are handed over with
+    `save_file`, which returns the location to record on the Video, and inputs are
+    read through `local_copy`, which yields a local path for that location.
+    """
+
+    @abstractmethod
+    def save_file(self, local_path, key):
+        """Persist a local working file under key and return its storage location."""
+
+    @abstractmethod
+    @contextmanager
+    def local_copy(self, location):
+        """Yield a local path holding the file at location for the duration of the block."""
+
+    @abstractmethod
+    def download_file(self, location, local_path):
+        """Copy the file at location to local_path and return its size in bytes."""
+
+    @abstractmethod
+    def iter_chunks(self, location, chunk_size=1024 * 1024):
+        """Yield the file content in chunks, for serving it."""
+
+    @abstractmethod
+    def size(self, location):
+        """Return the size of the stored file in bytes."""
+
+    @abstractmethod
+    def delete(self, location):
+        """Delete the stored file if it exists."""
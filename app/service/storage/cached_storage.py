@@ -0,0 +1,224 @@
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+from app.config import Config
+from app.metrics import metrics
+from app.service.storage.base_storage import Storage
+
+cache_hits = metrics.counter("storage_cache_hits_total", "Local copies served from the disk cache")
+cache_misses = metrics.counter("storage_cache_misses_total", "Local copies that had to be fetched from remote storage")
+cache_bytes_fetched = metrics.counter("storage_cache_fetched_bytes_total", "Bytes downloaded into the disk cache")
+cache_evictions = metrics.counter("storage_cache_evictions_total", "Files evicted from the disk cache")
+cache_size = metrics.gauge("storage_cache_bytes", "Bytes currently held in the disk cache")
+
+
+class CacheEntry:
+    def __init__(self, path, size):
+        self.path = path
+        self.size = size
+        self.pins = 0
+
+
+class CachedStorage(Storage):
+    """Local disk cache in front of a remote storage backend.
+
+    Local copies are served from the cache when present (least recently used files
+    are evicted once max_bytes is exceeded), files in use by a running job are
+    pinned so they are never evicted under it, and concurrent requests for the same
+    location share a single download. Files saved through the cache are kept in it,
+    since the jobs that follow an upload read them straight back.
+    """
+
+    def __init__(self, remote, cache_dir=None, max_bytes=None):
+        self.logger = logging.getLogger(__name__)
+        self.remote = remote
+        self.max_bytes = max_bytes if max_bytes is not None else Config.STORAGE_CACHE_MAX_BYTES
+        # Each process keeps its own index, so it gets its own directory
+        cache_root = cache_dir or Config.STORAGE_CACHE_DIR
+        self.cache_dir = os.path.join(cache_root, str(os.getpid()))
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir)
+        self._remove_stale_dirs(cache_root)
+
+        self._entries = OrderedDict()
+        self._fetches = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def _remove_stale_dirs(self, cache_root):
+        """Delete the directories left behind by processes that are no longer running."""
+        with os.scandir(cache_root) as entries:
+            for entry in entries:
+                if not entry.name.isdigit() or not entry.is_dir(follow_symlinks=False):
+                    continue
+                if int(entry.name) == os.getpid() or self._is_running(int(entry.name)):
+                    continue
+                shutil.rmtree(entry.path, ignore_errors=True)
+                self.logger.info("Removed cache directory %s of exited process", entry.path)
+
+    @staticmethod
+    def _is_running(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True  # Running as another user
+        return True
+
+    def save_file(self, local_path, key):
+        staged_path = os.path.join(self.cache_dir, f"{uuid.uuid4()}.saving")
+        self._link_or_copy(local_path, staged_path)
+        try:
+            location = self.remote.save_file(local_path, key)
+        except Exception:
+            os.remove(staged_path)
+            raise
+
+        cache_path = self._cache_path(location)
+        os.replace(staged_path, cache_path)
+        with self._lock:
+            self._add_entry(location, CacheEntry(cache_path, os.path.getsize(cache_path)))
+            self._evict()
+        return location
+
+    @contextmanager
+    def local_copy(self, location):
+        entry = self._acquire(location)
+        try:
+            yield entry.path
+        finally:
+            with self._lock:
+                entry.pins -= 1
+                self._evict()
+
+    def _acquire(self, location):
+        """Return the pinned cache entry for location, fetching it once if it is missing."""
+        while True:
+            with self._lock:
+                entry = self._entries.get(location)
+                if entry is not None:
+                    self._entries.move_to_end(location)
+                    entry.pins += 1
+                    cache_hits.inc()
+                    return entry
+                fetch = self._fetches.get(location)
+                if fetch is None:
+                    fetch = self._fetches[location] = Future()
+                    break
+            # Another job is downloading this location: wait for it, then take the cached entry
+            fetch.result()
+
+        cache_misses.inc()
+        try:
+            entry = self._fetch(location)
+        except Exception as e:
+            with self._lock:
+                del self._fetches[location]
+            fetch.set_exception(e)
+            raise
+
+        with self._lock:
+            entry.pins += 1
+            self._add_entry(location, entry)
+            del self._fetches[location]
+            self._evict()
+        fetch.set_result(None)
+        return entry
+
+    def _fetch(self, location):
+        """Download location from remote storage into the cache directory."""
+        cache_path = self._cache_path(location)
+        file_size = self.remote.download_file(location, cache_path)
+        cache_bytes_fetched.inc(file_size)
+        return CacheEntry(cache_path, file_size)
+
+    def _add_entry(self, location, entry):
+        previous = self._entries.pop(location, None)
+        if previous is not None:
+            self._total_bytes -= previous.size
+        self._entries[location] = entry
+        self._total_bytes += entry.size
+        cache_size.set(self._total_bytes)
+
+    def _evict(self):
+        """Remove least recently used, unpinned files until the cache fits max_bytes (lock held)."""
+        for location in list(self._entries):
+            if self._total_bytes <= self.max_bytes:
+                break
+            entry = self._entries[location]
+            if entry.pins > 0:
+                continue
+            self._remove_entry(location)
+            cache_evictions.inc()
+        cache_size.set(self._total_bytes)
+
+    def _remove_entry(self, location):
+        entry = self._entries.pop(location)
+        self._total_bytes -= entry.size
+        if os.path.exists(entry.path):
+            os.remove(entry.path)
+
+    def iter_chunks(self, location, chunk_size=1024 * 1024):
+        with self._lock:
+            entry = self._entries.get(location)
+        if entry is None:
+            return self.remote.iter_chunks(location, chunk_size)
+        return self._iter_cached_chunks(location, chunk_size)
+
+    def _iter_cached_chunks(self, location, chunk_size):
+        with self.local_copy(location) as local_path:
+            with open(local_path, "rb") as cached_file:
+                while True:
+                    chunk = cached_file.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+
+    def download_file(self, location, local_path):
+        with self.local_copy(location) as cached_path:
+            shutil.copyfile(cached_path, local_path)
+        return os.path.getsize(local_path)
+
+    def size(self, location):
+        return self.remote.size(location)
+
+    def delete(self, location):
+        with self._lock:
+            if location in self._entries:
+                self._remove_entry(location)
+                cache_size.set(self._total_bytes)
+        self.remote.delete(location)
+
+    def stats(self):
+        """Cache effectiveness since the process started."""
+        hits, misses = cache_hits.value(), cache_misses.value()
+        with self._lock:
+            return {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+                "bytes_fetched": cache_bytes_fetched.value(),
+                "evictions": cache_evictions.value(),
+                "cached_bytes": self._total_bytes,
+                "cached_files": len(self._entries)
+            }
+
+    def _cache_path(self, location):
+        extension = os.path.splitext(location)[1]
+        return os.path.join(self.cache_dir, hashlib.sha1(location.encode()).hexdigest() + extension)
+
+    @staticmethod
+    def _link_or_copy(source_path, target_path):
+        """Hard-link when possible so keeping a saved file in the cache costs no copy."""
+        try:
+            os.link(source_path, target_path)
+        except OSError:
+            shutil.copyfile(source_path, target_path)
@@ -0,0 +1,46 @@
+import logging
+import os
+import shutil
+from contextlib import contextmanager
+
+from app.service.storage.base_storage import Storage
+
+
+class LocalStorage(Storage):
+    """Files stay on the local filesystem; locations are plain paths under the root directory."""
+
+    def __init__(self, root):
+        self.logger = logging.getLogger(__name__)
+        self.root = root
+
+    def save_file(self, local_path, key):
+        """Working files are written in the root already, so they are kept where they are."""
+        location = os.path.join(self.root, key)
+        if os.path.abspath(local_path) != os.path.abspath(location):
+            os.replace(local_path, location)
+            self.logger.info("Moved %s to %s", local_path, location)
+        return location
+
+    @contextmanager
+    def local_copy(self, location):
+        yield location
+
+    def download_file(self, location, local_path):
+        shutil.copyfile(location, local_path)
+        return os.path.getsize(local_path)
+
+    def iter_chunks(self, location, chunk_size=1024 * 1024):
+        with open(location, "rb") as stored_file:
+            while True:
+                chunk = stored_file.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    def size(self, location):
+        return os.path.getsize(location)
+
+    def delete(self, location):
+        if os.path.exists(location):
+            os.remove(location)
+            self.logger.info("Deleted %s", location)
@@ -0,0 +1,146 @@
+import logging
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from app.config import Config
+from app.service.storage.base_storage import Storage
+
+S3_SCHEME = "s3://"
+
+
+class S3Storage(Storage):
+    """Files live in an S3-compatible bucket; locations are s3://bucket/key URIs.
+
+    Objects above the multipart threshold are uploaded as parts and downloaded as
+    byte ranges, both spread over a bounded pool of threads.
+    """
+
+    def __init__(self, bucket=None, prefix=None, client=None, work_dir=None, multipart_threshold=None,
+                 part_size=None, max_concurrency=None):
+        self.logger = logging.getLogger(__name__)
+        self.bucket = bucket or Config.S3_BUCKET
+        self.prefix = Config.S3_PREFIX if prefix is None else prefix
+        self.client = client or self._create_client()
+        self.work_dir = work_dir or Config.VIDEO_DIR
+        self.multipart_threshold = multipart_threshold or Config.S3_MULTIPART_THRESHOLD
+        self.part_size = part_size or Config.S3_PART_SIZE
+        self.max_concurrency = max_concurrency or Config.S3_MAX_CONCURRENCY
+
+    @staticmethod
+    def _create_client():
+        """Create a boto3 client; credentials come from the standard AWS environment."""
+        import boto3
+
+        return boto3.client("s3", endpoint_url=Config.S3_ENDPOINT_URL, region_name=Config.S3_REGION)
+
+    def save_file(self, local_path, key):
+        """Upload the working file, then remove the local copy."""
+        object_key = f"{self.prefix}{key}"
+        file_size = os.path.getsize(local_path)
+        if file_size < self.multipart_threshold:
+            with open(local_path, "rb") as local_file:
+                self.client.put_object(Bucket=self.bucket, Key=object_key, Body=local_file)
+        else:
+            self._multipart_upload(local_path, object_key, file_size)
+
+        os.remove(local_path)
+        location = f"{S3_SCHEME}{self.bucket}/{object_key}"
+        self.logger.info("Uploaded %s (%s bytes) to %s", local_path, file_size, location)
+        return location
+
+    def _multipart_upload(self, local_path, object_key, file_size):
+        """Upload the file as parts in parallel; the upload is aborted if any part fails."""
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=object_key)["UploadId"]
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                parts = list(executor.map(
+                    lambda part: self._upload_part(local_path, object_key, upload_id, *part),
+                    enumerate(self._part_ranges(file_size), start=1)
+                ))
+            self.client.complete_multipart_upload(Bucket=self.bucket, Key=object_key, UploadId=upload_id,
+                                                  MultipartUpload={"Parts": parts})
+        except Exception:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=object_key, UploadId=upload_id)
+            raise
+
+    def _upload_part(self, local_path, object_key, upload_id, part_number, part_range):
+        """Read and upload a single part; only one part per worker is held in memory."""
+        offset, length = part_range
+        with open(local_path, "rb") as local_file:
+            local_file.seek(offset)
+            body = local_file.read(length)
+        response = self.client.upload_part(Bucket=self.bucket, Key=object_key, UploadId=upload_id,
+                                           PartNumber=part_number, Body=body)
+        return {"ETag": response["ETag"], "PartNumber": part_number}
+
+    def _part_ranges(self, file_size):
+        """(offset, length) of every part; all but the last are part_size long."""
+        return [(offset, min(self.part_size, file_size - offset)) for offset in range(0, file_size, self.part_size)]
+
+    def download_file(self, location, local_path):
+        """Download the object to local_path, in parallel byte ranges for large objects."""
+        object_key = self._object_key(location)
+        file_size = self.size(location)
+        partial_path = f"{local_path}.part"
+        try:
+            if file_size < self.multipart_threshold:
+                response = self.client.get_object(Bucket=self.bucket, Key=object_key)
+                with open(partial_path, "wb") as local_file:
+                    shutil.copyfileobj(response["Body"], local_file)
+            else:
+                with open(partial_path, "wb") as local_file:
+                    local_file.truncate(file_size)
+                with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                    list(executor.map(lambda part: self._download_range(object_key, partial_path, *part),
+                                      self._part_ranges(file_size)))
+            os.replace(partial_path, local_path)
+        except Exception:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+        self.logger.info("Downloaded %s (%s bytes) to %s", location, file_size, local_path)
+        return file_size
+
+    def _download_range(self, object_key, local_path, offset, length):
+        """Fetch one byte range and write it at its offset."""
+        response = self.client.get_object(Bucket=self.bucket, Key=object_key,
+                                          Range=f"bytes={offset}-{offset + length - 1}")
+        with open(local_path, "r+b") as local_file:
+            local_file.seek(offset)
+            shutil.copyfileobj(response["Body"], local_file)
+
+    @contextmanager
+    def local_copy(self, location):
+        """Download to a temporary working file that is removed after the block."""
+        temp_dir = tempfile.mkdtemp(dir=self.work_dir)
+        local_path = os.path.join(temp_dir, os.path.basename(self._object_key(location)))
+        try:
+            self.download_file(location, local_path)
+            yield local_path
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def iter_chunks(self, location, chunk_size=1024 * 1024):
+        response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(location))
+        while True:
+            chunk = response["Body"].read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+    def size(self, location):
+        return self.client.head_object(Bucket=self.bucket, Key=self._object_key(location))["ContentLength"]
+
+    def delete(self, location):
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(location))
+        self.logger.info("Deleted %s", location)
+
+    def _object_key(self, location):
+        """Extract the object key from an s3://bucket/key location of this bucket."""
+        bucket_prefix = f"{S3_SCHEME}{self.bucket}/"
+        if not location.startswith(bucket_prefix):
+            raise ValueError(f"Location {location} is not in bucket {self.bucket}")
+        return location[len(bucket_prefix):]
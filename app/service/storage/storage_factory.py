@@ -0,0 +1,32 @@
+import threading
+
+from app.config import Config
+from app.service.storage.local_storage import LocalStorage
+
+_shared_storage = None
+_lock = threading.Lock()
+
+
+def get_storage(video_dir=None):
+    """Return the configured storage backend.
+
+    Local storage is rooted at the given working directory; the remote backend is
+    shared by the whole process so its client, connection pool and disk cache are
+    reused.
+    """
+    if Config.STORAGE_BACKEND == "local":
+        return LocalStorage(video_dir or Config.VIDEO_DIR)
+    if Config.STORAGE_BACKEND != "s3":
+        raise ValueError(f"Unknown storage backend {Config.STORAGE_BACKEND}")
+
+    global _shared_storage
+    with _lock:
+        if _shared_storage is None:
+            from app.service.storage.s3_storage import S3Storage
+
+            _shared_storage = S3Storage()
+            if Config.STORAGE_CACHE_MAX_BYTES > 0:
+                from app.service.storage.cached_storage import CachedStorage
+
+                _shared_storage = CachedStorage(_shared_storage)
+        return _shared_storage
@@ -1,20 +1,44 @@
 import logging
-import os
-from app.constants import SHARE_DURATION
-from app.exceptions.video_exceptions import VideoValidationException, VideoProcessingException, VideoNotFoundException
-from app.extension import db
-from app.service.processor.video_processor import VideoProcessor
+from app.config import Config
+from app.constants import SHARE_DURATION, MAX_BATCH_IDS, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, MAX_BULK_SHARE_IDS
+from app.exceptions.video_exceptions import VideoValidationException, VideoProcessingException, VideoNotFoundException, \
+    VideoOperationCancelledException
+from app.extension import db, read_db, background_worker, video_cache, share_cache
+from app.metrics.instrumentation import timed
+from app.service.processor.ffmpeg_runner import FFmpegRunner
+from app.service.processor.video_processor import PREVIEW_PREFIX, VideoProcessor
+from app.service.share.revocation_list import revocation_list
+from app.service.share.share_token_signer import ShareTokenSigner, InvalidShareTokenError
 from app.service.validator.video_validator import VideoValidator
+from app.service.worker.share_reaper import share_rows
 from app.videos.models import Video, VideoShare
-import hashlib
+import base64
+import itertools
+import os
+import re
+import secrets
+import time
+from collections import namedtuple
 from datetime import datetime, timedelta
 from flask import url_for
+from sqlalchemy import insert, select, tuple_
+
+# Columns of the video details responses, selected directly so rows are never loaded as ORM objects
+VIDEO_METADATA_COLUMNS = (Video.id, Video.filename, Video.size, Video.duration, Video.file_path, Video.proxy_path)
+
+# What the share cache keeps of a VideoShare row
+VideoShareRecord = namedtuple("VideoShareRecord", ["video_id", "expiry_time"])
+
+# Preview renders are named with the preview prefix, a UUID and the source's extension
+PREVIEW_NAME_PATTERN = re.compile(re.escape(PREVIEW_PREFIX)
+                                  + r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\.[A-Za-z0-9]+")
 
 
 class VideoService:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
 
+    @timed("service.upload")
     def upload_video(self, file):
         """Upload a new video"""
         try:
@@ -26,88 +50,233 @@ class VideoService:
         except VideoValidationException as e:
             raise e
         except Exception as e:
-            self.logger.error(f"Unexpected error: {str(e)}")
+            self.logger.error("Unexpected error: %s", e)
             raise VideoProcessingException(str(e))
 
+        self._schedule_renditions(video)
         return {"message": "Video uploaded successfully", "video_id": video.id}
 
+    @timed("service.process_upload")
     def _process_video_upload(self, file):
         """Process the video file"""
-        self.logger.info(f"Processing video for file: {file.filename}")
+        self.logger.info("Processing video for file: %s", file.filename)
         try:
             video_processor = VideoProcessor()
             return video_processor.process_upload(file)
         except Exception as e:
-            self.logger.error(f"Processing error: {str(e)}")
+            self.logger.error("Processing error: %s", e)
             raise VideoProcessingException(str(e))
 
+    @timed("service.validate")
     def _validate_video(self, video):
         """Validate the uploaded video"""
-        self.logger.info(f"Validating video for file: {video.filename}")
+        self.logger.info("Validating video for file: %s", video.filename)
         validator = VideoValidator(video)
         validation_err = validator.validate()
         if validation_err:
-            self.logger.error(f"Validation error: {validation_err}")
-            os.remove(video.file_path)
+            self.logger.error("Validation error: %s", validation_err)
+            VideoProcessor().delete_file(video.file_path)
             raise VideoValidationException(validation_err)
 
+    @timed("db.save_video")
     def _save_video_to_db(self, video):
         """Save the video record to the database"""
         try:
-            self.logger.info(f"Saving video for file: {video.filename}")
+            self.logger.info("Saving video for file: %s", video.filename)
             db.session.add(video)
             db.session.commit()
+            video_cache.invalidate(video.id)
         except Exception as e:
             db.session.rollback()
-            self.logger.error(f"Database error: {str(e)}")
+            self.logger.error("Database error: %s", e)
+            self._delete_unsaved_files(video)
             raise VideoProcessingException(f"Database error: {str(e)}")
 
+    def _delete_unsaved_files(self, video):
+        """Delete the files stored for a video whose row was not saved; the storage reconciler catches any missed"""
+        video_processor = VideoProcessor()
+        for location in {video.file_path, video.waveform_path, video.mezzanine_path} - {None}:
+            try:
+                video_processor.delete_file(location)
+            except Exception as e:
+                self.logger.error("Could not delete unsaved file %s: %s", location, e)
+
+    @timed("service.get_video")
     def get_video(self, video_id):
         """Retrieve video details by ID"""
-        video = self._get_video_from_db(video_id)
+        return dict(self._get_video_metadata(video_id))
+
+    def _get_video_metadata(self, video_id):
+        """Resolve the details of a video, from the metadata cache when possible"""
+        video_metadata = video_cache.get(video_id)
+        if video_metadata is None:
+            video = self._get_video_from_db(video_id, read_only=True)
+            video_metadata = {
+                "id": video.id,
+                "filename": video.filename,
+                "size": video.size,
+                "duration": video.duration,
+                "file_path": video.file_path,
+                "proxy_path": video.proxy_path
+            }
+            video_cache.set(video_id, video_metadata)
+        return video_metadata
+
+    @timed("service.get_videos")
+    def get_videos(self, video_ids):
+        """Retrieve the details of many videos, fetching the uncached ones in a single query"""
+        video_ids = self._parse_video_ids(video_ids)
+        unique_ids = list(dict.fromkeys(video_ids))
+        videos = {}
+        for video_id in unique_ids:
+            video_metadata = video_cache.get(video_id)
+            if video_metadata is not None:
+                videos[video_id] = video_metadata
+
+        missing_ids = [video_id for video_id in unique_ids if video_id not in videos]
+        if missing_ids:
+            self.logger.info("Fetching videos for IDs: %s", missing_ids)
+            query = select(*VIDEO_METADATA_COLUMNS).where(Video.id.in_(missing_ids))
+            rows = read_db.session.execute(query).mappings()
+            for row in rows:
+                videos[row["id"]] = dict(row)
+                video_cache.set(row["id"], videos[row["id"]])
+
         return {
-            "id": video.id,
-            "filename": video.filename,
-            "size": video.size,
-            "duration": video.duration,
-            "file_path": video.file_path
+            "videos": [dict(videos[video_id]) for video_id in video_ids if video_id in videos],
+            "not_found": [video_id for video_id in unique_ids if video_id not in videos]
         }
 
-    def _get_video_from_db(self, video_id):
-        """Retrieve video from DB by ID"""
-        self.logger.info(f"Fetching video for ID: {video_id}")
-        video = Video.query.get(video_id)
+    def _parse_video_ids(self, video_ids, max_ids=MAX_BATCH_IDS):
+        """Convert the requested IDs to integers, keeping their order and any repeats"""
+        try:
+            video_ids = [int(video_id) for video_id in video_ids]
+        except (TypeError, ValueError):
+            raise VideoValidationException("Video IDs must be integers")
+        if not video_ids:
+            raise VideoValidationException("At least one video ID is required")
+        if len(video_ids) > max_ids:
+            raise VideoValidationException(f"At most {max_ids} video IDs can be requested at once")
+        return video_ids
+
+    @timed("service.list_videos")
+    def list_videos(self, after=None, limit=DEFAULT_PAGE_SIZE):
+        """List videos oldest first, one page at a time.
+
+        Pages are keyed on (created_at, id) rather than an offset, so each one is a
+        range scan of the composite index however deep the client pages.
+        """
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise VideoValidationException(f"Invalid limit {limit}, expected 1 to {MAX_PAGE_SIZE}")
+
+        query = select(*VIDEO_METADATA_COLUMNS, Video.created_at).order_by(Video.created_at, Video.id)
+        if after:
+            query = query.where(tuple_(Video.created_at, Video.id) > self._decode_cursor(after))
+        rows = read_db.session.execute(query.limit(limit + 1)).mappings().all()
+
+        page, next_row = rows[:limit], rows[limit] if len(rows) > limit else None
+        videos = [dict(row, created_at=row["created_at"].isoformat()) for row in page]
+        return {
+            "videos": videos,
+            # The next page starts after the last row of this one
+            "next_cursor": self._encode_cursor(page[-1]["created_at"], page[-1]["id"]) if next_row else None
+        }
+
+    @staticmethod
+    def _encode_cursor(created_at, video_id):
+        return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{video_id}".encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor):
+        try:
+            created_at, video_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+            return datetime.fromisoformat(created_at), int(video_id)
+        except (ValueError, UnicodeDecodeError):
+            raise VideoValidationException("Invalid pagination cursor")
+
+    def get_video_content(self, video_id):
+        """Stream the stored file of a video"""
+        video = self._get_video_from_db(video_id, read_only=True)
+        try:
+            video_processor = VideoProcessor()
+            chunks = video_processor.iter_file(video.file_path)
+            # Read the first chunk now so a missing or unreadable file fails before the response starts
+            first_chunk = next(chunks, b"")
+            return {"filename": video.filename, "size": video.size, "chunks": itertools.chain([first_chunk], chunks)}
+        except Exception as e:
+            self.logger.error("Processing error while reading video: %s", e)
+            raise VideoProcessingException(str(e))
+
+    @timed("db.get_video")
+    def _get_video_from_db(self, video_id, read_only=False):
+        """Retrieve video from DB by ID, through the read-only session for GET paths"""
+        self.logger.info("Fetching video for ID: %s", video_id)
+        video = (read_db.query(Video) if read_only else Video.query).get(video_id)
         if not video:
-            self.logger.error(f"Video not found for ID: {video_id}")
+            self.logger.error("Video not found for ID: %s", video_id)
             raise VideoNotFoundException(f"Video not found for ID: {video_id}")
         return video
 
-    def trim_video(self, video_id, start, end):
+    @timed("service.trim")
+    def trim_video(self, video_id, start, end, preview=False):
         """Trim the video to the given start and end times"""
+        start, end = self._to_seconds(start), self._to_seconds(end)
         video = self._get_video_from_db(video_id)
-        trimmed_video = self._process_video_trim(video, start, end)
+        trimmed_video = self._process_video_trim(video, start, end, preview)
+        if preview:
+            return self._preview_response("Video trim preview generated successfully", trimmed_video)
+
+        trimmed_video.waveform_path = self._derive_trim_waveform(video, trimmed_video, start, end)
+        trimmed_video.scenes = self._derive_trim_scenes(video, start, end)
         self._save_video_to_db(trimmed_video)
+        self._schedule_renditions(trimmed_video)
         return {"message": "Video trimmed successfully", "video_id": trimmed_video.id}
 
-    def _process_video_trim(self, video, start, end):
+    @staticmethod
+    def _to_seconds(time):
+        """Seconds from a number or an 'HH:MM:SS', 'MM:SS' or 'SS' string (fractions allowed), as moviepy
+        accepts them, so every later step of a trim works on numbers"""
+        if isinstance(time, bool):
+            raise VideoValidationException(f"Invalid time: {time}")
+        if isinstance(time, (int, float)):
+            return time
+        try:
+            parts = [float(part.replace(",", ".")) for part in time.split(":")] if isinstance(time, str) else None
+        except ValueError:
+            parts = None
+        if not parts or len(parts) > 3:
+            raise VideoValidationException(f"Invalid time: {time}")
+        return sum(part * 60 ** power for power, part in enumerate(reversed(parts)))
+
+    def _process_video_trim(self, video, start, end, preview=False):
         """Trim the video file"""
         try:
-            self.logger.info(f"Processing video for trimming: {video.id}")
+            self.logger.info("Processing video for trimming: %s (preview=%s)", video.id, preview)
             video_processor = VideoProcessor()
-            return video_processor.trim_video_file(video, start, end)
+            return video_processor.trim_video_file(video, start, end, preview=preview)
+        except VideoOperationCancelledException as e:
+            self.logger.info("%s", e.message)
+            raise e
         except Exception as e:
-            self.logger.error(f"Processing error while trimming: {str(e)}")
+            self.logger.error("Processing error while trimming: %s", e)
             raise VideoProcessingException(str(e))
 
-    def merge_videos(self, video_ids):
+    @timed("service.merge")
+    def merge_videos(self, video_ids, preview=False):
         """Merge multiple videos into one"""
         self._validate_video_ids(video_ids)
         if len(video_ids) == 1:
             raise VideoValidationException("At least 2 videos are required to merge")
 
         videos = self._get_videos_from_db(video_ids)
-        merged_video = self._process_video_merge(videos)
+        merged_video = self._process_video_merge(videos, preview)
+        if preview:
+            return self._preview_response("Videos merge preview generated successfully", merged_video)
+
+        merged_video.waveform_path = self._derive_merge_waveform(videos, merged_video)
+        merged_video.scenes = self._derive_merge_scenes(videos)
         self._save_video_to_db(merged_video)
+        self._schedule_renditions(merged_video)
         return {"message": "Videos merged successfully", "video_id": merged_video.id}
 
     def _validate_video_ids(self, video_ids):
@@ -115,73 +284,322 @@ class VideoService:
         video_validator = VideoValidator(None)
         validation_err = video_validator.validate_video_ids(video_ids)
         if validation_err:
-            self.logger.error(f"Validation error: {validation_err}")
+            self.logger.error("Validation error: %s", validation_err)
             raise VideoValidationException(validation_err)
 
+    @timed("db.get_videos")
     def _get_videos_from_db(self, video_ids):
         """Retrieve multiple videos from DB by IDs"""
         videos = Video.query.filter(Video.id.in_(video_ids)).all()
         if len(video_ids) != len(videos):
             found_video_ids = [video.id for video in videos]
             not_found_ids = [video_id for video_id in video_ids if video_id not in found_video_ids]
-            self.logger.error(f"Video not found Ids: {str(not_found_ids)}")
+            self.logger.error("Video not found Ids: %s", not_found_ids)
             raise VideoNotFoundException(f"Video not found Ids: {str(not_found_ids)}")
         return videos
 
-    def _process_video_merge(self, videos):
+    def _process_video_merge(self, videos, preview=False):
         """Merge video files"""
         try:
-            self.logger.info(f"Processing videos for merging: {[video.id for video in videos]}")
+            self.logger.info("Processing videos for merging: %s (preview=%s)", [video.id for video in videos], preview)
+            video_processor = VideoProcessor()
+            return video_processor.merge_video_files(videos, preview=preview)
+        except VideoOperationCancelledException as e:
+            self.logger.info("%s", e.message)
+            raise e
+        except Exception as e:
+            self.logger.error("Processing error while merging: %s", e)
+            raise VideoProcessingException(str(e))
+
+    def _preview_response(self, message, preview_video):
+        """Describe a preview render; previews are not persisted as videos and can be
+        fetched from preview_url until expiry_time"""
+        expiry_time = datetime.utcnow() + timedelta(seconds=Config.PREVIEW_TTL_SECONDS)
+        return {
+            "message": message,
+            "filename": preview_video.filename,
+            "size": preview_video.size,
+            "duration": preview_video.duration,
+            "preview_url": url_for('video_routes.get_preview', filename=preview_video.filename, _external=True),
+            "expiry_time": expiry_time
+        }
+
+    def get_preview_path(self, filename):
+        """Local path of a preview render that has not yet expired"""
+        file_path = os.path.join(Config.VIDEO_DIR, filename)
+        if PREVIEW_NAME_PATTERN.fullmatch(filename):
+            try:
+                if time.time() - os.path.getmtime(file_path) <= Config.PREVIEW_TTL_SECONDS:
+                    return file_path
+            except OSError:
+                pass
+        self.logger.error("Preview not found: %s", filename)
+        raise VideoNotFoundException(f"Preview not found: {filename}")
+
+    def _schedule_renditions(self, video):
+        """Queue background generation of the renditions derived from a saved video"""
+        background_worker.submit(self.generate_proxy, video.id)
+        if not video.waveform_path:
+            background_worker.submit(self.generate_waveform, video.id)
+        if video.scenes is None:
+            background_worker.submit(self.detect_scenes, video.id)
+        if Config.NORMALIZE_ON_UPLOAD and not video.mezzanine_path:
+            background_worker.submit(self.normalize_video, video.id)
+
+    @timed("service.generate_proxy")
+    def generate_proxy(self, video_id):
+        """Generate the low-resolution proxy rendition for a video and record it"""
+        video = self._get_video_from_db(video_id)
+        try:
+            self.logger.info("Generating proxy rendition for video: %s", video_id)
+            video_processor = VideoProcessor()
+            video.proxy_path = video_processor.generate_proxy(video)
+            db.session.commit()
+            video_cache.invalidate(video_id)
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error("Processing error while generating proxy: %s", e)
+            raise VideoProcessingException(str(e))
+
+    @timed("service.normalize")
+    def normalize_video(self, video_id):
+        """Convert a video once to the mezzanine profile so later trims and merges can stream-copy"""
+        video = self._get_video_from_db(video_id)
+        try:
+            self.logger.info("Normalizing video: %s", video_id)
+            video_processor = VideoProcessor()
+            video.mezzanine_path = video_processor.normalize_video(video)
+            video.mezzanine_profile = FFmpegRunner.get_mezzanine_profile()
+            db.session.commit()
+            video_cache.invalidate(video_id)
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error("Processing error while normalizing: %s", e)
+            raise VideoProcessingException(str(e))
+
+    @timed("service.generate_waveform")
+    def generate_waveform(self, video_id):
+        """Extract the audio peaks of a video once and record the sidecar"""
+        video = self._get_video_from_db(video_id)
+        try:
+            self.logger.info("Generating waveform for video: %s", video_id)
             video_processor = VideoProcessor()
-            return video_processor.merge_video_files(videos)
+            video.waveform_path = video_processor.generate_waveform(video)
+            db.session.commit()
+            video_cache.invalidate(video_id)
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error("Processing error while generating waveform: %s", e)
+            raise VideoProcessingException(str(e))
+
+    def _derive_trim_waveform(self, video, trimmed_video, start, end):
+        """Slice the source peaks for a trimmed video; None leaves it to background generation"""
+        if not video.waveform_path:
+            return None
+        try:
+            return VideoProcessor().slice_waveform(video, trimmed_video, start, end)
+        except Exception as e:
+            self.logger.error("Processing error while slicing waveform: %s", e)
+            return None
+
+    def _derive_merge_waveform(self, videos, merged_video):
+        """Join the source peaks for a merged video; None leaves it to background generation"""
+        if not all(video.waveform_path for video in videos):
+            return None
+        try:
+            return VideoProcessor().concatenate_waveforms(videos, merged_video)
+        except Exception as e:
+            self.logger.error("Processing error while joining waveforms: %s", e)
+            return None
+
+    @timed("service.get_waveform")
+    def get_waveform(self, video_id, level=0):
+        """Retrieve the waveform peaks of a video at the given zoom level"""
+        video = self._get_video_from_db(video_id, read_only=True)
+        if not video.waveform_path:
+            raise VideoNotFoundException(f"Waveform not available for video ID: {video_id}")
+
+        try:
+            sample_rate, levels = VideoProcessor().load_waveform(video)
         except Exception as e:
-            self.logger.error(f"Processing error while merging: {str(e)}")
+            self.logger.error("Processing error while reading waveform: %s", e)
             raise VideoProcessingException(str(e))
 
+        if not 0 <= level < len(levels):
+            raise VideoValidationException(f"Invalid waveform level {level}, expected 0 to {len(levels) - 1}")
+        samples_per_peak, peaks = levels[level]
+        return {
+            "sample_rate": sample_rate,
+            "samples_per_peak": samples_per_peak,
+            "levels": len(levels),
+            "peaks": peaks.tobytes()
+        }
+
+    @timed("service.detect_scenes")
+    def detect_scenes(self, video_id):
+        """Build the scene-change index of a video and record it"""
+        video = self._get_video_from_db(video_id)
+        try:
+            self.logger.info("Detecting scenes for video: %s", video_id)
+            video_processor = VideoProcessor()
+            video.scenes = video_processor.detect_scenes(video)
+            db.session.commit()
+            video_cache.invalidate(video_id)
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error("Processing error while detecting scenes: %s", e)
+            raise VideoProcessingException(str(e))
+
+    def _derive_trim_scenes(self, video, start, end):
+        """Keep the source boundaries inside the trimmed window; None leaves it to background detection"""
+        if video.scenes is None:
+            return None
+        from app.service.processor.scene_detector import SceneDetector
+        try:
+            return SceneDetector.slice_scenes(video.scenes, start, end)
+        except Exception as e:
+            self.logger.error("Processing error while slicing scenes: %s", e)
+            return None
+
+    def _derive_merge_scenes(self, videos):
+        """Shift the source boundaries into the merged timeline; None leaves it to background detection"""
+        if any(video.scenes is None for video in videos):
+            return None
+        from app.service.processor.scene_detector import SceneDetector
+        try:
+            return SceneDetector.concatenate_scenes([video.scenes for video in videos],
+                                                    [video.duration for video in videos])
+        except Exception as e:
+            self.logger.error("Processing error while joining scenes: %s", e)
+            return None
+
+    def get_scenes(self, video_id):
+        """Retrieve the scene boundary timestamps of a video"""
+        video = self._get_video_from_db(video_id, read_only=True)
+        if video.scenes is None:
+            raise VideoNotFoundException(f"Scene index not available for video ID: {video_id}")
+        return {"id": video.id, "scenes": video.scenes}
+
+    @timed("service.share")
     def generate_shareable_link(self, video_id, expiry_duration=SHARE_DURATION):
         """Generate a time-expiring shareable link for a video."""
         self._get_video_from_db(video_id)
         current_time = datetime.utcnow()
         expiry_time = current_time + timedelta(hours=expiry_duration)
 
-        token = self._generate_token(video_id, current_time)
-        self._save_shareable_link(video_id, token, expiry_time)
+        if Config.SHARE_TOKEN_MODE == 'signed':
+            # The token carries the video id and expiry itself, so nothing is stored
+            expiry_time = expiry_time.replace(microsecond=0)
+            token = ShareTokenSigner().sign(video_id, expiry_time)
+        else:
+            token = self._generate_token()
+            self._save_shareable_link(video_id, token, expiry_time)
 
         share_url = url_for('video_routes.get_video_from_shared_token', token=token, _external=True)
         return {"share_url": share_url, "expiry_time": expiry_time}
 
-    def _generate_token(self, video_id, current_time):
-        """Generate a unique token"""
-        return hashlib.sha256(f"{video_id}-{current_time.timestamp()}".encode()).hexdigest()
+    @timed("service.share_bulk")
+    def generate_shareable_links(self, video_ids, expiry_duration=SHARE_DURATION):
+        """Generate shareable links for many videos at once, one per requested ID in their order,
+        so an ID requested twice gets two links.
+
+        The videos are checked with one query and, in database mode, all share rows
+        are inserted in a single transaction: either every link is created or none.
+        """
+        video_ids = self._parse_video_ids(video_ids, max_ids=MAX_BULK_SHARE_IDS)
+        unique_ids = list(dict.fromkeys(video_ids))
+        found_ids = set(db.session.execute(select(Video.id).where(Video.id.in_(unique_ids))).scalars())
+        not_found_ids = [video_id for video_id in unique_ids if video_id not in found_ids]
+        if not_found_ids:
+            self.logger.error("Video not found Ids: %s", not_found_ids)
+            raise VideoNotFoundException(f"Video not found Ids: {str(not_found_ids)}")
+
+        expiry_time = datetime.utcnow() + timedelta(hours=expiry_duration)
+        if Config.SHARE_TOKEN_MODE == 'signed':
+            expiry_time = expiry_time.replace(microsecond=0)
+            signer = ShareTokenSigner()
+            tokens = [signer.sign(video_id, expiry_time) for video_id in video_ids]
+        else:
+            tokens = [self._generate_token() for _ in video_ids]
+            self._save_shareable_links(video_ids, tokens, expiry_time)
+
+        shares = [
+            {
+                "video_id": video_id,
+                "share_url": url_for('video_routes.get_video_from_shared_token', token=token, _external=True)
+            }
+            for video_id, token in zip(video_ids, tokens)
+        ]
+        return {"shares": shares, "expiry_time": expiry_time}
 
+    def _generate_token(self):
+        """Generate a unique token from the OS random source, so concurrent links never collide"""
+        return secrets.token_hex(32)
+
+    @timed("db.save_share")
     def _save_shareable_link(self, video_id, token, expiry_time):
         """Save the shareable link in the database"""
         try:
-            self.logger.info(f"Saving shareable video for video: {video_id} with token {token}")
+            self.logger.info("Saving shareable video for video: %s with token %s", video_id, token)
             video_share = VideoShare(video_id=video_id, token=token, expiry_time=expiry_time)
             db.session.add(video_share)
             db.session.commit()
+            share_rows.inc()
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error("Database error: %s", e)
+            raise VideoProcessingException(f"Database error: {str(e)}")
+
+    @timed("db.save_shares")
+    def _save_shareable_links(self, video_ids, tokens, expiry_time):
+        """Save many shareable links in one transaction"""
+        try:
+            self.logger.info("Saving %s shareable links", len(tokens))
+            created_at = datetime.utcnow()
+            db.session.execute(insert(VideoShare), [
+                {"video_id": video_id, "token": token, "expiry_time": expiry_time, "created_at": created_at}
+                for video_id, token in zip(video_ids, tokens)
+            ])
+            db.session.commit()
+            share_rows.inc(len(tokens))
         except Exception as e:
             db.session.rollback()
-            self.logger.error(f"Database error: {str(e)}")
+            self.logger.error("Database error: %s", e)
             raise VideoProcessingException(f"Database error: {str(e)}")
 
+    @timed("service.get_shared_video")
     def get_shared_video_from_token(self, token):
         """Handle access to shareable video links."""
-        video_share = self._get_video_share_by_token(token)
-        self._check_link_expiry(video_share)
-        video = Video.query.get(video_share.video_id)
+        if ShareTokenSigner.is_signed(token):
+            video_id = self._verify_signed_token(token)
+        else:
+            video_id = self._get_shared_video_id(token)
+        video_metadata = self._get_video_metadata(video_id)
         return {
-            "id": video.id,
-            "filename": video.filename,
-            "size": video.size,
-            "duration": video.duration,
-            "file_path": video.file_path
+            "id": video_metadata["id"],
+            "filename": video_metadata["filename"],
+            "size": video_metadata["size"],
+            "duration": video_metadata["duration"],
+            "file_path": video_metadata["file_path"]
         }
 
-    def _get_video_share_by_token(self, token):
+    def _get_shared_video_id(self, token):
+        """Resolve a database token to its video ID, caching the share record until it expires"""
+        video_share = share_cache.get(token)
+        if video_share is None:
+            video_share = self._get_video_share_by_token(token, read_only=True)
+            ttl_seconds = (video_share.expiry_time - datetime.utcnow()).total_seconds()
+            video_share = VideoShareRecord(video_share.video_id, video_share.expiry_time)
+            share_cache.set(token, video_share, ttl_seconds=ttl_seconds)
+        # Checked on every hit as well, so a cached share is never served past its expiry
+        self._check_link_expiry(video_share)
+        return video_share.video_id
+
+    @timed("db.get_share")
+    def _get_video_share_by_token(self, token, read_only=False):
         """Retrieve the VideoShare object from the database"""
-        video_share = VideoShare.query.filter_by(token=token).first()
+        query = read_db.query(VideoShare) if read_only else VideoShare.query
+        video_share = query.filter_by(token=token).first()
         if not video_share:
             raise VideoNotFoundException(f"No shared video found with token {token}")
         return video_share
@@ -190,3 +608,40 @@ class VideoService:
         """Check if the shareable link has expired"""
         if video_share.expiry_time < datetime.utcnow():
             raise VideoValidationException("The shared URL has expired")
+
+    def _verify_signed_token(self, token):
+        """Check the signature, expiry and revocation of a signed token and return its video ID"""
+        try:
+            video_id, expiry_time, token_id = ShareTokenSigner().verify(token)
+        except InvalidShareTokenError as e:
+            self.logger.warning("Rejected share token: %s", e)
+            raise VideoNotFoundException(f"No shared video found with token {token}")
+        if expiry_time < datetime.utcnow():
+            raise VideoValidationException("The shared URL has expired")
+        if revocation_list.is_revoked(token_id):
+            raise VideoNotFoundException(f"No shared video found with token {token}")
+        return video_id
+
+    @timed("service.revoke_share")
+    def revoke_shareable_link(self, token):
+        """Invalidate a shareable link before it expires."""
+        try:
+            if ShareTokenSigner.is_signed(token):
+                try:
+                    _, expiry_time, token_id = ShareTokenSigner().verify(token)
+                except InvalidShareTokenError:
+                    raise VideoNotFoundException(f"No shared video found with token {token}")
+                revocation_list.revoke(token_id, expiry_time)
+            else:
+                video_share = self._get_video_share_by_token(token)
+                db.session.delete(video_share)
+                db.session.commit()
+                share_rows.dec()
+                share_cache.invalidate(token)
+        except VideoNotFoundException as e:
+            raise e
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error("Database error: %s", e)
+            raise VideoProcessingException(f"Database error: {str(e)}")
+        return {"message": "Shared link revoked"}
@@ -0,0 +1,47 @@
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import Config
+from app.logging import current_job_id
+from app.tracing import tracer
+
+
+class BackgroundWorker:
+    def __init__(self, max_workers=None):
+        self.logger = logging.getLogger(__name__)
+        self.max_workers = max_workers or Config.BACKGROUND_WORKERS
+        self.app = None
+        self._executor = None
+
+    def init_app(self, app):
+        """Bind the worker to the app and start the bounded thread pool."""
+        self.app = app
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="video-worker")
+
+    def submit(self, fn, *args, **kwargs):
+        """Run the job in the background inside an app context, as part of the submitter's trace."""
+        if self._executor is None:
+            self.logger.warning("Background worker is not initialised, skipping job %s", fn.__name__)
+            return None
+        span = tracer.current_span()
+        parent = span.context() if span is not None else None
+        return self._executor.submit(self._run, parent, fn, *args, **kwargs)
+
+    def _run(self, parent, fn, *args, **kwargs):
+        """Execute a job and log any failure, since nobody waits on the result."""
+        token = current_job_id.set(uuid.uuid4().hex[:16])
+        with self.app.app_context(), tracer.trace(f"job {fn.__name__}", parent=parent):
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                self.logger.error("Background job %s failed: %s", fn.__name__, e)
+                raise
+            finally:
+                current_job_id.reset(token)
+
+    def shutdown(self, wait=True):
+        """Stop accepting jobs and optionally wait for queued ones to finish."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
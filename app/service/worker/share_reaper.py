@@ -0,0 +1,103 @@
+import logging
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import delete, func, select
+
+from app.config import Config
+from app.extension import db
+from app.metrics import metrics
+from app.videos.models import VideoShare, RevokedShareToken, IdempotencyKey
+
+shares_reaped = metrics.counter("video_shares_reaped_total", "Expired share rows deleted by the reaper")
+share_rows = metrics.gauge("video_shares_rows", "Rows in the video_shares table: the last count, kept up to date by "
+                                                "this process's creations, revocations and reaps")
+
+
+class ShareReaper:
+    """Periodically deletes expired share links, revocations of expired signed tokens and
+    expired idempotency keys.
+
+    Rows are deleted in batches of SHARE_REAPER_BATCH_SIZE, each in its own short
+    transaction, so the reaper never holds a write lock for long however far behind
+    it is.
+    """
+
+    def __init__(self, interval_seconds=None, batch_size=None, count_interval_seconds=None):
+        self.logger = logging.getLogger(__name__)
+        self.interval_seconds = interval_seconds if interval_seconds is not None else Config.SHARE_REAPER_INTERVAL_SECONDS
+        self.batch_size = batch_size or Config.SHARE_REAPER_BATCH_SIZE
+        self.count_interval_seconds = (count_interval_seconds if count_interval_seconds is not None
+                                       else Config.SHARE_ROW_COUNT_INTERVAL_SECONDS)
+        self._counted_at = None
+        self.app = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def init_app(self, app):
+        """Start reaping in a daemon thread; an interval of 0 disables the reaper."""
+        self.app = app
+        if self.interval_seconds <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="share-reaper", daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_seconds):
+            with self.app.app_context():
+                try:
+                    self.reap()
+                except Exception as e:
+                    db.session.rollback()
+                    self.logger.error("Share reaper failed: %s", e)
+
+    def reap(self):
+        """Delete everything that has expired and return the number of share rows removed."""
+        now = datetime.utcnow()
+        reaped = self._reap_expired(VideoShare, now)
+        self._reap_expired(RevokedShareToken, now)
+        self._reap_expired(IdempotencyKey, now)
+        self._update_share_rows(reaped)
+        if reaped:
+            self.logger.info("Reaped %s expired share links", reaped)
+        return reaped
+
+    def _update_share_rows(self, reaped):
+        """Count the share rows every count_interval_seconds, a full scan, and only subtract
+        the rows reaped in between; shares created or revoked in this process adjust the gauge
+        as they happen, and the count corrects for other processes."""
+        if self._counted_at is None or time.monotonic() - self._counted_at >= self.count_interval_seconds:
+            share_rows.set(db.session.execute(select(func.count()).select_from(VideoShare)).scalar())
+            self._counted_at = time.monotonic()
+        else:
+            share_rows.dec(reaped)
+
+    def _reap_expired(self, model, now):
+        """Delete expired rows of model one bounded batch (and transaction) at a time."""
+        total = 0
+        while not self._stop.is_set():
+            # The expiry index makes finding each batch a range scan
+            ids = db.session.execute(
+                select(model.id).where(model.expiry_time < now).limit(self.batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+            db.session.execute(delete(model).where(model.id.in_(ids)))
+            db.session.commit()
+            total += len(ids)
+            if model is VideoShare:
+                shares_reaped.inc(len(ids))
+            if len(ids) < self.batch_size:
+                break
+        return total
+
+    def shutdown(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+share_reaper = ShareReaper()
@@ -0,0 +1,169 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+import click
+from sqlalchemy import select
+
+from app.config import Config
+from app.extension import db
+from app.metrics import metrics
+from app.videos.models import Video
+
+# Every column holding the location of a stored file
+PATH_COLUMNS = (Video.file_path, Video.proxy_path, Video.waveform_path, Video.mezzanine_path)
+
+# Only files named the way the processor names its outputs (a UUID, possibly as a partial output, a
+# preview or moviepy's temporary audio track) are ever deleted, whatever else shares the directory
+GENERATED_NAME_PATTERN = re.compile(r"^(\.partial-)?(preview-)?[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+# Rows fetched at a time while collecting the referenced file names
+REFERENCE_FETCH_SIZE = 1000
+
+# The storage cache's default location, never reconciled even when STORAGE_CACHE_DIR points elsewhere
+DEFAULT_CACHE_DIR = "./cache"
+
+orphans_deleted = metrics.counter("storage_orphans_deleted_total", "Unreferenced files deleted by the reconciler")
+bytes_reclaimed = metrics.counter("storage_reclaimed_bytes_total", "Bytes freed by deleting unreferenced files")
+
+
+class StorageReconciler:
+    """Periodically deletes files in VIDEO_DIR that no video references.
+
+    Files leak when a request fails between writing its output and saving the video
+    row, or when a process dies mid-encode. The file names stored in every *_path
+    column are read once per pass, then the directory is scanned lazily and checked
+    against them in batches of STORAGE_RECONCILER_BATCH_SIZE.
+    Only files left untouched for STORAGE_RECONCILER_GRACE_SECONDS are candidates, so
+    the outputs of requests still in flight are left alone.
+    """
+
+    def __init__(self, video_dir=None, interval_seconds=None, grace_seconds=None, batch_size=None):
+        self.logger = logging.getLogger(__name__)
+        self.video_dir = video_dir or Config.VIDEO_DIR
+        self.interval_seconds = (interval_seconds if interval_seconds is not None
+                                 else Config.STORAGE_RECONCILER_INTERVAL_SECONDS)
+        self.grace_seconds = grace_seconds if grace_seconds is not None else Config.STORAGE_RECONCILER_GRACE_SECONDS
+        self.batch_size = batch_size or Config.STORAGE_RECONCILER_BATCH_SIZE
+        self.app = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def init_app(self, app):
+        """Register the reconcile-storage command and start reconciling in a daemon thread; an
+        interval of 0 disables the thread."""
+        self.app = app
+
+        @app.cli.command("reconcile-storage")
+        def reconcile_storage():
+            """Delete unreferenced files in VIDEO_DIR now and print what was reclaimed."""
+            click.echo(json.dumps(self.reconcile()))
+
+        if self.interval_seconds <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="storage-reconciler", daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_seconds):
+            with self.app.app_context():
+                try:
+                    self.reconcile()
+                except Exception as e:
+                    db.session.rollback()
+                    self.logger.error("Storage reconciler failed: %s", e)
+
+    def reconcile(self):
+        """Delete unreferenced files older than the grace period and report how much was reclaimed."""
+        report = {"files_checked": 0, "files_deleted": 0, "bytes_reclaimed": 0}
+        if not os.path.isdir(self.video_dir):
+            return report
+        if self._is_cache_dir(self.video_dir):
+            self.logger.warning("Not reconciling %s, which is the storage cache directory", self.video_dir)
+            return report
+
+        # Taken before the names are read, so any file saved after the read is newer than the cutoff
+        cutoff = time.time() - self.grace_seconds
+        referenced = self._referenced_names()
+        for batch in self._candidate_batches(cutoff):
+            report["files_checked"] += len(batch)
+            for path, size in batch.items():
+                if os.path.basename(path) in referenced or self._stop.is_set():
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+                self.logger.info("Deleted unreferenced file %s (%s bytes)", path, size)
+                report["files_deleted"] += 1
+                report["bytes_reclaimed"] += size
+
+        orphans_deleted.inc(report["files_deleted"])
+        bytes_reclaimed.inc(report["bytes_reclaimed"])
+        if report["files_deleted"]:
+            self.logger.info("Reclaimed %s bytes in %s unreferenced files", report["bytes_reclaimed"],
+                             report["files_deleted"])
+        return report
+
+    def _candidate_batches(self, cutoff):
+        """Yield {path: size} batches of generated files last modified before cutoff.
+
+        Subdirectories, such as a storage cache or S3 download directories kept in the
+        video directory, are not descended into.
+        """
+        batch = {}
+        with os.scandir(self.video_dir) as entries:
+            for entry in entries:
+                if self._stop.is_set():
+                    break
+                if not GENERATED_NAME_PATTERN.match(entry.name) or not entry.is_file(follow_symlinks=False):
+                    continue
+                try:
+                    stat = entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+                if stat.st_mtime >= cutoff:
+                    continue
+                batch[os.path.join(self.video_dir, entry.name)] = stat.st_size
+                if len(batch) >= self.batch_size:
+                    yield batch
+                    batch = {}
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _referenced_names():
+        """The file names stored in any *_path column.
+
+        Generated names are unique, so matching on the name rather than the whole path
+        keeps files whose row spells the directory differently: relative or absolute,
+        through a symlink, or from another working directory.
+        """
+        names = set()
+        for column in PATH_COLUMNS:
+            locations = db.session.scalars(select(column).where(column.isnot(None))
+                                           .execution_options(yield_per=REFERENCE_FETCH_SIZE))
+            names.update(os.path.basename(location) for location in locations)
+        return names
+
+    @staticmethod
+    def _is_cache_dir(path):
+        path = os.path.realpath(path)
+        for cache_dir in {DEFAULT_CACHE_DIR, Config.STORAGE_CACHE_DIR}:
+            cache_dir = os.path.realpath(cache_dir)
+            if path == cache_dir or path.startswith(cache_dir + os.sep):
+                return True
+        return False
+
+    def shutdown(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+storage_reconciler = StorageReconciler()
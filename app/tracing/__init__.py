@@ -0,0 +1,188 @@
+import contextvars
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from app.config import Config
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+# Trace IDs accepted from callers: 8 to 32 hex digits, or a UUID
+TRACE_ID_PATTERN = re.compile(r"[0-9a-fA-F]{8,32}|[0-9a-fA-F]{8}(-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}")
+
+
+class Span:
+    """One timed operation of a trace."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "sampled", "attributes", "error",
+                 "start_time", "_start", "duration", "_token")
+
+    def __init__(self, name, trace_id, parent_id, sampled, attributes):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.attributes = attributes
+        self.error = None
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self.duration = None
+        self._token = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def context(self):
+        """What a background job needs to continue this trace."""
+        return SpanContext(self.trace_id, self.span_id, self.sampled)
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+
+class SpanContext:
+    def __init__(self, trace_id, span_id, sampled):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+
+class JsonLinesExporter:
+    """Appends finished spans to a file, one JSON object per line."""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", buffering=1)
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class Tracer:
+    """Lightweight request tracing.
+
+    The sampling decision is taken once per trace, at its root span; spans of
+    unsampled traces are never created, so tracing can stay on in production at a
+    low TRACING_SAMPLE_RATE. The trace ID is available to logs either way.
+    """
+
+    def __init__(self, sample_rate=None, exporter=None):
+        self.logger = logging.getLogger(__name__)
+        self.sample_rate = sample_rate if sample_rate is not None else Config.TRACING_SAMPLE_RATE
+        self.exporter = exporter
+
+    def init_app(self, app):
+        """Export sampled spans to TRACING_EXPORT_PATH and trace SQL statements."""
+        self.sample_rate = app.config.get('TRACING_SAMPLE_RATE', self.sample_rate)
+        if self.sample_rate > 0 and self.exporter is None:
+            self.exporter = JsonLinesExporter(app.config.get('TRACING_EXPORT_PATH', Config.TRACING_EXPORT_PATH))
+        from app.tracing.sql import trace_sql_statements
+        trace_sql_statements(self)
+
+    def start_trace(self, name, parent=None, trace_id=None, **attributes):
+        """Start a root span, or continue the trace of parent (a SpanContext) in another thread.
+
+        A trace_id from an incoming request is joined, with a fresh sampling decision; one
+        that is not hex or a UUID starts a new trace instead.
+        """
+        if parent is not None:
+            span = Span(name, parent.trace_id, parent.span_id, parent.sampled, attributes)
+        else:
+            if trace_id is None or not TRACE_ID_PATTERN.fullmatch(trace_id):
+                trace_id = uuid.uuid4().hex
+            sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+            span = Span(name, trace_id, None, sampled, attributes)
+        span._token = _current_span.set(span)
+        return span
+
+    def start_span(self, name, **attributes):
+        """Start a child of the current span; None when there is no sampled trace to add it to."""
+        parent = _current_span.get()
+        if parent is None or not parent.sampled:
+            return None
+        span = Span(name, parent.trace_id, parent.span_id, True, attributes)
+        span._token = _current_span.set(span)
+        return span
+
+    def end_span(self, span, error=None):
+        span.duration = time.perf_counter() - span._start
+        if error is not None:
+            span.error = f"{type(error).__name__}: {error}"
+        try:
+            _current_span.reset(span._token)
+        except ValueError:
+            # Ended in a different context than it started in (e.g. across Flask hooks); just detach it
+            _current_span.set(None)
+        if span.sampled and self.exporter is not None:
+            self.exporter.export(span)
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """Child span around a block; a no-op outside sampled traces."""
+        span = self.start_span(name, **attributes)
+        if span is None:
+            yield None
+            return
+        try:
+            yield span
+        except Exception as e:
+            self.end_span(span, e)
+            raise
+        self.end_span(span)
+
+    @contextmanager
+    def trace(self, name, parent=None, **attributes):
+        """Root (or continued) span around a block."""
+        span = self.start_trace(name, parent, **attributes)
+        try:
+            yield span
+        except Exception as e:
+            self.end_span(span, e)
+            raise
+        self.end_span(span)
+
+    @staticmethod
+    def current_span():
+        return _current_span.get()
+
+    @staticmethod
+    def current_trace_id():
+        span = _current_span.get()
+        return span.trace_id if span is not None else None
+
+
+class TraceIdFilter(logging.Filter):
+    """Adds the current trace ID to log records as trace_id ('-' outside a trace)."""
+
+    def filter(self, record):
+        record.trace_id = Tracer.current_trace_id() or "-"
+        return True
+
+
+tracer = Tracer()
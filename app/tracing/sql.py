@@ -0,0 +1,34 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Statements are cut to this length in span attributes
+MAX_STATEMENT_LENGTH = 200
+
+_registered = False
+
+
+def trace_sql_statements(tracer):
+    """Record a span for every SQL statement executed inside a sampled trace, on any engine."""
+    global _registered
+    if _registered:
+        return
+    _registered = True
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        span = tracer.start_span("sql", statement=statement[:MAX_STATEMENT_LENGTH], executemany=executemany)
+        conn.info.setdefault("trace_spans", []).append(span)
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        span = conn.info["trace_spans"].pop()
+        if span is not None:
+            tracer.end_span(span)
+
+    @event.listens_for(Engine, "handle_error")
+    def handle_error(exception_context):
+        spans = exception_context.connection.info.get("trace_spans") if exception_context.connection else None
+        if spans:
+            span = spans.pop()
+            if span is not None:
+                tracer.end_span(span, exception_context.original_exception)
@@ -0,0 +1,61 @@
+import threading
+import time
+from collections import OrderedDict
+
+from app.metrics import metrics
+
+cache_hits = metrics.counter("cache_hits_total", "Lookups answered by an in-process cache")
+cache_misses = metrics.counter("cache_misses_total", "Lookups that missed an in-process cache")
+
+
+class TTLCache:
+    """Thread-safe in-process cache bounded by entry count (least recently used
+    entries are dropped first) whose entries expire after a time to live.
+
+    A max_entries of 0 disables caching: every lookup misses and nothing is stored.
+    """
+
+    def __init__(self, name, max_entries, ttl_seconds):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for key, or None if it is missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                cache_hits.inc(cache=self.name)
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+        cache_misses.inc(cache=self.name)
+        return None
+
+    def set(self, key, value, ttl_seconds=None):
+        """Store value for key; ttl_seconds can shorten the entry's lifetime below the default."""
+        if self.max_entries <= 0:
+            return
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
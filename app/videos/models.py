@@ -3,12 +3,20 @@ from datetime import datetime
 
 class Video(db.Model):
     __tablename__ = 'videos'
+    __table_args__ = (
+        db.Index('ix_videos_created_at_id', 'created_at', 'id'),  # Keyset pagination order
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(100), nullable=False)
     size = db.Column(db.Integer, nullable=False)  # File size in bytes
     duration = db.Column(db.Integer, nullable=False)  # Duration in seconds
     file_path = db.Column(db.String(200), nullable=False)
+    proxy_path = db.Column(db.String(200), nullable=True)  # Low-resolution rendition for previews
+    waveform_path = db.Column(db.String(200), nullable=True)  # Binary sidecar of audio peaks
+    scenes = db.Column(db.JSON, nullable=True)  # Scene boundary timestamps in seconds
+    mezzanine_path = db.Column(db.String(200), nullable=True)  # Normalized copy that can be stream-copied
+    mezzanine_profile = db.Column(db.String(100), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     def __repr__(self):
@@ -17,10 +25,27 @@ class Video(db.Model):
 class VideoShare(db.Model):
     __tablename__ = 'video_shares'
     id = db.Column(db.Integer, primary_key=True)
-    video_id = db.Column(db.Integer, db.ForeignKey('videos.id'), nullable=False)
+    video_id = db.Column(db.Integer, db.ForeignKey('videos.id'), nullable=False, index=True)
     token = db.Column(db.String(64), nullable=False, unique=True)
-    expiry_time = db.Column(db.DateTime, nullable=False)
+    expiry_time = db.Column(db.DateTime, nullable=False, index=True)  # Lets the reaper find expired rows
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     video = db.relationship('Video', backref=db.backref('shares', lazy=True))
 
+class RevokedShareToken(db.Model):
+    __tablename__ = 'revoked_share_tokens'
+    id = db.Column(db.Integer, primary_key=True)
+    token_id = db.Column(db.String(32), nullable=False, unique=True)  # Id embedded in a signed share token
+    expiry_time = db.Column(db.DateTime, nullable=False)  # The row is only needed until the token expires
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class IdempotencyKey(db.Model):
+    __tablename__ = 'idempotency_keys'
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(255), nullable=False, unique=True)  # Idempotency-Key header sent by the client
+    request_hash = db.Column(db.String(64), nullable=False)  # Method, path and body of the first request
+    response_status = db.Column(db.Integer, nullable=True)  # None while the first request is in progress
+    response_body = db.Column(db.Text, nullable=True)
+    response_mimetype = db.Column(db.String(100), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)  # When the key was (last) claimed
+    expiry_time = db.Column(db.DateTime, nullable=False, index=True)
@@ -0,0 +1,125 @@
+"""Concurrent read/write benchmark against SQLite.
+
+Writers insert videos (one commit each, as uploads do) while readers run the
+GET paths of VideoService (single and batch lookups, listing pages). Each
+scenario uses a fresh database file and reports reads/sec, writes/sec and
+failed operations ("database is locked"):
+
+  rollback journal   journal_mode=DELETE, synchronous=FULL, primary session only
+  wal                journal_mode=WAL, synchronous=NORMAL, primary session only
+  wal + read session as wal, with GET paths on the read-only session
+
+    python -m benchmarks.database_benchmark --readers 8 --writers 2 --duration 5
+"""
+import argparse
+import logging
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from app import create_app
+from app.config import Config
+from app.extension import db, video_cache, share_cache
+from app.service.video_service import VideoService
+from app.videos.models import Video
+
+SCENARIOS = [
+    ("rollback journal", {"SQLITE_JOURNAL_MODE": "DELETE", "SQLITE_SYNCHRONOUS": "FULL"}, False),
+    ("wal", {"SQLITE_JOURNAL_MODE": "WAL", "SQLITE_SYNCHRONOUS": "NORMAL"}, False),
+    ("wal + read session", {"SQLITE_JOURNAL_MODE": "WAL", "SQLITE_SYNCHRONOUS": "NORMAL"}, True),
+]
+
+
+def make_video(i):
+    return Video(filename=f"video_{i}.mp4", size=1024 * 1024, duration=10, file_path=f"/videos/video_{i}.mp4")
+
+
+def run_scenario(settings, read_session, args):
+    db_dir = tempfile.mkdtemp()
+    uri = f"sqlite:///{os.path.join(db_dir, 'benchmark.db')}"
+    for name, value in settings.items():
+        setattr(Config, name, value)
+    Config.SQLALCHEMY_DATABASE_URI = uri
+    Config.SQLALCHEMY_READ_DATABASE_URI = uri if read_session else None
+    app = create_app()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with app.app_context():
+        db.session.add_all(make_video(i) for i in range(args.videos))
+        db.session.commit()
+
+    deadline = time.monotonic() + args.duration
+    totals = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def reader(seed_value):
+        rng = random.Random(seed_value)
+        reads = errors = 0
+        while time.monotonic() < deadline:
+            # A fresh app context per operation, as each request gets
+            with app.app_context():
+                try:
+                    choice = rng.random()
+                    if choice < 0.6:
+                        VideoService().get_video(rng.randint(1, args.videos))
+                    elif choice < 0.9:
+                        VideoService().get_videos([rng.randint(1, args.videos) for _ in range(20)])
+                    else:
+                        VideoService().list_videos(limit=50)
+                    reads += 1
+                except Exception:
+                    errors += 1
+        with lock:
+            totals["reads"] += reads
+            totals["errors"] += errors
+
+    def writer(seed_value):
+        writes = errors = 0
+        while time.monotonic() < deadline:
+            with app.app_context():
+                try:
+                    VideoService()._save_video_to_db(make_video(seed_value))
+                    writes += 1
+                except Exception:
+                    errors += 1
+        with lock:
+            totals["writes"] += writes
+            totals["errors"] += errors
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with app.app_context():
+        db.engine.dispose()
+    shutil.rmtree(db_dir, ignore_errors=True)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, default=2000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per scenario")
+    args = parser.parse_args()
+
+    # Measure the database, not the metadata cache or background jobs
+    Config.SHARE_REAPER_INTERVAL_SECONDS = 0
+    for cache in (video_cache, share_cache):
+        cache.max_entries = 0
+
+    for label, settings, read_session in SCENARIOS:
+        totals = run_scenario(settings, read_session, args)
+        print(f"{label:>18}: {totals['reads'] / args.duration:8.0f} reads/s "
+              f"{totals['writes'] / args.duration:8.0f} writes/s {totals['errors']:6d} errors")
+
+
+if __name__ == "__main__":
+    main()
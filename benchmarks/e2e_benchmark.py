@@ -0,0 +1,235 @@
+"""End-to-end benchmark of upload, trim, merge and share lookups on real media.
+
+Deterministic synthetic videos (ffmpeg test patterns with a sine tone, encoded
+bit-exactly) are generated once per duration, resolution and codec, then driven
+through VideoService against a fresh SQLite database and local storage.
+Background renditions are disabled so that each operation is measured alone.
+For every operation the wall time, CPU time (including ffmpeg subprocesses),
+peak RSS and output size are written to a JSON results file:
+
+    python -m benchmarks.e2e_benchmark --output e2e_results.json
+
+With --baseline the run is compared against an earlier results file, and the
+process exits with status 1 when any metric regressed by more than --threshold:
+
+    python -m benchmarks.e2e_benchmark --output e2e_results.json --baseline e2e_baseline.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+from werkzeug.datastructures import FileStorage
+
+from app import create_app
+from app.config import Config
+from app.extension import background_worker
+from app.service.processor.ffmpeg_runner import FFmpegRunner
+from app.service.video_service import VideoService
+from app.videos.models import Video
+
+# name, duration in seconds, resolution, video codec; durations stay within the upload limits
+MEDIA = [
+    ("6s_240p_mpeg4", 6, (320, 240), "mpeg4"),
+    ("6s_360p_h264", 6, (640, 360), "libx264"),
+    ("12s_480p_h264", 12, (854, 480), "libx264"),
+    ("24s_720p_h264", 24, (1280, 720), "libx264"),
+]
+
+# Share lookups are far cheaper than the rest, so each measurement covers this many of them
+SHARE_LOOKUPS = 1000
+
+# Metrics compared against the baseline; output sizes should not change at all for the same inputs
+COMPARED_METRICS = ("wall_s", "cpu_s", "peak_rss_bytes", "output_bytes")
+
+
+def generate_media(media_dir, name, duration, resolution, codec):
+    """Encode a test pattern with a tone; single-threaded and bit-exact so reruns produce identical files."""
+    path = os.path.join(media_dir, f"{name}.mp4")
+    if os.path.exists(path):
+        return path
+    width, height = resolution
+    FFmpegRunner().run([
+        "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate=24:duration={duration}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=44100:duration={duration}",
+        "-c:v", codec, "-pix_fmt", "yuv420p", "-threads", "1", "-c:a", "aac",
+        "-fflags", "+bitexact", "-flags:v", "+bitexact", "-flags:a", "+bitexact", "-map_metadata", "-1",
+        path,
+    ])
+    return path
+
+
+def _current_rss():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize()
+
+
+class Measurement:
+    """Wall time, CPU time of the process and its children, and peak RSS sampled while the block runs."""
+
+    def __enter__(self):
+        self._stop = threading.Event()
+        self.peak_rss_bytes = 0
+        self._sampler = None
+        if os.path.exists("/proc/self/statm"):
+            self._sampler = threading.Thread(target=self._sample_rss, daemon=True)
+            self._sampler.start()
+        self._cpu = self._cpu_time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.wall_s = time.perf_counter() - self._start
+        self.cpu_s = self._cpu_time() - self._cpu
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        else:
+            # Peak of the whole run so far, the best available without /proc
+            self.peak_rss_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def _sample_rss(self):
+        while True:
+            self.peak_rss_bytes = max(self.peak_rss_bytes, _current_rss())
+            if self._stop.wait(0.01):
+                return
+
+    @staticmethod
+    def _cpu_time():
+        own, children = resource.getrusage(resource.RUSAGE_SELF), resource.getrusage(resource.RUSAGE_CHILDREN)
+        return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def measure(results, key, fn, repeat):
+    """Run fn repeat times and record the median wall and CPU time, the highest peak RSS and its output size."""
+    runs = []
+    for _ in range(repeat):
+        with Measurement() as measurement:
+            output_bytes = fn()
+        runs.append((measurement, output_bytes))
+    results[key] = {
+        "wall_s": round(statistics.median(m.wall_s for m, _ in runs), 4),
+        "cpu_s": round(statistics.median(m.cpu_s for m, _ in runs), 4),
+        "peak_rss_bytes": max(m.peak_rss_bytes for m, _ in runs),
+        "output_bytes": runs[-1][1],
+    }
+    print(f"{key:>32}: {results[key]['wall_s']:8.3f}s wall {results[key]['cpu_s']:8.3f}s cpu "
+          f"{results[key]['peak_rss_bytes'] / 1024 / 1024:8.1f} MB rss")
+
+
+def _output_bytes(video_id):
+    return os.path.getsize(Video.query.get(video_id).file_path)
+
+
+def run(args, work_dir):
+    media_dir = args.media_dir or os.path.join(work_dir, "media")
+    os.makedirs(media_dir, exist_ok=True)
+    media = {name: (generate_media(media_dir, name, duration, resolution, codec), duration)
+             for name, duration, resolution, codec in MEDIA}
+
+    Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(work_dir, 'benchmark.db')}"
+    Config.VIDEO_DIR = os.path.join(work_dir, "videos")
+    Config.STORAGE_BACKEND = "local"
+    Config.SHARE_REAPER_INTERVAL_SECONDS = 0
+    app = create_app()
+    logging.getLogger().setLevel(logging.WARNING)
+    # Renditions would otherwise be encoded concurrently with the operations being measured
+    background_worker.shutdown()
+    logging.getLogger("app.service.worker.background_worker").setLevel(logging.ERROR)
+
+    results = {}
+    with app.test_request_context():
+        service = VideoService()
+        for name, (path, duration) in media.items():
+            uploaded = []
+
+            def upload():
+                with open(path, "rb") as f:
+                    response = service.upload_video(FileStorage(stream=f, filename=os.path.basename(path)))
+                uploaded.append(response["video_id"])
+                return _output_bytes(response["video_id"])
+
+            def trim():
+                response = service.trim_video(uploaded[0], 1, duration - 1)
+                uploaded.append(response["video_id"])
+                return _output_bytes(response["video_id"])
+
+            def merge():
+                response = service.merge_videos(uploaded[:2])
+                return _output_bytes(response["video_id"])
+
+            measure(results, f"upload/{name}", upload, args.repeat)
+            measure(results, f"trim/{name}", trim, args.repeat)
+            measure(results, f"merge/{name}", merge, args.repeat)
+
+        token = service.generate_shareable_link(uploaded[0])["share_url"].rsplit("/", 1)[1]
+
+        def share_lookups():
+            for _ in range(SHARE_LOOKUPS):
+                service.get_shared_video_from_token(token)
+            return 0
+
+        measure(results, f"share_lookup/x{SHARE_LOOKUPS}", share_lookups, args.repeat)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return a line for every metric that is more than threshold worse than in the baseline."""
+    regressions = []
+    for key, metrics in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        for metric in COMPARED_METRICS:
+            before, after = previous.get(metric), metrics.get(metric)
+            if before and after is not None and after > before * (1 + threshold):
+                regressions.append(f"{key} {metric}: {before} -> {after} (+{(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="e2e_results.json", help="results file to write")
+    parser.add_argument("--baseline", help="results file of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, 0.2 is 20%%")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per operation; the median is recorded")
+    parser.add_argument("--media-dir", help="keep the generated media here to reuse it across runs")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        results = run(args, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "results": results,
+        }, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
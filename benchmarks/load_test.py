@@ -0,0 +1,204 @@
+"""HTTP load test of the whole app on localhost.
+
+The app is built with create_app against a fresh SQLite database and local
+storage, served by a threaded server on a free localhost port, and seeded with
+generated videos and a share link. Requests are then sent at a fixed target
+rate (open loop, so a slow server is not hidden by a slower client), in a
+weighted mix of operations, by up to --concurrency clients. Latency is measured
+from the time each request was due, which includes any time it waited for a
+free client. Reports p50/p95/p99 latency, error rate and requests/sec per
+endpoint:
+
+    python -m benchmarks.load_test --rate 20 --concurrency 16 --duration 30 \\
+        --mix get=40,share_read=30,share_create=10,upload=10,trim=5,merge=5
+"""
+import argparse
+import http.client
+import json
+import logging
+import math
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import make_server
+
+from app import create_app
+from app.config import Config
+from app.extension import background_worker
+from benchmarks.e2e_benchmark import MEDIA, generate_media
+
+DEFAULT_MIX = "get=40,share_read=30,share_create=10,upload=10,trim=5,merge=5"
+
+# Videos uploaded before the run, for the operations that need existing ones
+SEED_VIDEOS = 2
+
+
+class Client:
+    """Builds and sends the requests of each operation to the server under test."""
+
+    def __init__(self, port, media_path, rng):
+        self.port = port
+        self.headers = {"Authorization": f"Bearer {Config.API_TOKEN}"}
+        with open(media_path, "rb") as f:
+            self.media = f.read()
+        self.rng = rng
+        self.video_ids = []
+        self.tokens = []
+
+    def request(self, method, path, body=None, headers=None):
+        """Send one request and return the status and decoded JSON body (None when it is not JSON)."""
+        connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=300)
+        try:
+            connection.request(method, path, body=body, headers={**self.headers, **(headers or {})})
+            response = connection.getresponse()
+            data = response.read()
+        finally:
+            connection.close()
+        try:
+            return response.status, json.loads(data)
+        except ValueError:
+            return response.status, None
+
+    def post_json(self, path, payload):
+        return self.request("POST", path, json.dumps(payload), {"Content-Type": "application/json"})
+
+    def upload(self):
+        boundary = uuid.uuid4().hex
+        body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"load_test.mp4\"\r\n"
+                f"Content-Type: video/mp4\r\n\r\n").encode() + self.media + f"\r\n--{boundary}--\r\n".encode()
+        status, data = self.request("POST", "/video", body, {"Content-Type": f"multipart/form-data; boundary={boundary}"})
+        if status == 201:
+            self.video_ids.append(data["video_id"])
+        return status
+
+    def get(self):
+        return self.request("GET", f"/video/{self.rng.choice(self.video_ids)}")[0]
+
+    def trim(self):
+        return self.post_json(f"/video/{self.rng.choice(self.video_ids)}/trim", {"start": 1, "end": 4})[0]
+
+    def merge(self):
+        return self.post_json("/videos/merge", {"video_ids": self.rng.sample(self.video_ids, 2)})[0]
+
+    def share_create(self):
+        status, data = self.request("POST", f"/video/{self.rng.choice(self.video_ids)}/share")
+        if status == 200:
+            self.tokens.append(data["share_url"].rsplit("/", 1)[1])
+        return status
+
+    def share_read(self):
+        return self.request("GET", f"/video/share/{self.rng.choice(self.tokens)}", headers={"Authorization": ""})[0]
+
+
+def parse_mix(mix):
+    """'get=40,upload=10' -> {'get': 40.0, 'upload': 10.0}, checking each name is an operation of Client."""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if not callable(getattr(Client, name, None)) or name in ("request", "post_json"):
+            raise argparse.ArgumentTypeError(f"Unknown operation {name}")
+        weights[name] = float(weight)
+    return weights
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    return sorted_values[max(math.ceil(p / 100 * len(sorted_values)) - 1, 0)]
+
+
+def serve(app):
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(args, work_dir):
+    Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(work_dir, 'load_test.db')}"
+    Config.VIDEO_DIR = os.path.join(work_dir, "videos")
+    Config.STORAGE_BACKEND = "local"
+    Config.SHARE_REAPER_INTERVAL_SECONDS = 0
+    app = create_app()
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = serve(app)
+
+    name, duration, resolution, codec = MEDIA[0]
+    media_path = generate_media(work_dir, name, duration, resolution, codec)
+    rng = random.Random(args.seed)
+    client = Client(server.server_port, media_path, rng)
+    for _ in range(SEED_VIDEOS):
+        if client.upload() != 201:
+            raise RuntimeError("Seeding failed: could not upload a video")
+    if client.share_create() != 200:
+        raise RuntimeError("Seeding failed: could not create a share link")
+
+    operations, weights = zip(*args.mix.items())
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+
+    def send(operation, due):
+        try:
+            ok = getattr(client, operation)() < 400
+        except Exception:
+            ok = False
+        latency = time.perf_counter() - due
+        with lock:
+            latencies[operation].append(latency)
+            if not ok:
+                errors[operation] += 1
+
+    total = int(args.rate * args.duration)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for i in range(total):
+            due = start + i / args.rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(send, rng.choices(operations, weights)[0], due)
+    elapsed = time.perf_counter() - start
+
+    server.shutdown()
+    # Renditions of the uploaded videos may still be encoding, and their files are about to be removed
+    background_worker.shutdown()
+    return latencies, errors, elapsed
+
+
+def report(latencies, errors, elapsed):
+    print(f"{'endpoint':>14} {'requests':>9} {'req/s':>8} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    rows = sorted(latencies.items())
+    rows.append(("total", [latency for _, values in rows for latency in values]))
+    for operation, values in rows:
+        values = sorted(values)
+        failed = sum(errors.values()) if operation == "total" else errors[operation]
+        print(f"{operation:>14} {len(values):9d} {len(values) / elapsed:8.1f} {100 * failed / len(values):6.1f}% "
+              + " ".join(f"{percentile(values, p) * 1000:9.1f}" for p in (50, 95, 99)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=20, help="requests per second to send")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight at most")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to send requests for")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="weights of the operations")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        latencies, errors, elapsed = run(args, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    report(latencies, errors, elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Request latency with logging on: the previous synchronous pipeline against the queue.
+
+GET /video/<id> requests (metadata cache off, so each one logs as it reads the
+database) are timed one by one through Flask with the log file written:
+
+  synchronous   root at DEBUG, text records written by a FileHandler in the
+                request thread (the previous configuration)
+  queued        the Logging pipeline: records are enqueued and written as JSON
+                by a background thread, with rotation
+
+Each runs with an unloaded disk and with --disk-latency-ms added to every
+write, as on a busy or network-backed volume.
+
+    python -m benchmarks.logging_benchmark --requests 2000 --disk-latency-ms 1
+"""
+import argparse
+import logging
+import logging.handlers
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from flask import Flask
+
+from app.config import Config
+from app.extension import db, video_cache
+from app.logging import TEXT_FORMAT, JsonFormatter, Logging
+from app.routes.video_routes import video_routes
+from app.tracing import TraceIdFilter
+from app.videos.models import Video
+
+
+class SlowDiskMixin:
+    """Adds a fixed delay to every write."""
+
+    latency = 0.0
+
+    def emit(self, record):
+        if self.latency:
+            time.sleep(self.latency)
+        super().emit(record)
+
+
+class SlowFileHandler(SlowDiskMixin, logging.FileHandler):
+    pass
+
+
+class SlowRotatingFileHandler(SlowDiskMixin, logging.handlers.RotatingFileHandler):
+    pass
+
+
+def time_requests(client, requests):
+    headers = {"Authorization": f"Bearer {Config.API_TOKEN}"}
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        client.get("/video/1", headers=headers)
+        latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+
+def synchronous(client, log_path, latency, requests):
+    handler = SlowFileHandler(log_path)
+    handler.latency = latency
+    handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    handler.addFilter(TraceIdFilter())
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(logging.DEBUG)
+    try:
+        return time_requests(client, requests)
+    finally:
+        root.removeHandler(handler)
+        handler.close()
+
+
+def queued(client, log_path, latency, requests):
+    handler = SlowRotatingFileHandler(log_path, maxBytes=Config.LOG_MAX_BYTES, backupCount=Config.LOG_BACKUP_COUNT)
+    handler.latency = latency
+    handler.setFormatter(JsonFormatter())
+    Logging(handlers=[handler])
+    try:
+        return time_requests(client, requests)
+    finally:
+        Logging.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--disk-latency-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    db.init_app(app)
+    app.register_blueprint(video_routes)
+    with app.app_context():
+        db.create_all()
+        db.session.add(Video(id=1, filename="video.mp4", size=1024, duration=10, file_path="/videos/video.mp4"))
+        db.session.commit()
+    video_cache.max_entries = 0
+    client = app.test_client()
+    Logging.stop()
+    for handler in list(logging.getLogger().handlers):
+        logging.getLogger().removeHandler(handler)
+
+    log_dir = tempfile.mkdtemp()
+    try:
+        for latency_ms in (0.0, args.disk_latency_ms):
+            for label, run in (("synchronous", synchronous), ("queued", queued)):
+                latencies = run(client, os.path.join(log_dir, f"{label}.log"), latency_ms / 1000, args.requests)
+                p99 = latencies[int(len(latencies) * 0.99) - 1]
+                print(f"{label:>12} ({latency_ms:.1f} ms disk): mean {statistics.mean(latencies) * 1e6:8.0f} us, "
+                      f"p50 {statistics.median(latencies) * 1e6:8.0f} us, p99 {p99 * 1e6:8.0f} us")
+    finally:
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Load benchmark for the metadata cache.
+
+Replays a skewed mix of shared-link and video lookups against the Flask app
+(a few hot links take most of the traffic, as when a link goes viral) with the
+video and share caches disabled and then enabled, and reports requests/sec.
+
+    python -m benchmarks.metadata_cache_benchmark --threads 4 --duration 5
+"""
+import argparse
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URI", f"sqlite:///{os.path.join(_db_dir, 'benchmark.db')}")
+
+from app import create_app  # noqa: E402
+from app.config import Config  # noqa: E402
+from app.extension import db, video_cache, share_cache  # noqa: E402
+from app.videos.models import Video, VideoShare  # noqa: E402
+
+
+def seed(app, video_count):
+    """Insert videos with one share link each and return (video ids, tokens)."""
+    with app.app_context():
+        videos = [Video(filename=f"video_{i}.mp4", size=1024 * 1024, duration=10, file_path=f"/videos/video_{i}.mp4")
+                  for i in range(video_count)]
+        db.session.add_all(videos)
+        db.session.flush()
+        expiry_time = datetime.utcnow() + timedelta(hours=1)
+        shares = [VideoShare(video_id=video.id, token=f"{video.id:064x}", expiry_time=expiry_time) for video in videos]
+        db.session.add_all(shares)
+        db.session.commit()
+        return [video.id for video in videos], [share.token for share in shares]
+
+
+def run_load(app, video_ids, tokens, threads, duration, hot_fraction):
+    """Issue requests from several threads for duration seconds and return (requests, errors)."""
+    headers = {"Authorization": f"Bearer {Config.API_TOKEN}"}
+    hot_count = max(1, int(len(tokens) * hot_fraction))
+    deadline = time.monotonic() + duration
+    counts = []
+    lock = threading.Lock()
+
+    def worker(seed_value):
+        rng = random.Random(seed_value)
+        client = app.test_client()
+        requests = errors = 0
+        while time.monotonic() < deadline:
+            # 90% of the traffic goes to the hot links
+            index = rng.randrange(hot_count) if rng.random() < 0.9 else rng.randrange(len(tokens))
+            if rng.random() < 0.8:
+                response = client.get(f"/video/share/{tokens[index]}")
+            else:
+                response = client.get(f"/video/{video_ids[index]}", headers=headers)
+            requests += 1
+            errors += response.status_code != 200
+        with lock:
+            counts.append((requests, errors))
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return sum(c[0] for c in counts), sum(c[1] for c in counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per run")
+    parser.add_argument("--hot-fraction", type=float, default=0.02, help="share of links that get 90%% of the traffic")
+    args = parser.parse_args()
+
+    app = create_app()
+    # Per-request logging would dominate both runs
+    logging.getLogger().setLevel(logging.WARNING)
+    video_ids, tokens = seed(app, args.videos)
+
+    max_entries = Config.METADATA_CACHE_MAX_ENTRIES or 1024
+    results = {}
+    for label, entries in (("without cache", 0), ("with cache", max_entries)):
+        for cache in (video_cache, share_cache):
+            cache.max_entries = entries
+            cache.clear()
+        requests, errors = run_load(app, video_ids, tokens, args.threads, args.duration, args.hot_fraction)
+        results[label] = requests / args.duration
+        print(f"{label:>14}: {requests} requests, {errors} errors, {results[label]:.0f} req/s")
+
+    print(f"{'speedup':>14}: {results['with cache'] / results['without cache']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
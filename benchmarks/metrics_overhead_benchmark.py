@@ -0,0 +1,64 @@
+"""Overhead of the stage instrumentation on the hot path.
+
+Times a bare function against the same function under @timed, and the cached
+VideoService.get_video path with and without its timer (through __wrapped__),
+then puts that cost next to a whole GET /video/<id> request through Flask.
+
+    python -m benchmarks.metrics_overhead_benchmark --calls 200000
+"""
+import argparse
+import timeit
+
+from flask import Flask
+
+from app.config import Config
+from app.extension import db
+from app.routes.video_routes import video_routes
+from app.metrics.instrumentation import timed
+from app.service.video_service import VideoService
+from app.videos.models import Video
+
+
+def noop():
+    return None
+
+
+def per_call_ns(fn, calls):
+    # Best of several runs, to leave out scheduler noise
+    return min(timeit.repeat(fn, number=calls, repeat=5)) / calls * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args()
+
+    timed_noop = timed("benchmark.noop")(noop)
+    bare, instrumented = per_call_ns(noop, args.calls), per_call_ns(timed_noop, args.calls)
+    print(f"{'noop':>20}: {bare:8.0f} ns bare, {instrumented:8.0f} ns timed, {instrumented - bare:6.0f} ns overhead")
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.session.add(Video(id=1, filename="video.mp4", size=1024, duration=10, file_path="/videos/video.mp4"))
+        db.session.commit()
+
+        video_service = VideoService()
+        video_service.logger.disabled = True
+        video_service.get_video(1)  # Warm the metadata cache
+        bare = per_call_ns(lambda: VideoService.get_video.__wrapped__(video_service, 1), args.calls)
+        instrumented = per_call_ns(lambda: video_service.get_video(1), args.calls)
+        overhead = instrumented - bare
+        print(f"{'cached get_video':>20}: {bare:8.0f} ns bare, {instrumented:8.0f} ns timed, {overhead:6.0f} ns overhead")
+
+    app.register_blueprint(video_routes)
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {Config.API_TOKEN}"}
+    request_ns = per_call_ns(lambda: client.get("/video/1", headers=headers), max(1, args.calls // 100))
+    print(f"{'GET /video/1':>20}: {request_ns:8.0f} ns per request, timer overhead {overhead / request_ns:.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Cold-start benchmark: import and app creation time of a fresh process.
+
+Each measurement runs in a new interpreter, as a newly spawned worker would, and
+the median of --runs is reported for:
+
+  import routes        importing app.routes.video_routes, and which heavy
+                       libraries (moviepy, NumPy, PIL, imageio) it loaded
+  create_app           building the app against an up-to-date database, with
+                       MIGRATE_ON_STARTUP on (revision check) and off
+  first moviepy use    what the first processing operation pays to import moviepy
+
+    python -m benchmarks.startup_benchmark --runs 5
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HEAVY_MODULES = ("moviepy", "numpy", "PIL", "imageio")
+
+IMPORT_ROUTES = f"""
+import json, sys, time
+start = time.perf_counter()
+import app.routes.video_routes
+print(json.dumps({{"seconds": time.perf_counter() - start,
+                  "loaded": [name for name in {HEAVY_MODULES!r} if name in sys.modules]}}))
+"""
+
+CREATE_APP = """
+import json, time
+start = time.perf_counter()
+from app import create_app
+create_app()
+print(json.dumps({"seconds": time.perf_counter() - start}))
+"""
+
+FIRST_MOVIEPY_USE = """
+import json, time
+import app.service.processor.video_processor
+start = time.perf_counter()
+from moviepy.video.io.VideoFileClip import VideoFileClip
+print(json.dumps({"seconds": time.perf_counter() - start}))
+"""
+
+
+def measure(code, env, runs):
+    """Median seconds of code over runs fresh interpreters, and the last run's full result."""
+    results = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+        results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+    return statistics.median(result["seconds"] for result in results), results[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    env = {
+        **os.environ,
+        "DATABASE_URI": f"sqlite:///{os.path.join(work_dir, 'startup.db')}",
+        "VIDEO_DIR": os.path.join(work_dir, "videos"),
+        "SHARE_REAPER_INTERVAL_SECONDS": "0",
+    }
+    try:
+        # Bring the database to head once, so create_app below measures a routine start
+        subprocess.run([sys.executable, "-c", CREATE_APP], env=env, capture_output=True, check=True)
+
+        seconds, result = measure(IMPORT_ROUTES, env, args.runs)
+        print(f"{'import routes':>30}: {seconds * 1000:8.1f} ms (loaded: {', '.join(result['loaded']) or 'none'})")
+        for label, migrate in (("create_app (migrate check)", "true"), ("create_app (no migrate)", "false")):
+            seconds, _ = measure(CREATE_APP, {**env, "MIGRATE_ON_STARTUP": migrate}, args.runs)
+            print(f"{label:>30}: {seconds * 1000:8.1f} ms")
+        seconds, _ = measure(FIRST_MOVIEPY_USE, env, args.runs)
+        print(f"{'first moviepy use':>30}: {seconds * 1000:8.1f} ms")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
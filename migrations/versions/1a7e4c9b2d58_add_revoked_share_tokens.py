@@ -0,0 +1,32 @@
+"""add revoked_share_tokens
+
+Revision ID: 1a7e4c9b2d58
+Revises: f5c9a3b1d764
+Create Date: 2026-10-19 12:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1a7e4c9b2d58'
+down_revision = 'f5c9a3b1d764'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'revoked_share_tokens',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('token_id', sa.String(length=32), nullable=False),
+        sa.Column('expiry_time', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('token_id')
+    )
+
+
+def downgrade():
+    op.drop_table('revoked_share_tokens')
@@ -0,0 +1,26 @@
+"""add videos (created_at, id) index
+
+Revision ID: 3b8f2d6a9c17
+Revises: 1a7e4c9b2d58
+Create Date: 2026-10-19 12:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b8f2d6a9c17'
+down_revision = '1a7e4c9b2d58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('videos', schema=None) as batch_op:
+        batch_op.create_index('ix_videos_created_at_id', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('videos', schema=None) as batch_op:
+        batch_op.drop_index('ix_videos_created_at_id')
@@ -0,0 +1,52 @@
+"""initial schema
+
+Revision ID: 4c1f2a9d7b10
+Revises: 
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c1f2a9d7b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created before migrations were introduced already have these
+    # tables (from db.create_all()), so only create what is missing.
+    existing_tables = sa.inspect(op.get_bind()).get_table_names()
+
+    if 'videos' not in existing_tables:
+        op.create_table(
+            'videos',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('filename', sa.String(length=100), nullable=False),
+            sa.Column('size', sa.Integer(), nullable=False),
+            sa.Column('duration', sa.Integer(), nullable=False),
+            sa.Column('file_path', sa.String(length=200), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    if 'video_shares' not in existing_tables:
+        op.create_table(
+            'video_shares',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('video_id', sa.Integer(), nullable=False),
+            sa.Column('token', sa.String(length=64), nullable=False),
+            sa.Column('expiry_time', sa.DateTime(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['video_id'], ['videos.id'], ),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('token')
+        )
+
+
+def downgrade():
+    op.drop_table('video_shares')
+    op.drop_table('videos')
@@ -0,0 +1,28 @@
+"""add video_shares expiry_time and video_id indexes
+
+Revision ID: 6d1e9a4f2b83
+Revises: 3b8f2d6a9c17
+Create Date: 2026-10-19 13:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6d1e9a4f2b83'
+down_revision = '3b8f2d6a9c17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('video_shares', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_video_shares_expiry_time'), ['expiry_time'], unique=False)
+        batch_op.create_index(batch_op.f('ix_video_shares_video_id'), ['video_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('video_shares', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_video_shares_video_id'))
+        batch_op.drop_index(batch_op.f('ix_video_shares_expiry_time'))
@@ -0,0 +1,26 @@
+"""add video proxy_path
+
+Revision ID: 9e3b5d2c8a41
+Revises: 4c1f2a9d7b10
+Create Date: 2026-10-19 09:35:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e3b5d2c8a41'
+down_revision = '4c1f2a9d7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('videos', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('proxy_path', sa.String(length=200), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('videos', schema=None) as batch_op:
+        batch_op.drop_column('proxy_path')
@@ -0,0 +1,26 @@
+"""add video waveform_path
+
+Revision ID: b7d4e1f0c352
+Revises: 9e3b5d2c8a41
+Create Date: 2026-10-19 10:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d4e1f0c352'
+down_revision = '9e3b5d2c8a41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('videos', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('waveform_path', sa.String(length=200), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('videos', schema=None) as batch_op:
+        batch_op.drop_column('waveform_path')
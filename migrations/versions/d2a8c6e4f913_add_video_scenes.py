@@ -0,0 +1,26 @@
+"""add video scenes
+
+Revision ID: d2a8c6e4f913
+Revises: b7d4e1f0c352
+Create Date: 2026-10-19 10:50:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a8c6e4f913'
+down_revision = 'b7d4e1f0c352'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('videos', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('scenes', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('videos', schema=None) as batch_op:
+        batch_op.drop_column('scenes')
@@ -0,0 +1,28 @@
+"""add video mezzanine_path and mezzanine_profile
+
+Revision ID: f5c9a3b1d764
+Revises: d2a8c6e4f913
+Create Date: 2026-10-19 11:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5c9a3b1d764'
+down_revision = 'd2a8c6e4f913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('videos', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('mezzanine_path', sa.String(length=200), nullable=True))
+        batch_op.add_column(sa.Column('mezzanine_profile', sa.String(length=100), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('videos', schema=None) as batch_op:
+        batch_op.drop_column('mezzanine_profile')
+        batch_op.drop_column('mezzanine_path')
@@ -0,0 +1,79 @@
+import hashlib
+import io
+import threading
+import uuid
+
+
+class FakeS3Error(Exception):
+    pass
+
+
+class FakeS3Client:
+    """In-process stand-in for the boto3 S3 client calls used by S3Storage."""
+
+    def __init__(self, fail_on_part=None):
+        self.objects = {}
+        self.uploads = {}
+        self.aborted_uploads = []
+        self.requested_ranges = []
+        self.part_threads = set()
+        self.fail_on_part = fail_on_part
+        self._lock = threading.Lock()
+
+    def put_object(self, Bucket, Key, Body):
+        data = Body.read() if hasattr(Body, "read") else Body
+        with self._lock:
+            self.objects[(Bucket, Key)] = data
+        return {"ETag": hashlib.md5(data).hexdigest()}
+
+    def get_object(self, Bucket, Key, Range=None):
+        data = self._get(Bucket, Key)
+        if Range:
+            start, end = (int(value) for value in Range[len("bytes="):].split("-"))
+            with self._lock:
+                self.requested_ranges.append((start, end))
+            data = data[start:end + 1]
+        return {"Body": io.BytesIO(data), "ContentLength": len(data)}
+
+    def head_object(self, Bucket, Key):
+        return {"ContentLength": len(self._get(Bucket, Key))}
+
+    def delete_object(self, Bucket, Key):
+        with self._lock:
+            self.objects.pop((Bucket, Key), None)
+
+    def create_multipart_upload(self, Bucket, Key):
+        upload_id = str(uuid.uuid4())
+        with self._lock:
+            self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        if PartNumber == self.fail_on_part:
+            raise FakeS3Error(f"Part {PartNumber} failed")
+        with self._lock:
+            self.uploads[UploadId][PartNumber] = Body
+            self.part_threads.add(threading.current_thread().name)
+        return {"ETag": hashlib.md5(Body).hexdigest()}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        with self._lock:
+            parts = self.uploads.pop(UploadId)
+            numbers = [part["PartNumber"] for part in MultipartUpload["Parts"]]
+            if numbers != sorted(parts):
+                raise FakeS3Error("Parts are missing or out of order")
+            for part in MultipartUpload["Parts"]:
+                if part["ETag"] != hashlib.md5(parts[part["PartNumber"]]).hexdigest():
+                    raise FakeS3Error(f"ETag mismatch for part {part['PartNumber']}")
+            self.objects[(Bucket, Key)] = b"".join(parts[number] for number in numbers)
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        with self._lock:
+            self.uploads.pop(UploadId, None)
+            self.aborted_uploads.append(UploadId)
+
+    def _get(self, bucket, key):
+        with self._lock:
+            if (bucket, key) not in self.objects:
+                raise FakeS3Error(f"NoSuchKey: {key}")
+            return self.objects[(bucket, key)]
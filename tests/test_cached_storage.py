@@ -0,0 +1,145 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from app.service.storage.cached_storage import CachedStorage
+from app.service.storage.s3_storage import S3Storage
+from tests.fake_s3 import FakeS3Client, FakeS3Error
+
+
+class SlowS3Storage(S3Storage):
+    """Counts downloads and holds them long enough for concurrent callers to pile up."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.downloads = []
+
+    def download_file(self, location, local_path):
+        self.downloads.append(location)
+        time.sleep(0.05)
+        return super().download_file(location, local_path)
+
+
+class TestCachedStorage(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.client = FakeS3Client()
+        self.remote = SlowS3Storage(bucket="bucket", prefix="videos/", client=self.client, work_dir=self.work_dir)
+        self.storage = CachedStorage(self.remote, cache_dir=os.path.join(self.work_dir, "cache"), max_bytes=10)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def _put(self, name, data):
+        self.client.objects[("bucket", f"videos/{name}")] = data
+        return f"s3://bucket/videos/{name}"
+
+    def _read(self, location):
+        with self.storage.local_copy(location) as local_path:
+            with open(local_path, "rb") as f:
+                return f.read()
+
+    def test_second_read_is_served_from_cache(self):
+        location = self._put("a.mp4", b"data")
+        before = self.storage.stats()
+
+        self.assertEqual(self._read(location), b"data")
+        self.assertEqual(self._read(location), b"data")
+
+        stats = self.storage.stats()
+        self.assertEqual(self.remote.downloads, [location])
+        self.assertEqual(stats["hits"] - before["hits"], 1)
+        self.assertEqual(stats["misses"] - before["misses"], 1)
+        self.assertEqual(stats["bytes_fetched"] - before["bytes_fetched"], 4)
+        self.assertEqual(stats["cached_bytes"], 4)
+
+    def test_least_recently_used_files_are_evicted(self):
+        first, second, third = self._put("a.mp4", b"aaaa"), self._put("b.mp4", b"bbbb"), self._put("c.mp4", b"cccc")
+
+        self._read(first)
+        self._read(second)
+        self._read(first)
+        self._read(third)
+
+        self.assertEqual(list(self.storage._entries), [first, third])
+        self.assertEqual(self.storage.stats()["cached_bytes"], 8)
+
+    def test_pinned_files_are_not_evicted(self):
+        first, second, third = self._put("a.mp4", b"aaaa"), self._put("b.mp4", b"bbbb"), self._put("c.mp4", b"cccc")
+
+        with self.storage.local_copy(first) as pinned_path:
+            self._read(second)
+            self._read(third)
+            self.assertTrue(os.path.exists(pinned_path))
+            self.assertEqual(list(self.storage._entries), [first, third])
+
+    def test_concurrent_reads_share_one_download(self):
+        location = self._put("a.mp4", b"data")
+        results = []
+
+        threads = [threading.Thread(target=lambda: results.append(self._read(location))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [b"data"] * 8)
+        self.assertEqual(self.remote.downloads, [location])
+
+    def test_failed_download_is_raised_and_not_cached(self):
+        location = "s3://bucket/videos/missing.mp4"
+
+        with self.assertRaises(FakeS3Error):
+            self._read(location)
+
+        self.assertEqual(self.storage._entries, {})
+        self.assertEqual(self.storage._fetches, {})
+
+    def test_saved_files_are_kept_in_cache(self):
+        local_path = os.path.join(self.work_dir, "output.mp4")
+        with open(local_path, "wb") as f:
+            f.write(b"data")
+
+        location = self.storage.save_file(local_path, "output.mp4")
+
+        self.assertEqual(self.client.objects[("bucket", "videos/output.mp4")], b"data")
+        self.assertEqual(self._read(location), b"data")
+        self.assertEqual(self.remote.downloads, [])
+
+    def test_delete_removes_cached_file(self):
+        location = self._put("a.mp4", b"data")
+        with self.storage.local_copy(location) as local_path:
+            pass
+
+        self.storage.delete(location)
+
+        self.assertFalse(os.path.exists(local_path))
+        self.assertEqual(self.storage.stats()["cached_bytes"], 0)
+        self.assertEqual(self.client.objects, {})
+
+
+    def test_directories_of_exited_processes_are_removed(self):
+        cache_root = os.path.join(self.work_dir, "cache")
+        exited = subprocess.Popen([sys.executable, "-c", ""])
+        exited.wait()
+        stale_dir, live_dir, other_dir = (os.path.join(cache_root, name)
+                                          for name in (str(exited.pid), str(os.getppid()), "downloads"))
+        for directory in (stale_dir, live_dir, other_dir):
+            os.makedirs(directory)
+            with open(os.path.join(directory, "cached.mp4"), "wb") as f:
+                f.write(b"data")
+
+        CachedStorage(self.remote, cache_dir=cache_root, max_bytes=10)
+
+        self.assertFalse(os.path.exists(stale_dir))
+        self.assertTrue(os.path.exists(live_dir))
+        self.assertTrue(os.path.exists(other_dir))
+        self.assertTrue(os.path.exists(self.storage.cache_dir))
+
+if __name__ == "__main__":
+    unittest.main()
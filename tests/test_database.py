@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from flask import Flask
+from flask_migrate import Migrate
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import OperationalError
+
+from app.database import ReadDatabase, configure_sqlite, engine_options, upgrade_database
+from app.extension import db
+from app.videos.models import Video
+
+
+class TestEngineOptions(unittest.TestCase):
+    def test_file_databases_get_a_sized_pool(self):
+        options = engine_options("sqlite:////tmp/videos.db")
+
+        self.assertIn("pool_size", options)
+        self.assertIn("max_overflow", options)
+        self.assertTrue(options["pool_pre_ping"])
+
+    def test_in_memory_sqlite_has_no_pool_sizing(self):
+        options = engine_options("sqlite:///:memory:")
+
+        self.assertNotIn("pool_size", options)
+        self.assertIn("pool_recycle", options)
+
+
+class TestSQLiteConfiguration(unittest.TestCase):
+    def setUp(self):
+        self.db_dir = tempfile.mkdtemp()
+        self.uri = f"sqlite:///{os.path.join(self.db_dir, 'videos.db')}"
+
+    def tearDown(self):
+        shutil.rmtree(self.db_dir, ignore_errors=True)
+
+    def test_pragmas_are_applied_to_new_connections(self):
+        engine = create_engine(self.uri)
+        configure_sqlite(engine)
+
+        with engine.connect() as connection:
+            self.assertEqual(connection.execute(text("PRAGMA journal_mode")).scalar(), "wal")
+            self.assertEqual(connection.execute(text("PRAGMA busy_timeout")).scalar(), 5000)
+            self.assertEqual(connection.execute(text("PRAGMA synchronous")).scalar(), 1)  # NORMAL
+        engine.dispose()
+
+    def test_read_session_sees_writes_and_cannot_write(self):
+        app = Flask(__name__, instance_path=self.db_dir)
+        app.config["SQLALCHEMY_DATABASE_URI"] = self.uri
+        app.config["SQLALCHEMY_READ_DATABASE_URI"] = self.uri
+        db.init_app(app)
+        read_db = ReadDatabase(db)
+        read_db.init_app(app)
+
+        with app.app_context():
+            db.create_all()
+            db.session.add(Video(id=1, filename="test_video.mp4", size=12345, duration=60,
+                                 file_path="/mock/path/test_video.mp4"))
+            db.session.commit()
+
+            self.assertIsNot(read_db.session, db.session)
+            self.assertEqual(read_db.query(Video).filter_by(id=1).one().filename, "test_video.mp4")
+            with self.assertRaises(OperationalError):
+                read_db.session.execute(text("DELETE FROM videos"))
+            read_db.session.rollback()
+
+        with app.app_context():
+            db.engine.dispose()
+            read_db.session.get_bind().dispose()
+
+    def test_read_session_falls_back_to_primary(self):
+        app = Flask(__name__)
+        app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+        db.init_app(app)
+        read_db = ReadDatabase(db)
+        read_db.init_app(app)
+
+        with app.app_context():
+            self.assertIs(read_db.session, db.session)
+            self.assertIs(read_db.query(Video).session, db.session())
+
+
+class TestUpgradeDatabase(unittest.TestCase):
+    def setUp(self):
+        self.db_dir = tempfile.mkdtemp()
+        self.app = Flask(__name__, instance_path=self.db_dir)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(self.db_dir, 'videos.db')}"
+        db.init_app(self.app)
+        Migrate(self.app, db, directory=os.path.join(os.path.dirname(__file__), "..", "migrations"))
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.engine.dispose()
+        shutil.rmtree(self.db_dir, ignore_errors=True)
+
+    def test_migrations_run_only_when_behind(self):
+        with self.app.app_context():
+            self.assertTrue(upgrade_database(db.engine))
+            self.assertIn("videos", inspect(db.engine).get_table_names())
+
+            self.assertFalse(upgrade_database(db.engine))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from app.service.processor.ffmpeg_runner import FFmpegRunner
+
+
+class TestFFmpegRunner(unittest.TestCase):
+    def setUp(self):
+        self.ffmpeg_runner = FFmpegRunner(ffmpeg_binary="ffmpeg")
+
+    @patch("app.service.processor.ffmpeg_runner.subprocess.run")
+    def test_run_raises_on_failure(self, mock_run):
+        mock_run.return_value = MagicMock(returncode=1, stderr="Invalid data found\n")
+
+        with self.assertRaises(RuntimeError) as context:
+            self.ffmpeg_runner.run(["-i", "broken.mp4", "out.mp4"])
+
+        self.assertIn("Invalid data found", str(context.exception))
+
+    @patch("app.service.processor.ffmpeg_runner.FFmpegRunner.run")
+    def test_normalize_sets_fixed_gop(self, mock_run):
+        with patch("app.service.processor.ffmpeg_runner.Config") as MockConfig:
+            MockConfig.MEZZANINE_FPS = 25
+            MockConfig.MEZZANINE_GOP_SECONDS = 2
+            self.ffmpeg_runner.normalize("in.mp4", "out.mp4", has_audio=True)
+
+        args = mock_run.call_args[0][0]
+        self.assertEqual(args[args.index("-g") + 1], "50")
+        self.assertEqual(args[args.index("-keyint_min") + 1], "50")
+        self.assertEqual(args[-1], "out.mp4")
+
+    @patch("app.service.processor.ffmpeg_runner.FFmpegRunner.run")
+    def test_normalize_adds_silent_audio(self, mock_run):
+        self.ffmpeg_runner.normalize("in.mp4", "out.mp4", has_audio=False)
+
+        args = mock_run.call_args[0][0]
+        self.assertIn("lavfi", args)
+        self.assertEqual(args[args.index("-map", args.index("-map") + 1) + 1], "1:a:0")
+
+    @patch("app.service.processor.ffmpeg_runner.FFmpegRunner.run")
+    def test_concat_stream_copies(self, mock_run):
+        self.ffmpeg_runner.concat(["a.mp4", "b.mp4"], "merged.mp4")
+
+        args = mock_run.call_args[0][0]
+        self.assertEqual(args[args.index("-c") + 1], "copy")
+        self.assertEqual(args[args.index("-f") + 1], "concat")
+
+    @patch("app.service.processor.ffmpeg_runner.FFmpegRunner.run")
+    def test_cut_stream_copies(self, mock_run):
+        self.ffmpeg_runner.cut("in.mp4", 2, 5, "out.mp4")
+
+        mock_run.assert_called_once_with(["-ss", "2", "-i", "in.mp4", "-t", "3", "-c", "copy",
+                                          "-avoid_negative_ts", "make_zero", "-movflags", "+faststart",
+                                          "out.mp4"])
+
+    def test_is_keyframe_aligned(self):
+        with patch("app.service.processor.ffmpeg_runner.Config") as MockConfig:
+            MockConfig.MEZZANINE_FPS = 30
+            MockConfig.MEZZANINE_GOP_SECONDS = 1
+            self.assertTrue(FFmpegRunner.is_keyframe_aligned(4))
+            self.assertFalse(FFmpegRunner.is_keyframe_aligned(4.5))
+
+    def test_mezzanine_profile_changes_with_config(self):
+        profile = FFmpegRunner.get_mezzanine_profile()
+
+        with patch("app.service.processor.ffmpeg_runner.Config.MEZZANINE_WIDTH", 1920):
+            self.assertNotEqual(FFmpegRunner.get_mezzanine_profile(), profile)
+
+
+if __name__ == "__main__":
+    unittest.main()
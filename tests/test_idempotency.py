@@ -0,0 +1,150 @@
+import io
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from flask import Flask
+
+from app.exceptions.video_exceptions import VideoProcessingException
+from app.extension import db
+from app.idempotency import idempotency_store
+from app.routes.video_routes import video_routes
+from app.service.video_service import VideoService
+from app.service.worker.share_reaper import ShareReaper
+from app.videos.models import IdempotencyKey
+
+
+class TestIdempotency(unittest.TestCase):
+    def setUp(self):
+        # A file rather than in-memory database, so that concurrent requests get their own connections
+        self.db_dir = tempfile.mkdtemp()
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(self.db_dir, 'videos.db')}"
+        db.init_app(self.app)
+        self.app.register_blueprint(video_routes)
+        with self.app.app_context():
+            db.create_all()
+        self.headers = {'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey'), 'Idempotency-Key': 'key-1'}
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.engine.dispose()
+        shutil.rmtree(self.db_dir, ignore_errors=True)
+
+    def _trim(self, body=None, headers=None):
+        return self.app.test_client().post('/video/1/trim', json=body or {"start": 1, "end": 4},
+                                           headers=headers or self.headers)
+
+    def test_retries_replay_the_first_response(self):
+        with patch.object(VideoService, 'trim_video', return_value={"video_id": 2}) as mock_trim_video:
+            first = self._trim()
+            retry = self._trim()
+
+        mock_trim_video.assert_called_once()
+        self.assertEqual((retry.status_code, retry.json), (first.status_code, first.json))
+        self.assertEqual(retry.headers['Idempotent-Replayed'], 'true')
+
+    def test_requests_without_a_key_are_not_recorded(self):
+        headers = {'Authorization': self.headers['Authorization']}
+        with patch.object(VideoService, 'trim_video', return_value={"video_id": 2}) as mock_trim_video:
+            self._trim(headers=headers)
+            self._trim(headers=headers)
+
+        self.assertEqual(mock_trim_video.call_count, 2)
+        with self.app.app_context():
+            self.assertEqual(IdempotencyKey.query.count(), 0)
+
+    def test_key_reused_for_a_different_request_is_rejected(self):
+        with patch.object(VideoService, 'trim_video', return_value={"video_id": 2}):
+            self._trim()
+            response = self._trim(body={"start": 2, "end": 4})
+
+        self.assertEqual(response.status_code, 422)
+
+    def test_server_errors_are_not_recorded(self):
+        with patch.object(VideoService, 'trim_video',
+                          side_effect=[VideoProcessingException("encoder crashed"), {"video_id": 2}]) as mock_trim_video:
+            failed = self._trim()
+            retry = self._trim()
+
+        self.assertEqual(failed.status_code, 500)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(mock_trim_video.call_count, 2)
+
+    def test_concurrent_duplicates_share_one_execution(self):
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def slow_trim(*args, **kwargs):
+            calls.append(args)
+            started.set()
+            release.wait(5)
+            return {"video_id": 2}
+
+        responses = []
+        with patch.object(VideoService, 'trim_video', side_effect=slow_trim):
+            first = threading.Thread(target=lambda: responses.append(self._trim()))
+            first.start()
+            started.wait(5)
+            duplicate = threading.Thread(target=lambda: responses.append(self._trim()))
+            duplicate.start()
+            release.set()
+            first.join()
+            duplicate.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([response.json for response in responses], [{"video_id": 2}] * 2)
+
+    def test_duplicate_gives_up_waiting_with_conflict(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow_trim(*args, **kwargs):
+            started.set()
+            release.wait(5)
+            return {"video_id": 2}
+
+        with patch.object(VideoService, 'trim_video', side_effect=slow_trim), \
+                patch.object(idempotency_store, 'wait_seconds', 0.1):
+            first = threading.Thread(target=self._trim)
+            first.start()
+            started.wait(5)
+            duplicate = self._trim()
+            release.set()
+            first.join()
+
+        self.assertEqual(duplicate.status_code, 409)
+
+    def test_upload_retries_match_on_file_content(self):
+        def upload(content):
+            return self.app.test_client().post('/video', data={'file': (io.BytesIO(content), 'video.mp4')},
+                                               headers=self.headers)
+
+        with patch.object(VideoService, 'upload_video', return_value={"video_id": 1}) as mock_upload_video:
+            self.assertEqual(upload(b"video data").status_code, 201)
+            self.assertEqual(upload(b"video data").status_code, 201)
+            self.assertEqual(upload(b"other data").status_code, 422)
+
+        mock_upload_video.assert_called_once()
+
+    def test_expired_keys_are_claimed_afresh_and_reaped(self):
+        with patch.object(VideoService, 'trim_video', return_value={"video_id": 2}) as mock_trim_video:
+            self._trim()
+            with self.app.app_context():
+                IdempotencyKey.query.update({"expiry_time": datetime.utcnow() - timedelta(seconds=1)})
+                db.session.commit()
+            self._trim()
+
+        self.assertEqual(mock_trim_video.call_count, 2)
+        with self.app.app_context():
+            IdempotencyKey.query.update({"expiry_time": datetime.utcnow() - timedelta(seconds=1)})
+            db.session.commit()
+            ShareReaper(interval_seconds=0).reap()
+            self.assertEqual(IdempotencyKey.query.count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
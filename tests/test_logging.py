@@ -0,0 +1,108 @@
+import json
+import logging
+import queue
+import sys
+import unittest
+
+from app.logging import (ContextFilter, DebugRateLimitFilter, JsonFormatter, NonBlockingQueueHandler, current_job_id,
+                         parse_levels, records_discarded)
+from app.tracing import Tracer
+
+
+def make_record(level=logging.INFO, msg="Saving video for file: %s", args=("a.mp4",), lineno=1, created=None):
+    record = logging.LogRecord("app.service", level, "video_service.py", lineno, msg, args, None)
+    if created is not None:
+        record.created = created
+    return record
+
+
+class TestStructuredRecords(unittest.TestCase):
+    def test_records_carry_request_and_job_ids(self):
+        token = current_job_id.set("job1")
+        try:
+            with Tracer(sample_rate=0.0).trace("GET /video/<int:video_id>", trace_id="abc123def456"):
+                record = make_record()
+                ContextFilter().filter(record)
+        finally:
+            current_job_id.reset(token)
+
+        entry = json.loads(JsonFormatter().format(record))
+        self.assertEqual(entry["message"], "Saving video for file: a.mp4")
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(entry["logger"], "app.service")
+        self.assertEqual(entry["request_id"], "abc123def456")
+        self.assertEqual(entry["job_id"], "job1")
+
+    def test_exceptions_are_included(self):
+        try:
+            raise ValueError("bad input")
+        except ValueError:
+            record = logging.LogRecord("app", logging.ERROR, __file__, 1, "failed", None, sys.exc_info())
+
+        entry = json.loads(JsonFormatter().format(record))
+        self.assertIn("ValueError: bad input", entry["exception"])
+
+    def test_per_logger_levels_are_parsed(self):
+        self.assertEqual(parse_levels("app.service=debug, werkzeug=WARNING,"),
+                         {"app.service": "DEBUG", "werkzeug": "WARNING"})
+
+
+class TestDebugRateLimit(unittest.TestCase):
+    def test_debug_records_are_limited_per_call_site_and_second(self):
+        rate_limit = DebugRateLimitFilter(limit=2)
+        before = records_discarded.value(reason="rate_limited")
+
+        passed = [rate_limit.filter(make_record(logging.DEBUG, created=100.5)) for _ in range(5)]
+        other_site = rate_limit.filter(make_record(logging.DEBUG, lineno=2, created=100.5))
+        next_second = rate_limit.filter(make_record(logging.DEBUG, created=101.0))
+
+        self.assertEqual(passed, [True, True, False, False, False])
+        self.assertTrue(other_site)
+        self.assertTrue(next_second)
+        self.assertEqual(records_discarded.value(reason="rate_limited") - before, 3)
+
+    def test_other_levels_are_not_limited(self):
+        rate_limit = DebugRateLimitFilter(limit=1)
+
+        self.assertTrue(all(rate_limit.filter(make_record(logging.INFO, created=100.0)) for _ in range(5)))
+
+
+class TestNonBlockingQueueHandler(unittest.TestCase):
+    def test_messages_are_resolved_before_queueing(self):
+        log_queue = queue.Queue()
+        paths = ["a.mp4"]
+
+        NonBlockingQueueHandler(log_queue).handle(make_record(args=(paths,)))
+        paths.append("b.mp4")
+
+        queued = log_queue.get_nowait()
+        self.assertEqual((queued.msg, queued.args), ("Saving video for file: ['a.mp4']", None))
+        self.assertEqual(json.loads(JsonFormatter().format(queued))["message"], "Saving video for file: ['a.mp4']")
+
+    def test_exceptions_are_rendered_before_queueing(self):
+        log_queue = queue.Queue()
+        try:
+            raise ValueError("bad input")
+        except ValueError:
+            record = logging.LogRecord("app", logging.ERROR, __file__, 1, "failed", None, sys.exc_info())
+
+        NonBlockingQueueHandler(log_queue).handle(record)
+
+        queued = log_queue.get_nowait()
+        self.assertIsNone(queued.exc_info)
+        self.assertIn("ValueError: bad input", json.loads(JsonFormatter().format(queued))["exception"])
+        self.assertIn("ValueError: bad input", logging.Formatter().format(queued))
+
+    def test_records_are_dropped_when_the_queue_is_full(self):
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+        before = records_discarded.value(reason="queue_full")
+
+        handler.handle(make_record())
+        handler.handle(make_record())
+
+        self.assertEqual(handler.queue.qsize(), 1)
+        self.assertEqual(records_discarded.value(reason="queue_full") - before, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+
+import pytest
+from flask import Flask
+
+from app.metrics import Metrics
+from app.metrics.instrumentation import timed, stage_timer, stage_seconds, stage_errors, count_frames, frames_processed
+from app.routes.metrics_routes import metrics_routes
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = Metrics()
+
+    def test_counter_and_gauge_values_by_label(self):
+        counter = self.metrics.counter("requests_total", "Requests")
+        counter.inc(stage="a")
+        counter.inc(2, stage="a")
+        counter.inc(stage="b")
+        gauge = self.metrics.gauge("in_flight", "In flight")
+        gauge.set(5)
+        gauge.dec()
+
+        self.assertEqual(counter.value(stage="a"), 3)
+        self.assertEqual(counter.value(stage="b"), 1)
+        self.assertEqual(gauge.value(), 4)
+
+    def test_registering_a_name_twice_returns_the_same_metric(self):
+        counter = self.metrics.counter("requests_total", "Requests")
+
+        self.assertIs(self.metrics.counter("requests_total", "Requests"), counter)
+        with self.assertRaises(ValueError):
+            self.metrics.gauge("requests_total", "Requests")
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = self.metrics.histogram("duration_seconds", "Duration", buckets=(0.1, 1))
+        for value in (0.05, 0.5, 0.7, 3):
+            histogram.observe(value, stage="x")
+
+        samples = {(name, labels.get("le")): value for name, labels, value in histogram.samples()}
+
+        self.assertEqual(samples[("duration_seconds_bucket", "0.1")], 1)
+        self.assertEqual(samples[("duration_seconds_bucket", "1.0")], 3)
+        self.assertEqual(samples[("duration_seconds_bucket", "+Inf")], 4)
+        self.assertEqual(samples[("duration_seconds_count", None)], 4)
+        self.assertAlmostEqual(samples[("duration_seconds_sum", None)], 4.25)
+
+    def test_render_prometheus_text(self):
+        self.metrics.counter("uploads_total", "Uploads").inc(stage='say "hi"')
+        self.metrics.histogram("duration_seconds", "Duration", buckets=(1,)).observe(0.5)
+
+        text = self.metrics.render()
+
+        self.assertIn("# HELP uploads_total Uploads\n# TYPE uploads_total counter\n", text)
+        self.assertIn('uploads_total{stage="say \\"hi\\""} 1\n', text)
+        self.assertIn('duration_seconds_bucket{le="+Inf"} 1\n', text)
+        self.assertIn("# TYPE duration_seconds histogram\n", text)
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_timed_records_duration_and_errors_by_type(self):
+        @timed("test.stage")
+        def fail():
+            raise KeyError("missing")
+
+        count = stage_seconds.count(stage="test.stage")
+        with self.assertRaises(KeyError):
+            fail()
+
+        self.assertEqual(stage_seconds.count(stage="test.stage"), count + 1)
+        self.assertEqual(stage_errors.value(stage="test.stage", error="KeyError"), 1)
+        self.assertEqual(fail.__name__, "fail")
+
+    def test_stage_timer_records_duration(self):
+        count = stage_seconds.count(stage="test.block")
+        with stage_timer("test.block"):
+            pass
+
+        self.assertEqual(stage_seconds.count(stage="test.block"), count + 1)
+
+    def test_count_frames_passes_frames_through(self):
+        frames = list(count_frames(iter(range(5)), "test"))
+
+        self.assertEqual(frames, [0, 1, 2, 3, 4])
+        self.assertEqual(frames_processed.value(operation="test"), 5)
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(metrics_routes)
+    return app.test_client()
+
+
+def test_metrics_endpoint(client):
+    response = client.get('/metrics', headers={'Authorization': 'Bearer supersecretkey'})
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert b"# TYPE video_stage_duration_seconds histogram" in response.data
+
+
+def test_metrics_endpoint_requires_token(client):
+    response = client.get('/metrics')
+
+    assert response.status_code == 403
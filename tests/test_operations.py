@@ -0,0 +1,221 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+import proglog
+from flask import Flask
+
+from app.config import Config
+from app.exceptions.video_exceptions import VideoOperationCancelledException
+from app.operations import Operation, OperationRegistry, current_operation, operation_registry
+from app.operations.progress import OperationProgressLogger
+from app.routes.operation_routes import operation_routes
+from app.routes.video_routes import video_routes
+from app.service.processor.video_processor import VideoProcessor
+from app.service.video_service import VideoService
+
+
+def parse_events(body):
+    """(event, data) pairs of a Server-Sent Events body, without comments."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n") if not line.startswith(":"))
+        if fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def fake_encode(frames, on_frame=None):
+    """A write_videofile that drives the logger through an audio pass and frames like moviepy does."""
+    def write_videofile(file_path, temp_audiofile_path="", logger=None, **kwargs):
+        logger = proglog.default_bar_logger(logger)
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        with open(os.path.join(temp_audiofile_path, f"{name}TEMP_MPY_wvf_snd.mp3"), "wb") as f:
+            f.write(b"audio")
+        logger(chunk__total=2)
+        for i in range(3):
+            logger(chunk__index=i)
+        with open(file_path, "wb") as f:
+            logger(frame_index__total=frames)
+            for i in range(frames + 1):
+                logger(frame_index__index=i)
+                f.write(b"frame")
+                if on_frame is not None:
+                    on_frame(i)
+    return write_videofile
+
+
+class TestOperationProgress(unittest.TestCase):
+    def test_moviepy_bars_become_progress(self):
+        operation = Operation("op", "trim")
+        logger = OperationProgressLogger(operation)
+
+        logger(chunk__total=4)
+        self.assertEqual((operation.stage, operation.total), ("audio", 4))
+        logger(frame_index__total=100)
+        logger(frame_index__index=0)
+        logger(frame_index__index=25)
+
+        snapshot = operation.snapshot()
+        self.assertEqual((snapshot["stage"], snapshot["done"], snapshot["total"]), ("video", 25, 100))
+        self.assertEqual(snapshot["percent"], 25.0)
+        self.assertGreater(snapshot["fps"], 0)
+        self.assertIsNotNone(snapshot["eta_seconds"])
+        self.assertEqual(logger.logs, [])
+
+    def test_cancellation_stops_the_encode_at_the_next_update(self):
+        operation = Operation("op", "trim")
+        logger = OperationProgressLogger(operation)
+        logger(frame_index__index=1)
+
+        self.assertTrue(operation.cancel())
+        with self.assertRaises(VideoOperationCancelledException):
+            logger(frame_index__index=2)
+
+    def test_finished_operations_cannot_be_cancelled(self):
+        operation = Operation("op", "trim")
+        operation.finish("succeeded")
+
+        self.assertFalse(operation.cancel())
+
+    def test_registry_refuses_ids_of_running_operations_and_prunes_finished_ones(self):
+        registry = OperationRegistry(retention_seconds=0)
+        operation = registry.start("op", "trim")
+
+        self.assertIsNone(registry.start("op", "merge"))
+        operation.finish("succeeded")
+        registry.start("other", "trim")
+        self.assertIsNone(registry.get("op"))
+
+
+class TestCancelledEncodeCleanup(unittest.TestCase):
+    def setUp(self):
+        self.video_dir = tempfile.mkdtemp()
+        self.video_processor = VideoProcessor(video_dir=self.video_dir, storage=MagicMock())
+
+    def tearDown(self):
+        shutil.rmtree(self.video_dir, ignore_errors=True)
+
+    def test_cancelled_encode_removes_partial_output_and_temp_audio(self):
+        operation = Operation("op", "trim")
+        clip = MagicMock()
+        clip.write_videofile.side_effect = fake_encode(10, on_frame=lambda i: i == 4 and operation.cancel())
+        output_path = os.path.join(self.video_dir, "trimmed.mp4")
+
+        token = current_operation.set(operation)
+        try:
+            with self.assertRaises(VideoOperationCancelledException):
+                self.video_processor._save_trimmed_video(clip, output_path)
+        finally:
+            current_operation.reset(token)
+
+        self.assertEqual(os.listdir(self.video_dir), [])
+
+    def test_finished_encode_keeps_its_output(self):
+        clip = MagicMock()
+        clip.write_videofile.side_effect = fake_encode(3)
+        output_path = os.path.join(self.video_dir, "merged.mp4")
+
+        self.video_processor._write_videofile(clip, output_path)
+
+        self.assertTrue(os.path.exists(output_path))
+        self.assertEqual(clip.write_videofile.call_args.kwargs["temp_audiofile_path"], self.video_dir)
+
+
+class TestOperationRoutes(unittest.TestCase):
+    def setUp(self):
+        self.config = patch.multiple(Config, OPERATION_EVENT_INTERVAL_SECONDS=0, OPERATION_START_TIMEOUT_SECONDS=2)
+        self.config.start()
+        app = Flask(__name__)
+        app.register_blueprint(video_routes)
+        app.register_blueprint(operation_routes)
+        self.app = app
+        self.headers = {'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')}
+
+    def tearDown(self):
+        self.config.stop()
+
+    def _trim(self, operation_id):
+        return self.app.test_client().post('/video/1/trim', json={"start": 1, "end": 4},
+                                           headers={**self.headers, 'X-Operation-Id': operation_id})
+
+    def _encoding_trim(self, release, frames=10):
+        """A trim that reports progress like an encode and then waits for release, honouring cancellation."""
+        def trim_video(*args, **kwargs):
+            logger = OperationProgressLogger(current_operation.get())
+            logger(frame_index__total=frames)
+            logger(frame_index__index=frames // 2)
+            while not release.wait(0.01):
+                logger(frame_index__index=frames // 2)
+            logger(frame_index__index=frames)
+            return {"message": "Video trimmed successfully", "video_id": 2}
+        return trim_video
+
+    def test_progress_is_streamed_until_the_operation_ends(self):
+        release = threading.Event()
+        responses = []
+        with patch.object(VideoService, 'trim_video', side_effect=self._encoding_trim(release)):
+            thread = threading.Thread(target=lambda: responses.append(self._trim("stream-op")))
+            thread.start()
+            stream = self.app.test_client().get('/operations/stream-op/events', headers=self.headers,
+                                                buffered=False)
+            chunks = stream.response
+            first = next(chunks).decode()
+            release.set()
+            body = first + b"".join(chunks).decode()
+            thread.join()
+
+        self.assertEqual(stream.mimetype, 'text/event-stream')
+        events = parse_events(body)
+        self.assertEqual(events[0][0], "progress")
+        self.assertEqual(events[-1], ("end", {**events[-1][1], "state": "succeeded"}))
+        self.assertIn(5, [data["done"] for event, data in events if event == "progress"])
+        self.assertEqual(responses[0].headers['X-Operation-Id'], "stream-op")
+
+    def test_cancelled_operation_ends_the_request_with_conflict(self):
+        release = threading.Event()
+        responses = []
+        with patch.object(VideoService, 'trim_video', side_effect=self._encoding_trim(release)):
+            thread = threading.Thread(target=lambda: responses.append(self._trim("cancel-op")))
+            thread.start()
+            operation = operation_registry.wait_for("cancel-op", 2)
+            operation.wait_for_change(0, 2)
+
+            cancel = self.app.test_client().delete('/operations/cancel-op', headers=self.headers)
+            thread.join(5)
+            release.set()
+
+        self.assertEqual(cancel.status_code, 202)
+        self.assertEqual(responses[0].status_code, 409)
+        status = self.app.test_client().get('/operations/cancel-op', headers=self.headers)
+        self.assertEqual(status.json["state"], "cancelled")
+        again = self.app.test_client().delete('/operations/cancel-op', headers=self.headers)
+        self.assertEqual(again.status_code, 409)
+
+    def test_running_operation_id_cannot_be_reused(self):
+        release = threading.Event()
+        with patch.object(VideoService, 'trim_video', side_effect=self._encoding_trim(release)):
+            thread = threading.Thread(target=self._trim, args=("busy-op",))
+            thread.start()
+            operation_registry.wait_for("busy-op", 2)
+            duplicate = self._trim("busy-op")
+            release.set()
+            thread.join()
+
+        self.assertEqual(duplicate.status_code, 409)
+
+    def test_invalid_and_unknown_operations(self):
+        with patch.object(Config, 'OPERATION_START_TIMEOUT_SECONDS', 0):
+            self.assertEqual(self._trim("not/valid!").status_code, 400)
+            self.assertEqual(self.app.test_client().get('/operations/missing/events',
+                                                        headers=self.headers).status_code, 404)
+            self.assertEqual(self.app.test_client().delete('/operations/missing',
+                                                           headers=self.headers).status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
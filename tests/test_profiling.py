@@ -0,0 +1,161 @@
+import os
+import pstats
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from flask import Flask
+
+from app.config import Config
+from app.profiling import MAX_STACK_DEPTH, StackSampler
+from app.routes.profiling_routes import profiling_routes
+from app.routes.video_routes import video_routes
+from app.service.video_service import VideoService
+
+
+class TestRequestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+        self.config = patch.multiple(Config, PROFILING_ENABLED=True, PROFILE_DIR=self.profile_dir, PROFILE_MAX_FILES=2)
+        self.config.start()
+        app = Flask(__name__)
+        app.register_blueprint(video_routes)
+        app.register_blueprint(profiling_routes)
+        self.client = app.test_client()
+        self.headers = {'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')}
+
+    def tearDown(self):
+        self.config.stop()
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+    def _trim(self, headers):
+        with patch.object(VideoService, 'trim_video', return_value={"message": "Video trimmed successfully"}):
+            return self.client.post('/video/1/trim', json={"start": 10, "end": 20}, headers=headers)
+
+    def test_opted_in_request_is_profiled_and_downloadable(self):
+        response = self._trim({**self.headers, 'X-Profile': '1'})
+
+        self.assertEqual(response.status_code, 200)
+        profile_id = response.headers['X-Profile-Id']
+        download = self.client.get(f'/profiles/{profile_id}', headers=self.headers)
+        self.assertEqual(download.status_code, 200)
+        path = os.path.join(self.profile_dir, 'download.prof')
+        with open(path, 'wb') as f:
+            f.write(download.data)
+        self.assertTrue(any(name == 'trim' for _, _, name in pstats.Stats(path).stats))
+
+        summary = self.client.get(f'/profiles/{profile_id}?format=text', headers=self.headers)
+        self.assertIn(b'cumulative', summary.data)
+
+    def test_profiles_are_stored_under_the_trace_id(self):
+        response = self._trim({**self.headers, 'X-Profile': '1', 'X-Trace-Id': '4bf92f3577b34da6'})
+
+        self.assertEqual(response.headers['X-Profile-Id'], '4bf92f3577b34da6')
+        self.assertEqual(os.listdir(self.profile_dir), ['4bf92f3577b34da6.prof'])
+
+    def test_requests_are_not_profiled_without_opting_in(self):
+        response = self._trim(self.headers)
+
+        self.assertNotIn('X-Profile-Id', response.headers)
+        self.assertEqual(os.listdir(self.profile_dir), [])
+
+    def test_requests_are_not_profiled_when_disabled(self):
+        with patch.object(Config, 'PROFILING_ENABLED', False):
+            response = self._trim({**self.headers, 'X-Profile': '1'})
+
+        self.assertNotIn('X-Profile-Id', response.headers)
+
+    def test_unauthenticated_requests_cannot_profile(self):
+        response = self._trim({'X-Profile': '1'})
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(os.listdir(self.profile_dir), [])
+
+    def test_only_the_newest_profiles_are_kept(self):
+        profile_ids = []
+        for _ in range(3):
+            profile_ids.append(self.client.post('/video/1/trim?profile=1', json={}, headers=self.headers)
+                               .headers['X-Profile-Id'])
+            time.sleep(0.01)
+
+        self.assertEqual(sorted(os.listdir(self.profile_dir)), sorted(f"{i}.prof" for i in profile_ids[1:]))
+
+    def test_unknown_profile_ids_are_not_found(self):
+        self.assertEqual(self.client.get('/profiles/' + 'a' * 32, headers=self.headers).status_code, 404)
+        self.assertEqual(self.client.get('/profiles/..%2Fapp', headers=self.headers).status_code, 404)
+
+
+class TestStackSampler(unittest.TestCase):
+    def test_busy_threads_are_aggregated_by_stack(self):
+        sampler = StackSampler(interval_ms=1)
+        stop = threading.Event()
+
+        def spin():
+            while not stop.is_set():
+                sum(range(1000))
+
+        thread = threading.Thread(target=spin)
+        thread.start()
+        try:
+            for _ in range(20):
+                sampler.sample()
+        finally:
+            stop.set()
+            thread.join()
+
+        hot = sampler.hot_stacks(limit=1)
+        self.assertEqual(hot["samples"], 20)
+        self.assertTrue(hot["stacks"][0]["stack"][-1].startswith("spin "))
+        self.assertIn("spin (test_profiling.py", sampler.collapsed())
+
+    def test_deep_stacks_keep_the_innermost_frames(self):
+        sampler = StackSampler(interval_ms=1)
+        stop, running = threading.Event(), threading.Event()
+
+        def leaf():
+            running.set()
+            while not stop.is_set():
+                sum(range(1000))
+
+        def recurse(depth):
+            return recurse(depth - 1) if depth else leaf()
+
+        thread = threading.Thread(target=recurse, args=(MAX_STACK_DEPTH * 2,))
+        thread.start()
+        try:
+            self.assertTrue(running.wait(5))
+            sampler.sample()
+        finally:
+            stop.set()
+            thread.join()
+
+        stack = sampler.hot_stacks(limit=1)["stacks"][0]["stack"]
+        self.assertEqual(len(stack), MAX_STACK_DEPTH)
+        self.assertTrue(stack[-1].startswith("leaf "))
+
+    def test_idle_threads_are_not_counted(self):
+        sampler = StackSampler(interval_ms=1)
+        stop = threading.Event()
+        thread = threading.Thread(target=stop.wait)
+        thread.start()
+        try:
+            sampler.sample()
+        finally:
+            stop.set()
+            thread.join()
+
+        self.assertEqual(sampler.hot_stacks()["stacks"], [])
+
+    def test_hot_stacks_route(self):
+        app = Flask(__name__)
+        app.register_blueprint(profiling_routes)
+        headers = {'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')}
+
+        response = app.test_client().get('/profiles/hot-stacks?limit=5', headers=headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("stacks", response.json)
+        self.assertEqual(app.test_client().get('/profiles/hot-stacks').status_code, 403)
@@ -0,0 +1,78 @@
+import threading
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from flask import Flask
+
+from app.extension import db
+from app.service.share.revocation_list import RevocationList
+
+
+class TestRevocationList(unittest.TestCase):
+    def setUp(self):
+        self.revocation_list = RevocationList(refresh_seconds=0)
+        self.release = threading.Event()
+        self.loading = threading.Event()
+
+    def _blocking_load(self, token_ids):
+        def load():
+            self.loading.set()
+            self.release.wait(5)
+            return set(token_ids)
+        return load
+
+    def _refresh_in_background(self, token_ids):
+        with patch.object(RevocationList, '_load', side_effect=self._blocking_load(token_ids)):
+            thread = threading.Thread(target=self.revocation_list.is_revoked, args=("any",))
+            thread.start()
+            self.assertTrue(self.loading.wait(5))
+        return thread
+
+    def test_readers_keep_the_current_set_while_it_is_refreshed(self):
+        with patch.object(RevocationList, '_load', return_value={"old"}):
+            self.assertTrue(self.revocation_list.is_revoked("old"))
+
+        thread = self._refresh_in_background({"new"})
+        with patch.object(RevocationList, '_load') as mock_load:
+            self.assertTrue(self.revocation_list.is_revoked("old"))
+            self.assertFalse(self.revocation_list.is_revoked("new"))
+            mock_load.assert_not_called()
+        self.release.set()
+        thread.join()
+
+        self.assertEqual(self.revocation_list._token_ids, {"new"})
+
+    def test_readers_wait_for_the_first_load(self):
+        self.revocation_list.refresh_seconds = 60
+        thread = self._refresh_in_background({"revoked"})
+        results = []
+        reader = threading.Thread(target=lambda: results.append(self.revocation_list.is_revoked("revoked")))
+        reader.start()
+        reader.join(0.1)
+        self.assertTrue(reader.is_alive())
+
+        self.release.set()
+        thread.join()
+        reader.join()
+        self.assertEqual(results, [True])
+
+    def test_revocations_made_during_a_refresh_are_kept(self):
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        db.init_app(app)
+        with patch.object(RevocationList, '_load', return_value=set()):
+            self.revocation_list.is_revoked("any")
+
+        thread = self._refresh_in_background(set())
+        with app.app_context():
+            db.create_all()
+            self.revocation_list.revoke("revoked", datetime.utcnow() + timedelta(hours=1))
+        self.release.set()
+        thread.join()
+
+        self.assertEqual(self.revocation_list._token_ids, {"revoked"})
+
+
+if __name__ == "__main__":
+    unittest.main()
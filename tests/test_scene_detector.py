@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+
+from app.service.processor.scene_detector import SceneDetector
+
+
+def make_frames(colours, frames_per_colour, size=(18, 32)):
+    """Yield solid-colour frames, frames_per_colour of each colour in turn."""
+    for colour in colours:
+        for _ in range(frames_per_colour):
+            yield np.full(size + (3,), colour, dtype=np.uint8)
+
+
+class TestSceneDetector(unittest.TestCase):
+    def setUp(self):
+        self.scene_detector = SceneDetector(sample_fps=10, batch_size=4, histogram_bins=16, threshold=0.3,
+                                            min_scene_length=0.5)
+
+    def test_detect_boundaries(self):
+        frames = make_frames([(0, 0, 0), (255, 255, 255), (255, 0, 0)], frames_per_colour=10)
+
+        self.assertEqual(self.scene_detector.detect(frames), [1.0, 2.0])
+
+    def test_detect_boundary_across_batches(self):
+        # The cut falls on the first frame of the second batch
+        frames = make_frames([(0, 0, 0), (255, 255, 255)], frames_per_colour=8)
+
+        self.assertEqual(self.scene_detector.detect(frames), [0.8])
+
+    def test_detect_static_video(self):
+        frames = make_frames([(40, 80, 120)], frames_per_colour=25)
+
+        self.assertEqual(self.scene_detector.detect(frames), [])
+
+    def test_detect_respects_min_scene_length(self):
+        frames = make_frames([(0, 0, 0), (255, 255, 255), (0, 0, 0), (255, 255, 255)], frames_per_colour=3)
+
+        self.assertEqual(self.scene_detector.detect(frames), [0.6])
+
+    def test_detect_holds_one_batch_at_a_time(self):
+        consumed = []
+
+        def frames():
+            for index, frame in enumerate(make_frames([(0, 0, 0)], frames_per_colour=12)):
+                consumed.append(index)
+                yield frame
+
+        batches = self.scene_detector._batches(frames())
+        first_batch = next(batches)
+
+        self.assertEqual(first_batch.shape[0], 4)
+        self.assertEqual(len(consumed), 4)
+
+    def test_slice_scenes(self):
+        self.assertEqual(SceneDetector.slice_scenes([1.0, 2.5, 4.0, 6.0], start=2, end=5), [0.5, 2.0])
+
+    def test_concatenate_scenes(self):
+        self.assertEqual(SceneDetector.concatenate_scenes([[1.0], [], [0.5]], [3.0, 2.0, 4.0]),
+                         [1.0, 3.0, 5.0, 5.5])
+
+
+if __name__ == "__main__":
+    unittest.main()
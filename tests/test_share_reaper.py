@@ -0,0 +1,90 @@
+import time
+import unittest
+from unittest.mock import patch
+from datetime import datetime, timedelta
+
+from flask import Flask
+
+from app.extension import db
+from app.service.video_service import VideoService
+from app.service.worker.share_reaper import ShareReaper, share_rows
+from app.videos.models import Video, VideoShare, RevokedShareToken
+
+
+class TestShareReaper(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        self.app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+        db.init_app(self.app)
+
+        with self.app.app_context():
+            db.create_all()
+            db.session.add(Video(id=1, filename="test_video.mp4", size=12345, duration=60,
+                                 file_path="/mock/path/test_video.mp4"))
+            now = datetime.utcnow()
+            for i in range(5):
+                db.session.add(VideoShare(video_id=1, token=f"expired{i}", expiry_time=now - timedelta(minutes=i + 1)))
+            db.session.add(VideoShare(video_id=1, token="valid", expiry_time=now + timedelta(hours=1)))
+            db.session.add(RevokedShareToken(token_id="expired", expiry_time=now - timedelta(minutes=1)))
+            db.session.add(RevokedShareToken(token_id="valid", expiry_time=now + timedelta(hours=1)))
+            db.session.commit()
+
+        self.reaper = ShareReaper(interval_seconds=0, batch_size=2)
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_reap_deletes_expired_rows_in_batches(self):
+        with self.app.app_context():
+            reaped = self.reaper.reap()
+
+            self.assertEqual(reaped, 5)
+            self.assertEqual([share.token for share in VideoShare.query.all()], ["valid"])
+            self.assertEqual([row.token_id for row in RevokedShareToken.query.all()], ["valid"])
+            self.assertEqual(share_rows.value(), 1)
+
+    def test_share_rows_are_counted_only_once_per_count_interval(self):
+        reaper = ShareReaper(interval_seconds=0, batch_size=2, count_interval_seconds=3600)
+        reaper._counted_at = time.monotonic()
+        share_rows.set(10)
+
+        with self.app.app_context():
+            reaper.reap()
+            self.assertEqual(share_rows.value(), 5)
+
+            reaper._counted_at -= 3600
+            reaper.reap()
+            self.assertEqual(share_rows.value(), 1)
+
+    @patch("app.service.video_service.url_for", side_effect=lambda endpoint, token, _external: token)
+    def test_shares_created_between_counts_are_added(self, mock_url_for):
+        reaper = ShareReaper(interval_seconds=0, batch_size=2, count_interval_seconds=3600)
+
+        with self.app.app_context():
+            reaper.reap()
+            self.assertEqual(share_rows.value(), 1)
+
+            shares = VideoService().generate_shareable_links([1, 1])["shares"]
+            VideoService().generate_shareable_link(1)
+            VideoService().revoke_shareable_link(shares[0]["share_url"])
+            reaper.reap()
+
+            self.assertEqual(share_rows.value(), 3)
+            self.assertEqual(VideoShare.query.count(), 3)
+
+    def test_reap_without_expired_rows_is_a_no_op(self):
+        with self.app.app_context():
+            self.reaper.reap()
+
+            self.assertEqual(self.reaper.reap(), 0)
+
+    def test_zero_interval_does_not_start_a_thread(self):
+        self.reaper.init_app(self.app)
+
+        self.assertIsNone(self.reaper._thread)
+
+
+if __name__ == "__main__":
+    unittest.main()
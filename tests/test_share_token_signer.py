@@ -0,0 +1,51 @@
+import unittest
+from datetime import datetime, timedelta
+
+from app.service.share.share_token_signer import ShareTokenSigner, InvalidShareTokenError
+
+
+class TestShareTokenSigner(unittest.TestCase):
+    def setUp(self):
+        self.signer = ShareTokenSigner("secret")
+        self.expiry_time = datetime(2030, 1, 1, 12, 30, 15)
+
+    def test_verify_returns_signed_claims(self):
+        token = self.signer.sign(42, self.expiry_time)
+
+        video_id, expiry_time, token_id = self.signer.verify(token)
+
+        self.assertEqual(video_id, 42)
+        self.assertEqual(expiry_time, self.expiry_time)
+        self.assertEqual(len(token_id), 16)
+        self.assertTrue(ShareTokenSigner.is_signed(token))
+
+    def test_tokens_for_the_same_link_are_unique(self):
+        first, second = self.signer.sign(42, self.expiry_time), self.signer.sign(42, self.expiry_time)
+
+        self.assertNotEqual(first, second)
+        self.assertNotEqual(self.signer.verify(first)[2], self.signer.verify(second)[2])
+
+    def test_tampered_token_is_rejected(self):
+        token = self.signer.sign(42, self.expiry_time)
+        forged_payload = ShareTokenSigner._encode(b"\x00" * 7 + b"\x07" + ShareTokenSigner._decode(token.split(".")[0])[8:])
+
+        with self.assertRaises(InvalidShareTokenError):
+            self.signer.verify(f"{forged_payload}.{token.split('.')[1]}")
+
+    def test_token_signed_with_another_key_is_rejected(self):
+        token = ShareTokenSigner("other").sign(42, self.expiry_time)
+
+        with self.assertRaises(InvalidShareTokenError):
+            self.signer.verify(token)
+
+    def test_malformed_token_is_rejected(self):
+        for token in ["abc.def", "a.b.c", "!!!.???"]:
+            with self.assertRaises(InvalidShareTokenError):
+                self.signer.verify(token)
+
+    def test_database_tokens_are_not_signed(self):
+        self.assertFalse(ShareTokenSigner.is_signed("ab" * 32))
+
+
+if __name__ == "__main__":
+    unittest.main()
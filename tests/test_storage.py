@@ -0,0 +1,189 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+from app.service.processor.video_processor import VideoProcessor
+from app.service.storage.base_storage import Storage
+from app.service.storage.local_storage import LocalStorage
+from app.service.storage.s3_storage import S3Storage
+from tests.fake_s3 import FakeS3Client, FakeS3Error
+
+
+class TestStorage(unittest.TestCase):
+    def test_incomplete_backend_cannot_be_instantiated(self):
+        class IncompleteStorage(Storage):
+            def save_file(self, local_path, key):
+                return key
+
+        with self.assertRaises(TypeError):
+            IncompleteStorage()
+
+
+class TestLocalStorage(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.storage = LocalStorage(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_save_file_keeps_files_in_root(self):
+        file_path = os.path.join(self.root, "video.mp4")
+        with open(file_path, "wb") as f:
+            f.write(b"data")
+
+        self.assertEqual(self.storage.save_file(file_path, "video.mp4"), file_path)
+        self.assertTrue(os.path.exists(file_path))
+
+    def test_save_file_moves_files_into_root(self):
+        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
+            temp_file.write(b"data")
+
+        location = self.storage.save_file(temp_file.name, "video.mp4")
+
+        self.assertEqual(location, os.path.join(self.root, "video.mp4"))
+        self.assertFalse(os.path.exists(temp_file.name))
+
+    def test_iter_chunks_and_delete(self):
+        file_path = os.path.join(self.root, "video.mp4")
+        with open(file_path, "wb") as f:
+            f.write(b"0123456789")
+
+        self.assertEqual(list(self.storage.iter_chunks(file_path, chunk_size=4)), [b"0123", b"4567", b"89"])
+        self.storage.delete(file_path)
+        self.storage.delete(file_path)
+        self.assertFalse(os.path.exists(file_path))
+
+
+class TestS3Storage(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.client = FakeS3Client()
+        self.storage = S3Storage(bucket="bucket", prefix="videos/", client=self.client, work_dir=self.work_dir,
+                                 multipart_threshold=1024, part_size=256, max_concurrency=4)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def _write_working_file(self, name, data):
+        file_path = os.path.join(self.work_dir, name)
+        with open(file_path, "wb") as f:
+            f.write(data)
+        return file_path
+
+    def test_save_small_file_uses_single_put(self):
+        file_path = self._write_working_file("small.mp4", b"x" * 100)
+
+        location = self.storage.save_file(file_path, "small.mp4")
+
+        self.assertEqual(location, "s3://bucket/videos/small.mp4")
+        self.assertEqual(self.client.objects[("bucket", "videos/small.mp4")], b"x" * 100)
+        self.assertFalse(os.path.exists(file_path))
+
+    def test_save_large_file_uses_parallel_multipart_upload(self):
+        data = os.urandom(256 * 7 + 13)
+        file_path = self._write_working_file("large.mp4", data)
+
+        with patch.object(self.client, "upload_part", wraps=self.client.upload_part) as mock_upload_part:
+            self.storage.save_file(file_path, "large.mp4")
+
+        self.assertEqual(mock_upload_part.call_count, 8)
+        self.assertEqual(self.client.objects[("bucket", "videos/large.mp4")], data)
+        self.assertEqual(self.client.uploads, {})
+
+    def test_failed_part_aborts_multipart_upload(self):
+        self.storage.client = FakeS3Client(fail_on_part=3)
+        file_path = self._write_working_file("large.mp4", os.urandom(2048))
+
+        with self.assertRaises(FakeS3Error):
+            self.storage.save_file(file_path, "large.mp4")
+
+        self.assertEqual(len(self.storage.client.aborted_uploads), 1)
+        self.assertNotIn(("bucket", "videos/large.mp4"), self.storage.client.objects)
+        self.assertTrue(os.path.exists(file_path))
+
+    def test_download_large_file_uses_ranges(self):
+        data = os.urandom(256 * 5 + 1)
+        self.client.objects[("bucket", "videos/large.mp4")] = data
+        local_path = os.path.join(self.work_dir, "download.mp4")
+
+        self.storage.download_file("s3://bucket/videos/large.mp4", local_path)
+
+        with open(local_path, "rb") as f:
+            self.assertEqual(f.read(), data)
+        self.assertEqual(sorted(self.client.requested_ranges),
+                         [(0, 255), (256, 511), (512, 767), (768, 1023), (1024, 1279), (1280, 1280)])
+        self.assertFalse(os.path.exists(f"{local_path}.part"))
+
+    def test_local_copy_is_removed_after_use(self):
+        self.client.objects[("bucket", "videos/small.mp4")] = b"data"
+
+        with self.storage.local_copy("s3://bucket/videos/small.mp4") as local_path:
+            with open(local_path, "rb") as f:
+                self.assertEqual(f.read(), b"data")
+
+        self.assertFalse(os.path.exists(local_path))
+
+    def test_iter_chunks_size_and_delete(self):
+        self.client.objects[("bucket", "videos/small.mp4")] = b"0123456789"
+        location = "s3://bucket/videos/small.mp4"
+
+        self.assertEqual(list(self.storage.iter_chunks(location, chunk_size=4)), [b"0123", b"4567", b"89"])
+        self.assertEqual(self.storage.size(location), 10)
+        self.storage.delete(location)
+        self.assertEqual(self.client.objects, {})
+
+    def test_rejects_locations_of_other_buckets(self):
+        with self.assertRaises(ValueError):
+            self.storage.size("s3://other/videos/small.mp4")
+
+
+class TestVideoProcessorWithS3Storage(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.client = FakeS3Client()
+        self.storage = S3Storage(bucket="bucket", prefix="", client=self.client, work_dir=self.work_dir)
+        self.video_processor = VideoProcessor(video_dir=self.work_dir, storage=self.storage)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    @patch("moviepy.video.io.VideoFileClip.VideoFileClip")
+    @patch("app.service.processor.video_processor.VideoProcessor._generate_unique_filename",
+           return_value="unique-id.mp4")
+    def test_process_upload_stores_remotely(self, mock_generate_filename, mock_video_clip):
+        mock_file = MagicMock()
+        mock_file.filename = "test.mp4"
+        mock_file.save.side_effect = lambda path: open(path, "wb").write(b"video data")
+        mock_video_clip.return_value.duration = 12.0
+
+        video = self.video_processor.process_upload(mock_file)
+
+        self.assertEqual(video.file_path, "s3://bucket/unique-id.mp4")
+        self.assertEqual(video.size, 10)
+        self.assertEqual(self.client.objects[("bucket", "unique-id.mp4")], b"video data")
+        self.assertFalse(os.path.exists(os.path.join(self.work_dir, "unique-id.mp4")))
+
+    @patch("app.service.processor.video_processor.VideoProcessor._get_video_clip")
+    @patch("app.service.processor.video_processor.VideoProcessor._generate_unique_filename",
+           return_value="trimmed.mp4")
+    def test_trim_reads_local_copy_and_stores_output(self, mock_generate_filename, mock_get_video_clip):
+        self.client.objects[("bucket", "source.mp4")] = b"source"
+        source = MagicMock(file_path="s3://bucket/source.mp4", filename="source.mp4", mezzanine_path=None)
+        mock_clip = mock_get_video_clip.return_value.subclipped.return_value
+        mock_clip.duration = 3
+        mock_clip.write_videofile.side_effect = lambda path, **kwargs: open(path, "wb").write(b"trimmed")
+
+        trimmed_video = self.video_processor.trim_video_file(source, 1, 4)
+
+        local_source = mock_get_video_clip.call_args[0][0]
+        self.assertTrue(local_source.startswith(self.work_dir))
+        self.assertFalse(os.path.exists(local_source))
+        self.assertEqual(trimmed_video.file_path, "s3://bucket/trimmed.mp4")
+        self.assertEqual(self.client.objects[("bucket", "trimmed.mp4")], b"trimmed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import uuid
+from unittest.mock import patch
+
+from flask import Flask
+
+from app.config import Config
+from app.extension import db
+from app.service.worker.storage_reconciler import StorageReconciler, bytes_reclaimed
+from app.videos.models import Video
+
+
+class TestStorageReconciler(unittest.TestCase):
+    def setUp(self):
+        self.video_dir = tempfile.mkdtemp()
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        self.app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+        db.init_app(self.app)
+
+        name = str(uuid.uuid4())
+        self.referenced = [self._file(f"{name}.mp4"), self._file(f"{name}_proxy.mp4"), self._file(f"{name}.peaks"),
+                           self._file(f"{name}_mezzanine.mp4", absolute=True)]
+        with self.app.app_context():
+            db.create_all()
+            db.session.add(Video(id=1, filename=f"{name}.mp4", size=100, duration=10, file_path=self.referenced[0],
+                                 proxy_path=self.referenced[1], waveform_path=self.referenced[2],
+                                 mezzanine_path=self.referenced[3]))
+            db.session.commit()
+
+        self.reconciler = StorageReconciler(video_dir=self.video_dir, interval_seconds=0, grace_seconds=60,
+                                            batch_size=2)
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+        shutil.rmtree(self.video_dir, ignore_errors=True)
+
+    def _file(self, name, size=100, age_seconds=3600, absolute=False, directory=None):
+        path = os.path.join(directory or self.video_dir, name)
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+        modified = time.time() - age_seconds
+        os.utime(path, (modified, modified))
+        return os.path.abspath(path) if absolute else path
+
+    def test_deletes_old_unreferenced_files_and_reports_reclaimed_bytes(self):
+        orphans = [self._file(f"{uuid.uuid4()}.mp4", size=1000),
+                   self._file(f".partial-{uuid.uuid4()}.mp4", size=200),
+                   self._file(f"{uuid.uuid4()}TEMP_MPY_wvf_snd.mp3", size=50),
+                   self._file(f"preview-{uuid.uuid4()}.mp4", size=25)]
+        before = bytes_reclaimed.value()
+
+        with self.app.app_context():
+            report = self.reconciler.reconcile()
+
+        self.assertEqual(report, {"files_checked": 8, "files_deleted": 4, "bytes_reclaimed": 1275})
+        self.assertFalse(any(os.path.exists(path) for path in orphans))
+        self.assertTrue(all(os.path.exists(path) for path in self.referenced))
+        self.assertEqual(bytes_reclaimed.value() - before, 1275)
+
+    def test_files_stored_under_another_spelling_are_kept(self):
+        link_dir = os.path.join(tempfile.mkdtemp(), "videos")
+        os.symlink(self.video_dir, link_dir)
+        names = [f"{uuid.uuid4()}.mp4" for _ in range(4)]
+        paths = [self._file(name) for name in names]
+        with self.app.app_context():
+            db.session.add(Video(id=2, filename=names[0], size=100, duration=10,
+                                 file_path=os.path.join(link_dir, names[0]),
+                                 proxy_path=os.path.relpath(paths[1]),
+                                 waveform_path=os.path.join(self.video_dir, ".", names[2]),
+                                 mezzanine_path=f"s3://bucket/videos/{names[3]}"))
+            db.session.commit()
+            orphan = self._file(f"{uuid.uuid4()}.mp4")
+
+            report = self.reconciler.reconcile()
+
+        self.assertEqual(report["files_deleted"], 1)
+        self.assertFalse(os.path.exists(orphan))
+        self.assertTrue(all(os.path.exists(path) for path in paths + self.referenced))
+        shutil.rmtree(os.path.dirname(link_dir))
+
+    def test_recent_and_foreign_files_are_kept(self):
+        recent = self._file(f"{uuid.uuid4()}.mp4", age_seconds=0)
+        foreign = self._file("notes.txt")
+        os.mkdir(os.path.join(self.video_dir, "cache"))
+        cached = self._file(f"{uuid.uuid4()}.mp4", directory=os.path.join(self.video_dir, "cache"))
+
+        with self.app.app_context():
+            report = self.reconciler.reconcile()
+
+        self.assertEqual(report["files_deleted"], 0)
+        self.assertTrue(all(os.path.exists(path) for path in (recent, foreign, cached)))
+
+    def test_storage_cache_directory_is_never_reconciled(self):
+        orphan = self._file(f"{uuid.uuid4()}.mp4")
+
+        with self.app.app_context(), patch.object(Config, 'STORAGE_CACHE_DIR', self.video_dir):
+            report = self.reconciler.reconcile()
+
+        self.assertEqual(report["files_checked"], 0)
+        self.assertTrue(os.path.exists(orphan))
+
+    def test_command_prints_the_report(self):
+        self._file(f"{uuid.uuid4()}.mp4", size=300)
+        self.reconciler.init_app(self.app)
+
+        result = self.app.test_cli_runner().invoke(args=["reconcile-storage"])
+
+        self.assertEqual(json.loads(result.output)["bytes_reclaimed"], 300)
+        self.assertIsNone(self.reconciler._thread)
+
+
+if __name__ == "__main__":
+    unittest.main()
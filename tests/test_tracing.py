@@ -0,0 +1,163 @@
+import json
+import logging
+import os
+import tempfile
+import unittest
+
+from flask import Flask
+from sqlalchemy import create_engine, text
+
+from app.metrics.instrumentation import timed
+from app.routes.video_routes import video_routes
+from app.service.worker.background_worker import BackgroundWorker
+from app.tracing import JsonLinesExporter, TraceIdFilter, Tracer, tracer
+from app.tracing.sql import trace_sql_statements
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+class TestTracer(unittest.TestCase):
+    def setUp(self):
+        self.exporter = ListExporter()
+        self.tracer = Tracer(sample_rate=1.0, exporter=self.exporter)
+
+    def test_child_spans_belong_to_the_root_span(self):
+        with self.tracer.trace("GET /video/<int:video_id>") as root:
+            with self.tracer.span("service.get_video") as child:
+                self.assertIs(self.tracer.current_span(), child)
+            self.assertIs(self.tracer.current_span(), root)
+
+        self.assertIsNone(self.tracer.current_span())
+        self.assertEqual([span.name for span in self.exporter.spans], ["service.get_video", "GET /video/<int:video_id>"])
+        self.assertEqual(child.trace_id, root.trace_id)
+        self.assertEqual(child.parent_id, root.span_id)
+        self.assertIsNone(root.parent_id)
+
+    def test_unsampled_traces_create_no_child_spans(self):
+        unsampled = Tracer(sample_rate=0.0, exporter=self.exporter)
+
+        with unsampled.trace("GET /videos") as root:
+            with unsampled.span("service.list_videos") as child:
+                self.assertIsNone(child)
+            self.assertEqual(unsampled.current_trace_id(), root.trace_id)
+
+        self.assertFalse(root.sampled)
+        self.assertEqual(self.exporter.spans, [])
+
+    def test_errors_are_recorded_on_the_span(self):
+        with self.assertRaises(ValueError):
+            with self.tracer.trace("job"):
+                raise ValueError("bad input")
+
+        self.assertEqual(self.exporter.spans[0].error, "ValueError: bad input")
+        self.assertIsNone(self.tracer.current_span())
+
+    def test_incoming_trace_id_is_joined(self):
+        with self.tracer.trace("GET /videos", trace_id="abc123def456") as root:
+            pass
+
+        self.assertEqual(root.trace_id, "abc123def456")
+
+
+class TestInstrumentationSpans(unittest.TestCase):
+    def setUp(self):
+        self.exporter = ListExporter()
+        self.previous = tracer.sample_rate, tracer.exporter
+        tracer.sample_rate, tracer.exporter = 1.0, self.exporter
+
+    def tearDown(self):
+        tracer.sample_rate, tracer.exporter = self.previous
+
+    def test_timed_stages_are_child_spans(self):
+        @timed("test.stage")
+        def stage():
+            return tracer.current_span()
+
+        with tracer.trace("root") as root:
+            span = stage()
+
+        self.assertEqual(span.name, "test.stage")
+        self.assertEqual(span.parent_id, root.span_id)
+
+    def test_sql_statements_are_child_spans(self):
+        trace_sql_statements(tracer)
+        engine = create_engine("sqlite://")
+
+        with tracer.trace("root") as root, engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        sql_spans = [span for span in self.exporter.spans if span.name == "sql"]
+        self.assertEqual(len(sql_spans), 1)
+        self.assertEqual(sql_spans[0].attributes["statement"], "SELECT 1")
+        self.assertEqual(sql_spans[0].parent_id, root.span_id)
+
+    def test_background_jobs_continue_the_submitting_trace(self):
+        worker = BackgroundWorker()
+        worker.init_app(Flask(__name__))
+
+        with tracer.trace("POST /upload") as root:
+            job_span = worker.submit(tracer.current_span).result(timeout=5)
+
+        self.assertEqual(job_span.name, "job current_span")
+        self.assertEqual(job_span.trace_id, root.trace_id)
+        self.assertEqual(job_span.parent_id, root.span_id)
+
+    def test_route_span_is_returned_to_the_caller(self):
+        app = Flask(__name__)
+        app.register_blueprint(video_routes)
+
+        response = app.test_client().get('/videos', headers={'X-Trace-Id': '4bf92f3577b34da6'})
+
+        self.assertEqual(response.headers['X-Trace-Id'], '4bf92f3577b34da6')
+        root = self.exporter.spans[-1]
+        self.assertEqual(root.name, "GET /videos")
+        self.assertEqual(root.attributes["status"], response.status_code)
+
+    def test_malformed_trace_id_starts_a_new_trace(self):
+        app = Flask(__name__)
+        app.register_blueprint(video_routes)
+
+        for trace_id in ('abc', 'x' * 32, 'a' * 33, '4bf92f35 77b34da6', '<script>'):
+            response = app.test_client().get('/videos', headers={'X-Trace-Id': trace_id})
+
+            self.assertNotEqual(response.headers['X-Trace-Id'], trace_id)
+            self.assertEqual(len(response.headers['X-Trace-Id']), 32)
+        uuid_trace_id = '0f8fad5b-d9cb-469f-a165-70867728950e'
+        response = app.test_client().get('/videos', headers={'X-Trace-Id': uuid_trace_id})
+        self.assertEqual(response.headers['X-Trace-Id'], uuid_trace_id)
+
+
+class TestJsonLinesExporter(unittest.TestCase):
+    def test_spans_are_written_one_per_line(self):
+        path = os.path.join(tempfile.mkdtemp(), "traces.jsonl")
+        exporter = JsonLinesExporter(path)
+        tracer = Tracer(sample_rate=1.0, exporter=exporter)
+
+        with tracer.trace("root", video_id=1):
+            with tracer.span("child"):
+                pass
+        exporter.close()
+
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([record["name"] for record in records], ["child", "root"])
+        self.assertEqual(records[1]["attributes"], {"video_id": 1})
+        self.assertEqual(records[0]["parent_id"], records[1]["span_id"])
+
+
+def test_log_records_carry_the_trace_id():
+    record = logging.LogRecord("app", logging.INFO, __file__, 1, "message", None, None)
+    trace_filter = TraceIdFilter()
+
+    trace_filter.filter(record)
+    assert record.trace_id == "-"
+
+    with Tracer(sample_rate=0.0).trace("root", trace_id="abc123def456"):
+        trace_filter.filter(record)
+    assert record.trace_id == "abc123def456"
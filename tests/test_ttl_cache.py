@@ -0,0 +1,66 @@
+import unittest
+from unittest.mock import patch
+
+from app.utils.ttl_cache import TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+    def test_get_returns_stored_value(self):
+        cache = TTLCache("test", max_entries=2, ttl_seconds=60)
+        cache.set(1, {"id": 1})
+
+        self.assertEqual(cache.get(1), {"id": 1})
+        self.assertIsNone(cache.get(2))
+
+    def test_least_recently_used_entries_are_dropped(self):
+        cache = TTLCache("test", max_entries=2, ttl_seconds=60)
+        cache.set(1, "a")
+        cache.set(2, "b")
+        cache.get(1)
+        cache.set(3, "c")
+
+        self.assertEqual(cache.get(1), "a")
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(cache.get(3), "c")
+        self.assertEqual(len(cache), 2)
+
+    @patch("app.utils.ttl_cache.time.monotonic")
+    def test_entries_expire(self, mock_monotonic):
+        cache = TTLCache("test", max_entries=2, ttl_seconds=60)
+        mock_monotonic.return_value = 100
+        cache.set(1, "a")
+        cache.set(2, "b", ttl_seconds=5)
+
+        mock_monotonic.return_value = 110
+        self.assertEqual(cache.get(1), "a")
+        self.assertIsNone(cache.get(2))
+
+        mock_monotonic.return_value = 161
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(len(cache), 0)
+
+    def test_expired_ttl_is_not_stored(self):
+        cache = TTLCache("test", max_entries=2, ttl_seconds=60)
+        cache.set(1, "a", ttl_seconds=-1)
+
+        self.assertIsNone(cache.get(1))
+
+    def test_zero_entries_disables_cache(self):
+        cache = TTLCache("test", max_entries=0, ttl_seconds=60)
+        cache.set(1, "a")
+
+        self.assertIsNone(cache.get(1))
+
+    def test_invalidate_and_clear(self):
+        cache = TTLCache("test", max_entries=2, ttl_seconds=60)
+        cache.set(1, "a")
+        cache.set(2, "b")
+
+        cache.invalidate(1)
+        self.assertIsNone(cache.get(1))
+        cache.clear()
+        self.assertIsNone(cache.get(2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,6 @@
 import os
+import shutil
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock, mock_open
 
@@ -31,10 +33,11 @@ class TestVideoProcessor(unittest.TestCase):
 
     @patch("builtins.open", new_callable=mock_open)
     @patch("os.path.getsize", return_value=1024)
-    @patch("app.service.processor.video_processor.VideoFileClip")
+    @patch("moviepy.video.io.VideoFileClip.VideoFileClip")
     @patch("app.service.processor.video_processor.VideoProcessor._generate_unique_filename",
            return_value="unique-id.mp4")
-    def test_process_upload(self, mock_generate_filename, mock_video_clip, mock_getsize, mock_open):
+    @patch("app.service.processor.video_processor.os.replace")
+    def test_process_upload(self, mock_replace, mock_generate_filename, mock_video_clip, mock_getsize, mock_open):
         mock_file = MagicMock()
         mock_file.filename = "test.mp4"
 
@@ -76,8 +79,113 @@ class TestVideoProcessor(unittest.TestCase):
         mock_get_video_clip.assert_called_once_with(mock_video.file_path)
         mock_clip.subclipped.assert_called_once_with(5, 15)
 
+    @patch("app.service.processor.video_processor.VideoProcessor._get_video_clip")
+    @patch("app.service.processor.video_processor.VideoProcessor._save_trimmed_video")
+    @patch("app.service.processor.video_processor.VideoProcessor._create_video_object")
+    def test_trim_video_file_preview_uses_proxy(self, mock_create_video_object, mock_save_trimmed,
+                                                mock_get_video_clip):
+        mock_video = MagicMock()
+        mock_video.file_path = "mock_path/test.mp4"
+        mock_video.proxy_path = "mock_path/test_proxy.mp4"
+        mock_video.filename = "test.mp4"
+
+        with patch.object(self.video_processor, "_store_output") as mock_store_output:
+            self.video_processor.trim_video_file(mock_video, start=5, end=15, preview=True)
+
+        mock_get_video_clip.assert_called_once_with(mock_video.proxy_path)
+        self.assertTrue(mock_save_trimmed.call_args[0][2])
+        self.assertTrue(os.path.basename(mock_save_trimmed.call_args[0][1]).startswith("preview-"))
+        mock_store_output.assert_not_called()  # Previews stay in the video directory
+
+    @patch("app.service.processor.video_processor.VideoProcessor._get_video_clip")
+    @patch("app.service.processor.video_processor.VideoProcessor._save_trimmed_video")
+    @patch("app.service.processor.video_processor.VideoProcessor._create_video_object")
+    def test_trim_video_file_preview_without_proxy_uses_original(self, mock_create_video_object,
+                                                                 mock_save_trimmed, mock_get_video_clip):
+        mock_video = MagicMock()
+        mock_video.file_path = "mock_path/test.mp4"
+        mock_video.proxy_path = None
+        mock_video.filename = "test.mp4"
+
+        self.video_processor.trim_video_file(mock_video, start=5, end=15, preview=True)
+
+        mock_get_video_clip.assert_called_once_with(mock_video.file_path)
+
+    @patch("app.service.processor.video_processor.FFmpegRunner")
+    @patch("app.service.processor.video_processor.VideoProcessor._get_video_clip")
+    @patch("app.service.processor.video_processor.VideoProcessor._create_mezzanine_video_object")
+    @patch("app.service.processor.video_processor.os.replace")
+    def test_trim_video_file_stream_copies_normalized_video(self, mock_replace, mock_create_video_object,
+                                                            mock_get_video_clip, MockFFmpegRunner):
+        MockFFmpegRunner.get_mezzanine_profile.return_value = "profile"
+        MockFFmpegRunner.is_keyframe_aligned.return_value = True
+        mock_video = MagicMock(mezzanine_path="mock_path/test_mezzanine.mp4", mezzanine_profile="profile")
+
+        self.video_processor.trim_video_file(mock_video, start=2, end=5)
+
+        MockFFmpegRunner.return_value.cut.assert_called_once()
+        self.assertEqual(MockFFmpegRunner.return_value.cut.call_args[0][:3], (mock_video.mezzanine_path, 2, 5))
+        mock_get_video_clip.assert_not_called()
+
+    @patch("app.service.processor.video_processor.FFmpegRunner")
+    @patch("moviepy.video.io.VideoFileClip.VideoFileClip")
+    @patch("moviepy.video.compositing.CompositeVideoClip.concatenate_videoclips")
+    @patch("app.service.processor.video_processor.VideoProcessor._save_merged_video")
+    @patch("app.service.processor.video_processor.VideoProcessor._create_video_object")
+    def test_merge_video_files_reencodes_mixed_profiles(self, mock_create_video_object, mock_save_merged,
+                                                        mock_concatenate, mock_video_clip, MockFFmpegRunner):
+        MockFFmpegRunner.get_mezzanine_profile.return_value = "profile"
+        videos = [MagicMock(filename="a.mp4", mezzanine_path="a_mezzanine.mp4", mezzanine_profile="profile"),
+                  MagicMock(filename="b.mp4", mezzanine_path=None, mezzanine_profile=None)]
+
+        self.video_processor.merge_video_files(videos)
+
+        MockFFmpegRunner.return_value.concat.assert_not_called()
+        mock_concatenate.assert_called_once()
+
+    def test_get_proxy_size(self):
+        self.assertEqual(self.video_processor._get_proxy_size(1920, 1080), (640, 360))
+        self.assertEqual(self.video_processor._get_proxy_size(1080, 1920), (202, 360))
+        self.assertEqual(self.video_processor._get_proxy_size(321, 241), (320, 240))
+
+    @patch("app.service.processor.video_processor.VideoProcessor._get_video_clip")
+    @patch("app.service.processor.video_processor.os.replace")
+    def test_generate_proxy(self, mock_replace, mock_get_video_clip):
+        mock_video = MagicMock()
+        mock_video.file_path = "mock_path/test.mp4"
+        mock_video.filename = "unique-id.mp4"
+        mock_clip = MagicMock(w=1280, h=720)
+        mock_get_video_clip.return_value = mock_clip
+
+        proxy_path = self.video_processor.generate_proxy(mock_video)
+
+        self.assertEqual(proxy_path, os.path.join(self.video_dir, "unique-id_proxy.mp4"))
+        mock_clip.resized.assert_called_once_with(new_size=(640, 360))
+        mock_clip.resized.return_value.write_videofile.assert_called_once()
+        mock_clip.close.assert_called_once()
+
+    def test_outputs_are_only_visible_once_complete(self):
+        video_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, video_dir, True)
+        video_processor = VideoProcessor(video_dir=video_dir, storage=MagicMock())
+        output_path = os.path.join(video_dir, "output.mp4")
+
+        with video_processor._atomic_output(output_path) as partial_path:
+            with open(partial_path, "wb") as partial_file:
+                partial_file.write(b"data")
+            self.assertFalse(os.path.exists(output_path))
+        self.assertEqual(os.listdir(video_dir), ["output.mp4"])
+
+        with self.assertRaises(RuntimeError):
+            with video_processor._atomic_output(os.path.join(video_dir, "failed.mp4")) as partial_path:
+                with open(partial_path, "wb") as partial_file:
+                    partial_file.write(b"half")
+                raise RuntimeError("encoder crashed")
+        self.assertEqual(os.listdir(video_dir), ["output.mp4"])
+
     @patch("moviepy.video.io.VideoFileClip.VideoFileClip.write_videofile")
-    def test_save_trimmed_video(self, mock_write_videofile):
+    @patch("app.service.processor.video_processor.os.replace")
+    def test_save_trimmed_video(self, mock_replace, mock_write_videofile):
         mock_clip = MagicMock()
         new_file_path = "mock_video_dir/trimmed.mp4"
 
@@ -85,7 +193,8 @@ class TestVideoProcessor(unittest.TestCase):
         mock_write_videofile.asset_not_called()
 
     @patch("moviepy.video.io.VideoFileClip.VideoFileClip.write_videofile")
-    def test_save_merged_video(self, mock_write_videofile):
+    @patch("app.service.processor.video_processor.os.replace")
+    def test_save_merged_video(self, mock_replace, mock_write_videofile):
         mock_final_clip = MagicMock()  # Mock the final video clip
         merged_file_path = "mock_video_dir/merged.mp4"
 
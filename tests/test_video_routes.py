@@ -102,6 +102,88 @@ def test_get_video_video_processing_exception(client):
         assert response.status_code == 500
         assert response.json == {"error": "Error processing video"}
 
+# Test for /video/<video_id>/content (GET) route
+def test_get_video_content(client):
+    with patch.object(VideoService, 'get_video_content') as mock_get_video_content:
+        mock_get_video_content.return_value = {"filename": "video.mp4", "size": 6, "chunks": iter([b"abc", b"def"])}
+        headers = {
+            'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')
+        }
+        response = client.get('/video/1/content', headers=headers)
+
+        assert response.status_code == 200
+        assert response.data == b"abcdef"
+        assert response.mimetype == "video/mp4"
+
+def test_get_video_content_not_found(client):
+    with patch.object(VideoService, 'get_video_content') as mock_get_video_content:
+        mock_get_video_content.side_effect = VideoNotFoundException("Video not found")
+        headers = {
+            'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')
+        }
+        response = client.get('/video/999/content', headers=headers)
+
+        assert response.status_code == 404
+
+def test_get_video_content_missing_file(client):
+    with patch.object(VideoService, 'get_video_content') as mock_get_video_content:
+        mock_get_video_content.side_effect = VideoProcessingException("No such file")
+        headers = {
+            'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')
+        }
+        response = client.get('/video/1/content', headers=headers)
+
+        assert response.status_code == 500
+        assert response.json == {"error": "No such file"}
+
+# Test for /video/<video_id>/waveform (GET) route
+def test_get_waveform(client):
+    with patch.object(VideoService, 'get_waveform') as mock_get_waveform:
+        mock_get_waveform.return_value = {"sample_rate": 22050, "samples_per_peak": 512, "levels": 4,
+                                          "peaks": b"\x80\x7f"}
+        headers = {
+            'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')
+        }
+        response = client.get('/video/1/waveform?level=1', headers=headers)
+
+        assert response.status_code == 200
+        assert response.data == b"\x80\x7f"
+        assert response.headers['X-Waveform-Samples-Per-Peak'] == '512'
+        mock_get_waveform.assert_called_once_with(1, 1)
+
+def test_get_waveform_not_found(client):
+    with patch.object(VideoService, 'get_waveform') as mock_get_waveform:
+        mock_get_waveform.side_effect = VideoNotFoundException("Waveform not available")
+        headers = {
+            'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')
+        }
+        response = client.get('/video/1/waveform', headers=headers)
+
+        assert response.status_code == 404
+        assert response.json == {"error": "Waveform not available"}
+
+# Test for /video/<video_id>/scenes (GET) route
+def test_get_scenes(client):
+    with patch.object(VideoService, 'get_scenes') as mock_get_scenes:
+        mock_get_scenes.return_value = {"id": 1, "scenes": [2.0, 4.5]}
+        headers = {
+            'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')
+        }
+        response = client.get('/video/1/scenes', headers=headers)
+
+        assert response.status_code == 200
+        assert response.json == {"id": 1, "scenes": [2.0, 4.5]}
+
+def test_get_scenes_not_found(client):
+    with patch.object(VideoService, 'get_scenes') as mock_get_scenes:
+        mock_get_scenes.side_effect = VideoNotFoundException("Scene index not available")
+        headers = {
+            'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')
+        }
+        response = client.get('/video/1/scenes', headers=headers)
+
+        assert response.status_code == 404
+
 # Test for /video/<video_id>/trim (POST) route
 def test_trim_video(client):
     with patch.object(VideoService, 'trim_video') as mock_trim_video:
@@ -114,6 +196,72 @@ def test_trim_video(client):
         assert response.status_code == 200
         assert response.json == {"message": "Video trimmed successfully"}
 
+def test_trim_video_preview(client):
+    with patch.object(VideoService, 'trim_video') as mock_trim_video:
+        mock_trim_video.return_value = {"message": "Video trim preview generated successfully"}
+        headers = {
+            'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')
+        }
+        response = client.post('/video/1/trim', json={"start": 10, "end": 20, "preview": True}, headers=headers)
+
+        assert response.status_code == 200
+        mock_trim_video.assert_called_once_with(1, 10, 20, preview=True)
+
+def test_trim_video_preview_must_be_boolean(client):
+    with patch.object(VideoService, 'trim_video') as mock_trim_video:
+        headers = {
+            'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')
+        }
+        response = client.post('/video/1/trim', json={"start": 10, "end": 20, "preview": "false"}, headers=headers)
+
+        assert response.status_code == 400
+        mock_trim_video.assert_not_called()
+
+def test_merge_videos_preview_must_be_boolean(client):
+    with patch.object(VideoService, 'merge_videos') as mock_merge_videos:
+        headers = {
+            'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')
+        }
+        response = client.post('/videos/merge', json={"video_ids": [1, 2], "preview": 0}, headers=headers)
+
+        assert response.status_code == 400
+        mock_merge_videos.assert_not_called()
+
+def test_get_preview(client, tmp_path):
+    preview_path = tmp_path / "preview.mp4"
+    preview_path.write_bytes(b"preview data")
+    with patch.object(VideoService, 'get_preview_path', return_value=str(preview_path)):
+        headers = {
+            'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')
+        }
+        response = client.get('/preview/preview.mp4', headers=headers)
+
+        assert response.status_code == 200
+        assert response.data == b"preview data"
+        assert response.mimetype == 'video/mp4'
+        response.close()
+
+def test_get_preview_expired(client):
+    with patch.object(VideoService, 'get_preview_path') as mock_get_preview_path:
+        mock_get_preview_path.side_effect = VideoNotFoundException("Preview not found: preview.mp4")
+        headers = {
+            'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')
+        }
+        response = client.get('/preview/preview.mp4', headers=headers)
+
+        assert response.status_code == 404
+
+def test_trim_video_invalid_times(client):
+    with patch.object(VideoService, 'trim_video') as mock_trim_video:
+        mock_trim_video.side_effect = VideoValidationException("Invalid time: soon")
+        headers = {
+            'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')
+        }
+        response = client.post('/video/1/trim', json={"start": "soon", "end": "00:00:04"}, headers=headers)
+
+        assert response.status_code == 400
+        assert response.json == {"error": "Invalid time: soon"}
+
 def test_trim_video_invalid_params(client):
     headers = {
         'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')
@@ -188,6 +336,41 @@ def test_merge_videos_video_processing_exception(client):
         assert response.status_code == 500
         assert response.json == {"error": "Error processing videos"}
 
+# Test for /videos (GET) route
+def test_get_videos_by_ids(client):
+    with patch.object(VideoService, 'get_videos') as mock_get_videos:
+        mock_get_videos.return_value = {"videos": [{"id": 1}, {"id": 2}], "not_found": []}
+        headers = {
+            'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')
+        }
+        response = client.get('/videos?ids=1,2', headers=headers)
+
+        assert response.status_code == 200
+        assert response.json == {"videos": [{"id": 1}, {"id": 2}], "not_found": []}
+        mock_get_videos.assert_called_once_with(['1', '2'])
+
+def test_list_videos(client):
+    with patch.object(VideoService, 'list_videos') as mock_list_videos:
+        mock_list_videos.return_value = {"videos": [{"id": 3}], "next_cursor": None}
+        headers = {
+            'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')
+        }
+        response = client.get('/videos?after=abc&limit=10', headers=headers)
+
+        assert response.status_code == 200
+        assert response.json == {"videos": [{"id": 3}], "next_cursor": None}
+        mock_list_videos.assert_called_once_with('abc', 10)
+
+def test_list_videos_invalid_limit(client):
+    with patch.object(VideoService, 'list_videos') as mock_list_videos:
+        mock_list_videos.side_effect = VideoValidationException("Invalid limit 0, expected 1 to 100")
+        headers = {
+            'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')
+        }
+        response = client.get('/videos?limit=0', headers=headers)
+
+        assert response.status_code == 400
+
 # Test for /video/<video_id>/share (POST) route
 def test_get_share_link(client):
     with patch.object(VideoService, 'generate_shareable_link') as mock_generate_shareable_link:
@@ -222,6 +405,37 @@ def test_get_share_link_video_processing_exception(client):
         assert response.status_code == 500
         assert response.json == {"error": "Error processing video"}
 
+# Test for /videos/share (POST) route
+def test_get_share_links(client):
+    with patch.object(VideoService, 'generate_shareable_links') as mock_generate_shareable_links:
+        mock_generate_shareable_links.return_value = {"shares": [{"video_id": 1, "share_url": "http://example.com/share/1"}]}
+        headers = {
+            'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')
+        }
+        response = client.post('/videos/share', json={"video_ids": [1]}, headers=headers)
+
+        assert response.status_code == 200
+        assert response.json == {"shares": [{"video_id": 1, "share_url": "http://example.com/share/1"}]}
+        mock_generate_shareable_links.assert_called_once_with([1])
+
+def test_get_share_links_missing_video_ids(client):
+    headers = {
+        'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')
+    }
+    response = client.post('/videos/share', json={}, headers=headers)
+
+    assert response.status_code == 400
+
+def test_get_share_links_video_not_found(client):
+    with patch.object(VideoService, 'generate_shareable_links') as mock_generate_shareable_links:
+        mock_generate_shareable_links.side_effect = VideoNotFoundException("Video not found Ids: [999]")
+        headers = {
+            'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')
+        }
+        response = client.post('/videos/share', json={"video_ids": [1, 999]}, headers=headers)
+
+        assert response.status_code == 404
+
 # Test for /video/share/<token> (GET) route
 def test_get_video_from_shared_token(client):
     with patch.object(VideoService, 'get_shared_video_from_token') as mock_get_shared_video_from_token:
@@ -295,6 +509,33 @@ def test_merge_videos_server_error(client):
         assert response.json == {"error": "Merge Failed"}
 
 
+# Test for /video/share/<token> (DELETE) route
+def test_revoke_share_link(client):
+    with patch.object(VideoService, 'revoke_shareable_link') as mock_revoke_shareable_link:
+        mock_revoke_shareable_link.return_value = {"message": "Shared link revoked"}
+
+        headers = {
+            'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')
+        }
+
+        response = client.delete('/video/share/abcd1234', headers=headers)
+
+        assert response.status_code == 200
+        assert response.json == {"message": "Shared link revoked"}
+        mock_revoke_shareable_link.assert_called_once_with('abcd1234')
+
+def test_revoke_share_link_not_found(client):
+    with patch.object(VideoService, 'revoke_shareable_link') as mock_revoke_shareable_link:
+        mock_revoke_shareable_link.side_effect = VideoNotFoundException("No shared video found")
+
+        headers = {
+            'Authorization': 'Bearer ' + os.getenv('API_TOKEN', 'supersecretkey')
+        }
+
+        response = client.delete('/video/share/abcd1234', headers=headers)
+
+        assert response.status_code == 404
+
 # Test for 500 error on generating shareable link
 def test_get_share_link_server_error(client):
     with patch.object(VideoService, 'generate_shareable_link', side_effect=Exception("Sharing Failed")):
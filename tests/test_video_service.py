@@ -4,16 +4,22 @@ from datetime import datetime, timedelta
 
 from flask import Flask
 
+from app.service.processor.ffmpeg_runner import FFmpegRunner
+from app.service.processor.video_processor import VideoProcessor
 from app.service.video_service import VideoService
 from app.exceptions.video_exceptions import (
     VideoValidationException,
     VideoProcessingException,
     VideoNotFoundException
 )
+import shutil
 import tempfile
+import time
 import os
-from app.extension import db
-from app.videos.models import Video
+from app.config import Config
+from app.extension import db, video_cache, share_cache
+from app.service.share.share_token_signer import ShareTokenSigner
+from app.videos.models import Video, VideoShare, RevokedShareToken
 
 
 class TestVideoService(unittest.TestCase):
@@ -24,6 +30,8 @@ class TestVideoService(unittest.TestCase):
         self.app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
         db.init_app(self.app)
+        video_cache.clear()
+        share_cache.clear()
 
         with self.app.app_context():
             db.create_all()  # Create tables
@@ -161,6 +169,213 @@ class TestVideoService(unittest.TestCase):
                 self.assertEqual(response["video_id"], merged_video.id)
                 mock_save.assert_called_once_with(merged_video)
 
+    @patch("app.service.processor.video_processor.FFmpegRunner")
+    def test_trim_normalized_video_with_string_timestamps(self, MockFFmpegRunner):
+        MockFFmpegRunner.get_mezzanine_profile.return_value = "profile"
+        MockFFmpegRunner.is_keyframe_aligned.side_effect = FFmpegRunner.is_keyframe_aligned
+        mock_video = MagicMock(id=1, mezzanine_path="/mock/path/source_mezzanine.mp4", mezzanine_profile="profile",
+                               waveform_path=None, scenes=None)
+        video_processor = VideoProcessor(video_dir=tempfile.mkdtemp(), storage=MagicMock())
+        trimmed_video = MagicMock(id=2)
+
+        with patch("app.service.video_service.VideoProcessor", return_value=video_processor), \
+                patch.object(video_processor, '_trim_mezzanine', return_value=trimmed_video) as mock_trim_mezzanine, \
+                patch.object(self.video_service, '_get_video_from_db', return_value=mock_video), \
+                patch.object(self.video_service, '_save_video_to_db'), \
+                patch.object(self.video_service, '_schedule_renditions'):
+            response = self.video_service.trim_video(1, "00:00:01", "00:01:04.5")
+
+        self.assertEqual(response["video_id"], 2)
+        mock_trim_mezzanine.assert_called_once_with(mock_video, 1.0, 64.5)
+
+    def test_trim_video_rejects_invalid_times(self):
+        for start in ("soon", "1:2:3:4", "", None, True):
+            with self.assertRaises(VideoValidationException):
+                self.video_service.trim_video(1, start, 10)
+
+    @patch("app.service.video_service.url_for")
+    @patch("app.service.video_service.VideoProcessor")
+    def test_trim_video_preview_is_not_saved(self, MockVideoProcessor, mock_url_for):
+        mock_video = MagicMock(id=1)
+        preview_video = MagicMock(filename="preview.mp4", size=100, duration=5, file_path="/tmp/preview.mp4")
+        MockVideoProcessor.return_value.trim_video_file.return_value = preview_video
+        mock_url_for.return_value = "http://localhost/preview/preview.mp4"
+
+        with patch.object(self.video_service, '_get_video_from_db', return_value=mock_video):
+            with patch.object(self.video_service, '_save_video_to_db') as mock_save:
+                response = self.video_service.trim_video(mock_video.id, 0, 10, preview=True)
+
+                self.assertEqual(response["message"], "Video trim preview generated successfully")
+                self.assertEqual(response["preview_url"], "http://localhost/preview/preview.mp4")
+                self.assertNotIn("file_path", response)
+                self.assertGreater(response["expiry_time"], datetime.utcnow())
+                mock_url_for.assert_called_once_with('video_routes.get_preview', filename="preview.mp4",
+                                                     _external=True)
+                mock_save.assert_not_called()
+                MockVideoProcessor.return_value.trim_video_file.assert_called_once_with(mock_video, 0, 10,
+                                                                                         preview=True)
+
+    @patch("app.service.video_service.url_for")
+    @patch("app.service.video_service.VideoProcessor")
+    def test_merge_videos_preview_is_not_saved(self, MockVideoProcessor, mock_url_for):
+        videos = [MagicMock(id=1), MagicMock(id=2)]
+        MockVideoProcessor.return_value.merge_video_files.return_value = MagicMock(file_path="/tmp/preview.mp4")
+
+        with patch.object(self.video_service, '_get_videos_from_db', return_value=videos):
+            with patch.object(self.video_service, '_save_video_to_db') as mock_save:
+                response = self.video_service.merge_videos([1, 2], preview=True)
+
+                self.assertEqual(response["message"], "Videos merge preview generated successfully")
+                mock_save.assert_not_called()
+                MockVideoProcessor.return_value.merge_video_files.assert_called_once_with(videos, preview=True)
+
+    def test_get_video_content_streams_the_stored_file(self):
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(b"video data")
+        with self.app.app_context():
+            video = db.session.get(Video, 1)
+            video.file_path = f.name
+            db.session.commit()
+
+            content = self.video_service.get_video_content(1)
+
+            self.assertEqual(b"".join(content["chunks"]), b"video data")
+        os.remove(f.name)
+
+    def test_get_video_content_fails_before_streaming_a_missing_file(self):
+        with self.app.app_context():
+            with self.assertRaises(VideoProcessingException):
+                self.video_service.get_video_content(1)
+
+    def test_preview_is_served_until_it_expires(self):
+        video_dir = tempfile.mkdtemp()
+        filename = "preview-0f8fad5b-d9cb-469f-a165-70867728950e.mp4"
+        file_path = os.path.join(video_dir, filename)
+        with open(file_path, "wb") as f:
+            f.write(b"preview")
+
+        with patch.multiple(Config, VIDEO_DIR=video_dir, PREVIEW_TTL_SECONDS=60):
+            self.assertEqual(self.video_service.get_preview_path(filename), file_path)
+            expired = time.time() - 120
+            os.utime(file_path, (expired, expired))
+            with self.assertRaises(VideoNotFoundException):
+                self.video_service.get_preview_path(filename)
+            for name in ("missing.mp4", "../" + filename, "preview-0f8fad5b-d9cb-469f-a165-70867728950f.mp4"):
+                with self.assertRaises(VideoNotFoundException):
+                    self.video_service.get_preview_path(name)
+        shutil.rmtree(video_dir)
+
+    def test_only_preview_renders_are_served(self):
+        video_dir = tempfile.mkdtemp()
+        stored_names = ["0f8fad5b-d9cb-469f-a165-70867728950e.mp4", "0f8fad5b-d9cb-469f-a165-70867728950e.peaks",
+                        "0f8fad5b-d9cb-469f-a165-70867728950e_mezzanine.mp4"]
+        for name in stored_names:
+            with open(os.path.join(video_dir, name), "wb") as f:
+                f.write(b"stored")
+
+        with patch.multiple(Config, VIDEO_DIR=video_dir, PREVIEW_TTL_SECONDS=60):
+            for name in stored_names:
+                with self.assertRaises(VideoNotFoundException):
+                    self.video_service.get_preview_path(name)
+        shutil.rmtree(video_dir)
+
+    @patch("app.service.video_service.VideoProcessor")
+    def test_generate_proxy_records_path(self, MockVideoProcessor):
+        MockVideoProcessor.return_value.generate_proxy.return_value = "/mock/path/test_video_proxy.mp4"
+
+        with self.app.app_context():
+            self.video_service.generate_proxy(1)
+            video = db.session.get(Video, 1)
+
+            self.assertEqual(video.proxy_path, "/mock/path/test_video_proxy.mp4")
+
+    @patch("app.service.video_service.VideoProcessor")
+    def test_trim_video_slices_source_waveform(self, MockVideoProcessor):
+        mock_video = MagicMock(id=1, waveform_path="/mock/path/source.peaks")
+        trimmed_video = MagicMock(id=2)
+        MockVideoProcessor.return_value.trim_video_file.return_value = trimmed_video
+        MockVideoProcessor.return_value.slice_waveform.return_value = "/mock/path/trimmed.peaks"
+
+        with patch.object(self.video_service, '_get_video_from_db', return_value=mock_video):
+            with patch.object(self.video_service, '_save_video_to_db'):
+                self.video_service.trim_video(mock_video.id, 2, 4)
+
+        MockVideoProcessor.return_value.slice_waveform.assert_called_once_with(mock_video, trimmed_video, 2, 4)
+        MockVideoProcessor.return_value.generate_waveform.assert_not_called()
+        self.assertEqual(trimmed_video.waveform_path, "/mock/path/trimmed.peaks")
+
+    @patch("app.service.video_service.VideoProcessor")
+    def test_trim_video_with_string_timestamps_slices_waveform_in_seconds(self, MockVideoProcessor):
+        mock_video = MagicMock(id=1, waveform_path="/mock/path/source.peaks", scenes=None)
+        trimmed_video = MagicMock(id=2)
+        MockVideoProcessor.return_value.trim_video_file.return_value = trimmed_video
+        MockVideoProcessor.return_value.slice_waveform.return_value = "/mock/path/trimmed.peaks"
+
+        with patch.object(self.video_service, '_get_video_from_db', return_value=mock_video), \
+                patch.object(self.video_service, '_save_video_to_db'), \
+                self.assertNoLogs("app.service.video_service", level="ERROR"):
+            self.video_service.trim_video(mock_video.id, "00:00:02", "00:00:04.5")
+
+        MockVideoProcessor.return_value.slice_waveform.assert_called_once_with(mock_video, trimmed_video, 2.0, 4.5)
+        self.assertEqual(trimmed_video.waveform_path, "/mock/path/trimmed.peaks")
+
+    def test_get_waveform_not_available(self):
+        mock_video = MagicMock(id=1, waveform_path=None)
+
+        with patch.object(self.video_service, '_get_video_from_db', return_value=mock_video):
+            with self.assertRaises(VideoNotFoundException):
+                self.video_service.get_waveform(1)
+
+    @patch("app.service.video_service.VideoProcessor")
+    def test_get_waveform_invalid_level(self, MockVideoProcessor):
+        mock_video = MagicMock(id=1, waveform_path="/mock/path/source.peaks")
+        MockVideoProcessor.return_value.load_waveform.return_value = (22050, [(128, MagicMock())])
+
+        with patch.object(self.video_service, '_get_video_from_db', return_value=mock_video):
+            with self.assertRaises(VideoValidationException):
+                self.video_service.get_waveform(1, level=3)
+
+    @patch("app.service.video_service.VideoProcessor")
+    def test_trim_video_slices_source_scenes(self, MockVideoProcessor):
+        mock_video = MagicMock(id=1, scenes=[1.0, 3.5, 7.0])
+        trimmed_video = MagicMock(id=2)
+        MockVideoProcessor.return_value.trim_video_file.return_value = trimmed_video
+
+        with patch.object(self.video_service, '_get_video_from_db', return_value=mock_video):
+            with patch.object(self.video_service, '_save_video_to_db'):
+                self.video_service.trim_video(mock_video.id, 2, 8)
+
+        self.assertEqual(trimmed_video.scenes, [1.5, 5.0])
+        MockVideoProcessor.return_value.detect_scenes.assert_not_called()
+
+    @patch("app.service.video_service.VideoProcessor")
+    def test_trim_video_with_string_timestamps_slices_source_scenes(self, MockVideoProcessor):
+        mock_video = MagicMock(id=1, waveform_path=None, scenes=[1.0, 3.5, 7.0])
+        trimmed_video = MagicMock(id=2)
+        MockVideoProcessor.return_value.trim_video_file.return_value = trimmed_video
+
+        with patch.object(self.video_service, '_get_video_from_db', return_value=mock_video), \
+                patch.object(self.video_service, '_save_video_to_db'), \
+                self.assertNoLogs("app.service.video_service", level="ERROR"):
+            self.video_service.trim_video(mock_video.id, "00:00:02", "00:00:08")
+
+        self.assertEqual(trimmed_video.scenes, [1.5, 5.0])
+        MockVideoProcessor.return_value.detect_scenes.assert_not_called()
+
+    @patch("app.service.video_service.VideoProcessor")
+    def test_detect_scenes_records_boundaries(self, MockVideoProcessor):
+        MockVideoProcessor.return_value.detect_scenes.return_value = [2.0, 4.5]
+
+        with self.app.app_context():
+            self.video_service.detect_scenes(1)
+
+            self.assertEqual(self.video_service.get_scenes(1), {"id": 1, "scenes": [2.0, 4.5]})
+
+    def test_get_scenes_not_available(self):
+        with self.app.app_context():
+            with self.assertRaises(VideoNotFoundException):
+                self.video_service.get_scenes(1)
+
     @patch("app.service.video_service.VideoShare")
     @patch("app.service.video_service.url_for")
     def test_generate_shareable_link_success(self, mock_url_for, MockVideoShare):
@@ -185,5 +400,215 @@ class TestVideoService(unittest.TestCase):
                         2])  # Assert correct args passed to save_shareable_link
 
 
+    @patch("app.service.video_service.url_for")
+    def test_signed_share_link_is_verified_without_share_rows(self, mock_url_for):
+        mock_url_for.side_effect = lambda endpoint, token, _external: token
+
+        with self.app.app_context():
+            with patch("app.service.video_service.Config.SHARE_TOKEN_MODE", "signed"):
+                token = self.video_service.generate_shareable_link(1)["share_url"]
+
+            with patch("app.service.video_service.VideoShare") as MockVideoShare:
+                response = self.video_service.get_shared_video_from_token(token)
+
+            self.assertEqual(response["id"], 1)
+            self.assertEqual(VideoShare.query.count(), 0)
+            MockVideoShare.query.filter_by.assert_not_called()
+
+    def test_expired_signed_share_link_is_rejected(self):
+        token = ShareTokenSigner().sign(1, datetime.utcnow() - timedelta(minutes=1))
+
+        with self.app.app_context():
+            with self.assertRaises(VideoValidationException):
+                self.video_service.get_shared_video_from_token(token)
+
+    def test_forged_signed_share_link_is_rejected(self):
+        token = ShareTokenSigner("not-the-secret").sign(1, datetime.utcnow() + timedelta(hours=1))
+
+        with self.app.app_context():
+            with self.assertRaises(VideoNotFoundException):
+                self.video_service.get_shared_video_from_token(token)
+
+    def test_revoked_signed_share_link_is_rejected(self):
+        token = ShareTokenSigner().sign(1, datetime.utcnow() + timedelta(hours=1))
+
+        with self.app.app_context():
+            self.video_service.get_shared_video_from_token(token)
+            self.video_service.revoke_shareable_link(token)
+
+            with self.assertRaises(VideoNotFoundException):
+                self.video_service.get_shared_video_from_token(token)
+            self.assertEqual(RevokedShareToken.query.count(), 1)
+
+    def test_revoke_database_share_link_deletes_row(self):
+        with self.app.app_context():
+            self.video_service._save_shareable_link(1, "ab" * 32, datetime.utcnow() + timedelta(hours=1))
+
+            self.video_service.revoke_shareable_link("ab" * 32)
+
+            self.assertEqual(VideoShare.query.count(), 0)
+            with self.assertRaises(VideoNotFoundException):
+                self.video_service.revoke_shareable_link("ab" * 32)
+
+
+    def test_get_video_is_served_from_cache_until_changed(self):
+        with self.app.app_context():
+            self.assertIsNone(self.video_service.get_video(1)["proxy_path"])
+
+            with patch("app.service.video_service.Video") as MockVideo:
+                self.assertEqual(self.video_service.get_video(1)["filename"], "test_video.mp4")
+                MockVideo.query.get.assert_not_called()
+
+            with patch("app.service.video_service.VideoProcessor") as MockVideoProcessor:
+                MockVideoProcessor.return_value.generate_proxy.return_value = "/mock/path/test_video_proxy.mp4"
+                self.video_service.generate_proxy(1)
+
+            self.assertEqual(self.video_service.get_video(1)["proxy_path"], "/mock/path/test_video_proxy.mp4")
+
+    def test_cached_share_is_not_served_past_expiry(self):
+        expiry_time = datetime.utcnow() + timedelta(hours=1)
+        with self.app.app_context():
+            self.video_service._save_shareable_link(1, "ab" * 32, expiry_time)
+            self.assertEqual(self.video_service.get_shared_video_from_token("ab" * 32)["id"], 1)
+
+            with patch("app.service.video_service.datetime") as mock_datetime:
+                mock_datetime.utcnow.return_value = expiry_time + timedelta(seconds=1)
+                with self.assertRaises(VideoValidationException):
+                    self.video_service.get_shared_video_from_token("ab" * 32)
+
+    def test_revoked_database_share_is_dropped_from_cache(self):
+        with self.app.app_context():
+            self.video_service._save_shareable_link(1, "ab" * 32, datetime.utcnow() + timedelta(hours=1))
+            self.video_service.get_shared_video_from_token("ab" * 32)
+
+            self.video_service.revoke_shareable_link("ab" * 32)
+
+            with self.assertRaises(VideoNotFoundException):
+                self.video_service.get_shared_video_from_token("ab" * 32)
+
+
+    def _add_videos(self, created_ats):
+        for created_at in created_ats:
+            db.session.add(Video(filename="clip.mp4", size=100, duration=5, file_path="/mock/path/clip.mp4",
+                                 created_at=created_at))
+        db.session.commit()
+
+    def test_get_videos_fetches_in_request_order(self):
+        with self.app.app_context():
+            self._add_videos([datetime(2026, 1, 1)])
+
+            response = self.video_service.get_videos(["2", "1", "999", "2"])
+
+            self.assertEqual([video["id"] for video in response["videos"]], [2, 1, 2])
+            self.assertEqual(response["videos"][1]["filename"], "test_video.mp4")
+            self.assertEqual(response["not_found"], [999])
+
+    def test_get_videos_uses_cached_metadata(self):
+        with self.app.app_context():
+            self.video_service.get_video(1)
+
+            with patch("app.service.video_service.db") as mock_db:
+                response = self.video_service.get_videos(["1"])
+
+            self.assertEqual(response["videos"][0]["id"], 1)
+            mock_db.session.execute.assert_not_called()
+
+    def test_get_videos_invalid_ids(self):
+        with self.app.app_context():
+            for video_ids in [["abc"], [], [str(i) for i in range(101)]]:
+                with self.assertRaises(VideoValidationException):
+                    self.video_service.get_videos(video_ids)
+
+    def test_list_videos_pages_through_all_videos(self):
+        with self.app.app_context():
+            # Ties on created_at are broken by id
+            self._add_videos([datetime(2026, 1, 2), datetime(2026, 1, 1), datetime(2026, 1, 1), datetime(2026, 1, 3)])
+            db.session.get(Video, 1).created_at = datetime(2025, 12, 31)
+            db.session.commit()
+
+            pages, cursor = [], None
+            while True:
+                response = self.video_service.list_videos(cursor, limit=2)
+                pages.append([video["id"] for video in response["videos"]])
+                cursor = response["next_cursor"]
+                if cursor is None:
+                    break
+
+            self.assertEqual(pages, [[1, 3], [4, 2], [5]])
+
+    def test_list_videos_invalid_parameters(self):
+        with self.app.app_context():
+            with self.assertRaises(VideoValidationException):
+                self.video_service.list_videos(limit=0)
+            with self.assertRaises(VideoValidationException):
+                self.video_service.list_videos("not-a-cursor")
+
+
+    @patch("app.service.video_service.url_for")
+    def test_generate_shareable_links_in_one_transaction(self, mock_url_for):
+        mock_url_for.side_effect = lambda endpoint, token, _external: f"http://share/{token}"
+
+        with self.app.app_context():
+            self._add_videos([datetime(2026, 1, 1), datetime(2026, 1, 2)])
+
+            response = self.video_service.generate_shareable_links([3, 1, 2])
+
+            self.assertEqual([share["video_id"] for share in response["shares"]], [3, 1, 2])
+            shares = {share.token: share.video_id for share in VideoShare.query.all()}
+            self.assertEqual(len(shares), 3)
+            for share in response["shares"]:
+                self.assertEqual(shares[share["share_url"].rsplit("/", 1)[1]], share["video_id"])
+
+    @patch("app.service.video_service.url_for")
+    def test_generate_shareable_links_keeps_repeated_ids(self, mock_url_for):
+        mock_url_for.side_effect = lambda endpoint, token, _external: f"http://share/{token}"
+
+        with self.app.app_context():
+            self._add_videos([datetime(2026, 1, 1)])
+
+            response = self.video_service.generate_shareable_links([1, 2, 1])
+
+            self.assertEqual([share["video_id"] for share in response["shares"]], [1, 2, 1])
+            self.assertEqual(len({share["share_url"] for share in response["shares"]}), 3)
+            self.assertEqual(VideoShare.query.filter_by(video_id=1).count(), 2)
+
+    def test_generate_shareable_links_rejects_unknown_videos(self):
+        with self.app.app_context():
+            with self.assertRaises(VideoNotFoundException):
+                self.video_service.generate_shareable_links([1, 999])
+
+            self.assertEqual(VideoShare.query.count(), 0)
+
+    @patch("app.service.video_service.url_for")
+    def test_generate_signed_shareable_links_stores_nothing(self, mock_url_for):
+        mock_url_for.side_effect = lambda endpoint, token, _external: token
+
+        with self.app.app_context():
+            with patch("app.service.video_service.Config.SHARE_TOKEN_MODE", "signed"):
+                response = self.video_service.generate_shareable_links([1])
+
+            self.assertEqual(VideoShare.query.count(), 0)
+            self.assertEqual(self.video_service.get_shared_video_from_token(response["shares"][0]["share_url"])["id"], 1)
+
+    @patch("app.service.video_service.VideoProcessor")
+    def test_failed_save_deletes_the_files_of_the_unsaved_video(self, MockVideoProcessor):
+        video = Video(filename="trimmed.mp4", size=100, duration=5, file_path="uploads/trimmed.mp4",
+                      waveform_path="uploads/trimmed.peaks")
+
+        with self.app.app_context():
+            with patch.object(db.session, "commit", side_effect=Exception("disk I/O error")):
+                with self.assertRaises(VideoProcessingException):
+                    self.video_service._save_video_to_db(video)
+
+        deleted = {call.args[0] for call in MockVideoProcessor.return_value.delete_file.call_args_list}
+        self.assertEqual(deleted, {"uploads/trimmed.mp4", "uploads/trimmed.peaks"})
+
+    def test_generated_tokens_do_not_collide(self):
+        tokens = {self.video_service._generate_token() for _ in range(1000)}
+
+        self.assertEqual(len(tokens), 1000)
+        self.assertTrue(all(len(token) == 64 for token in tokens))
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,123 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from app.service.processor.waveform_processor import WaveformProcessor
+
+
+class TestWaveformProcessor(unittest.TestCase):
+    def setUp(self):
+        self.waveform_processor = WaveformProcessor(sample_rate=100, samples_per_peak=10, levels=3, zoom_factor=2)
+
+    def test_compute_peaks_levels(self):
+        samples = np.linspace(-1, 1, 95)
+
+        levels = self.waveform_processor.compute_peaks(samples)
+
+        self.assertEqual([samples_per_peak for samples_per_peak, _ in levels], [10, 20, 40])
+        self.assertEqual([len(peaks) for _, peaks in levels], [10, 5, 3])
+        finest = levels[0][1]
+        self.assertEqual(finest.dtype, np.int8)
+        self.assertEqual(finest[0, 0], -127)
+        self.assertEqual(finest[-1, 1], 127)
+
+    def test_compute_peaks_collapses_channels(self):
+        samples = np.zeros((20, 2))
+        samples[3, 0] = -0.5
+        samples[12, 1] = 0.5
+
+        levels = self.waveform_processor.compute_peaks(samples)
+
+        np.testing.assert_array_equal(levels[0][1], [[-64, 0], [0, 64]])
+
+    def test_coarser_levels_match_direct_computation(self):
+        samples = np.sin(np.arange(400) / 7.0)
+
+        levels = self.waveform_processor.compute_peaks(samples)
+        direct = WaveformProcessor(sample_rate=100, samples_per_peak=40, levels=1).compute_peaks(samples)
+
+        np.testing.assert_array_equal(levels[2][1], direct[0][1])
+
+    def test_compute_from_audio_streams_chunks(self):
+        samples = np.sin(np.arange(30000) / 11.0)
+        audio_clip = MagicMock()
+        audio_clip.iter_chunks.return_value = [samples[:10240, np.newaxis], samples[10240:, np.newaxis]]
+
+        streamed = self.waveform_processor.compute_from_audio(audio_clip)
+        direct = self.waveform_processor.compute_peaks(samples)
+
+        for (_, streamed_peaks), (_, direct_peaks) in zip(streamed, direct):
+            np.testing.assert_array_equal(streamed_peaks, direct_peaks)
+
+    def test_compute_from_audio_keeps_windows_aligned_across_uneven_chunks(self):
+        # Like moviepy, split on linspace boundaries that fall mid-window
+        samples = np.sin(np.arange(30007) / 11.0)
+        bounds = np.linspace(0, len(samples), 4).astype(int)
+        audio_clip = MagicMock()
+        audio_clip.iter_chunks.return_value = [samples[start:end, np.newaxis]
+                                               for start, end in zip(bounds[:-1], bounds[1:])]
+
+        streamed = self.waveform_processor.compute_from_audio(audio_clip)
+        direct = self.waveform_processor.compute_peaks(samples)
+
+        self.assertEqual([len(peaks) for _, peaks in streamed], [3001, 1501, 751])
+        for (_, streamed_peaks), (_, direct_peaks) in zip(streamed, direct):
+            np.testing.assert_array_equal(streamed_peaks, direct_peaks)
+
+    def test_compute_from_audio_of_empty_track(self):
+        audio_clip = MagicMock()
+        audio_clip.iter_chunks.return_value = []
+
+        levels = self.waveform_processor.compute_from_audio(audio_clip)
+
+        self.assertEqual([(samples_per_peak, len(peaks)) for samples_per_peak, peaks in levels],
+                         [(10, 0), (20, 0), (40, 0)])
+
+    def test_slice_levels(self):
+        levels = self.waveform_processor.compute_peaks(np.linspace(-1, 1, 400))
+
+        sliced = self.waveform_processor.slice_levels(levels, start=1, end=2)
+
+        np.testing.assert_array_equal(sliced[0][1], levels[0][1][10:20])
+        np.testing.assert_array_equal(sliced[1][1], levels[1][1][5:10])
+        np.testing.assert_array_equal(sliced[2][1], levels[2][1][2:5])
+
+    def test_concatenate_levels(self):
+        first = self.waveform_processor.compute_peaks(np.linspace(-1, 0, 200))
+        second = self.waveform_processor.compute_peaks(np.linspace(0, 1, 200))
+
+        joined = self.waveform_processor.concatenate_levels([first, second])
+
+        self.assertEqual(len(joined[0][1]), 40)
+        np.testing.assert_array_equal(joined[0][1][:20], first[0][1])
+
+    def test_write_and_read_round_trip(self):
+        levels = self.waveform_processor.compute_peaks(np.sin(np.arange(1000) / 5.0))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "video.peaks")
+            self.waveform_processor.write(file_path, levels)
+            reader = WaveformProcessor()
+            loaded = reader.read(file_path)
+
+        self.assertEqual(reader.sample_rate, 100)
+        for (samples_per_peak, peaks), (loaded_samples_per_peak, loaded_peaks) in zip(levels, loaded):
+            self.assertEqual(samples_per_peak, loaded_samples_per_peak)
+            np.testing.assert_array_equal(peaks, loaded_peaks)
+
+    def test_read_rejects_unknown_format(self):
+        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
+            temp_file.write(b"NOPE" + bytes(16))
+
+        try:
+            with self.assertRaises(ValueError):
+                self.waveform_processor.read(temp_file.name)
+        finally:
+            os.remove(temp_file.name)
+
+
+if __name__ == "__main__":
+    unittest.main()